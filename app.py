@@ -1,61 +1,113 @@
+import os
 import streamlit as st
-from pathlib import Path
-from decimal import Decimal
+from functools import lru_cache, partial
+
+from utils import error_log as _errors
 
 try:
     st.set_page_config(layout="wide", page_title="Streamlit Calculator")
 except Exception as e:
     # set_page_config may raise if called multiple times; log for debugging
-    try:
-        print('Component:', e)
-    except Exception:
-        pass
+    _errors.report('page_config_error', e)
 
-from typing import Optional, Iterable, List
+from typing import Optional, Iterable, List, Tuple
 
-# import evaluation and formatting utilities
-from utils import parser as _parser
-from utils import calculator as _calculator
+# keypad logic lives in utils.engine; handlers apply it to the session's state
+from utils import engine as _engine
+from utils import metrics as _metrics
+from utils.state import CalculatorState, LEGACY_KEYS
+
+# session_state key holding the session's CalculatorState
+_STATE_KEY = 'calculator'
 
 
 def _init_session_state() -> None:
-    """Initialize st.session_state with calculator defaults if missing."""
+    """Initialize the session's CalculatorState if missing."""
+    _state()
+
+
+def _state() -> CalculatorState:
+    """Return this session's CalculatorState, creating it on first use.
+
+    Sessions still holding the old per-key layout (e.g. across a hot reload
+    of the script) are migrated into a single state object.
+    """
     ss = st.session_state
-    # Only set defaults if keys not present
-    ss.setdefault('current_input', "0")
-    ss.setdefault('previous_value', "")
-    ss.setdefault('operator', None)
-    ss.setdefault('waiting_for_operand', True)
-    ss.setdefault('display_value', "0")
-    ss.setdefault('calculation_history', [])
-    ss.setdefault('error_state', None)
+    state = ss.get(_STATE_KEY)
+    if state is None:
+        state = CalculatorState.from_mapping(ss)
+        for key in LEGACY_KEYS:
+            if key in ss:
+                del ss[key]
+        ss[_STATE_KEY] = state
+    return state
+
+
+def _set_error_state(code: str) -> None:
+    """Best-effort: record code as the session's error_state."""
+    try:
+        _state().error_state = code
+    except Exception:
+        pass
+
+
+@lru_cache(maxsize=1)
+def _load_styles() -> Optional[str]:
+    """Read components/styles.css once per process; None if it is missing.
+
+    Session scripts run in their own threads; the cached value is an
+    immutable str and lru_cache is thread-safe, so sharing it is safe.
+    """
+    css_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'components', 'styles.css')
+    if not os.path.exists(css_path):
+        return None
+    with open(css_path, encoding='utf-8') as f:
+        return f.read()
 
 
 def _inject_styles() -> None:
-    """Read components/styles.css and inject into the page via markdown.
+    """Inject components/styles.css into the page via markdown.
 
     Defensive: swallow any file IO errors and log.
     """
     try:
-        base = Path(__file__).parent
-        css_path = base / 'components' / 'styles.css'
-        if css_path.exists():
-            try:
-                css_text = css_path.read_text(encoding='utf-8')
-                st.markdown(f"<style>{css_text}</style>", unsafe_allow_html=True)
-            except Exception as e:
-                try:
-                    print('Component:', e)
-                except Exception:
-                    pass
+        css_text = _load_styles()
+        if css_text is not None:
+            st.markdown(f"<style>{css_text}</style>", unsafe_allow_html=True)
         else:
             # no-op if stylesheet not present
             pass
     except Exception as e:
+        _errors.report('styles_error', e)
+
+
+def _start_metrics_endpoint() -> None:
+    """Serve Prometheus metrics when CALC_METRICS is on and CALC_METRICS_PORT is set.
+
+    Idempotent across reruns; the server runs in a daemon thread.
+    """
+    try:
+        port = os.environ.get('CALC_METRICS_PORT')
+        if port and _metrics.is_enabled():
+            _metrics.serve(int(port))
+    except Exception as e:
+        _errors.report('metrics_endpoint_error', e)
+
+
+class _ColProxy:
+    """Stand-in for a column when st.columns is unavailable (test fakes)."""
+
+    __slots__ = ()
+
+    def button(self, label, **kwargs):
         try:
-            print('Component:', e)
+            return st.button(label, **kwargs)
+        except TypeError:
+            # let callers fall back to a plain button(label) call
+            raise
         except Exception:
-            pass
+            # If st lacks button, be defensive and return False
+            return False
 
 
 def _safe_columns(spec) -> List[object]:
@@ -71,15 +123,6 @@ def _safe_columns(spec) -> List[object]:
         # fall through to proxy creation
         pass
 
-    # Create proxy objects with button method delegating to st.button
-    class _ColProxy:
-        def button(self, label):
-            try:
-                return st.button(label)
-            except Exception:
-                # If st lacks button, be defensive and return False
-                return False
-
     # Determine count from spec
     count = 0
     if isinstance(spec, int):
@@ -93,198 +136,76 @@ def _safe_columns(spec) -> List[object]:
         except Exception:
             count = 1
 
-    return [_ColProxy() for _ in range(count)]
+    return [_ColProxy()] * count
 
 
 def _clear_state() -> None:
     """Reset all calculator session state variables to initial defaults."""
-    ss = st.session_state
-    ss['current_input'] = "0"
-    ss['previous_value'] = ""
-    ss['operator'] = None
-    ss['waiting_for_operand'] = True
-    ss['display_value'] = "0"
-    ss['calculation_history'] = []
-    ss['error_state'] = None
+    _engine.clear_all(_state())
 
 
 def _handle_clear_entry() -> None:
     """Clear the current entry only (C). Do not modify previous_value/operator."""
     try:
-        ss = st.session_state
-        ss['current_input'] = "0"
-        ss['display_value'] = "0"
-        # Do not touch previous_value, operator, waiting_for_operand, history, error_state
+        _engine.clear_entry(_state())
     except Exception as e:
-        try:
-            print('Component:', e)
-        except Exception:
-            pass
-        try:
-            ss['error_state'] = 'clear_entry_error'
-        except Exception:
-            pass
+        _errors.report('clear_entry_error', e)
+        _set_error_state('clear_entry_error')
 
 
 def _handle_toggle_sign() -> None:
     """Toggle sign of the current input using utils.calculator.toggle_sign."""
     try:
-        ss = st.session_state
-        curr = ss.get('current_input', '0')
-        try:
-            val = Decimal(curr)
-            # Delegate sign toggle to calculator utils
-            toggled = _calculator.toggle_sign(val)
-            formatted = _calculator.format_result(toggled)
-            ss['current_input'] = formatted
-            ss['display_value'] = formatted
-            ss['error_state'] = None
-        except Exception as e:
-            # If parsing or calculator util fails, do not modify current input; set an error state
-            try:
-                ss['error_state'] = 'toggle_sign_invalid_input'
-            except Exception:
-                pass
-            try:
-                print('Component:', e)
-            except Exception:
-                pass
+        failure = _engine.toggle_sign(_state())
+        if failure is not None:
+            # the input is left unchanged and error_state is set
+            _errors.report('toggle_sign_invalid_input', failure)
     except Exception as e:
-        try:
-            print('Component:', e)
-        except Exception:
-            pass
-        try:
-            st.session_state['error_state'] = 'toggle_sign_handler_error'
-        except Exception:
-            pass
+        _errors.report('toggle_sign_handler_error', e)
+        _set_error_state('toggle_sign_handler_error')
 
 
 def _handle_percentage() -> None:
     """Convert current input to percentage using utils.calculator.calculate_percentage."""
     try:
-        ss = st.session_state
-        curr = ss.get('current_input', '0')
-        try:
-            val = Decimal(curr)
-            # Delegate percentage calculation to calculator utils
-            perc = _calculator.calculate_percentage(val)
-            formatted = _calculator.format_result(perc)
-            ss['current_input'] = formatted
-            ss['display_value'] = formatted
-            ss['error_state'] = None
-        except Exception as e:
-            try:
-                ss['error_state'] = 'percentage_invalid_input'
-            except Exception:
-                pass
-            try:
-                print('Component:', e)
-            except Exception:
-                pass
+        failure = _engine.percentage(_state())
+        if failure is not None:
+            _errors.report('percentage_invalid_input', failure)
     except Exception as e:
-        try:
-            print('Component:', e)
-        except Exception:
-            pass
-        try:
-            st.session_state['error_state'] = 'percentage_handler_error'
-        except Exception:
-            pass
+        _errors.report('percentage_handler_error', e)
+        _set_error_state('percentage_handler_error')
+
+
+def _report_calculation_error(e: ValueError) -> None:
+    _errors.report('calculation_error', e, error_state=str(e))
 
 
+@_metrics.timed("app.perform_calculation")
 def _perform_calculation() -> str:
     """Perform the calculation using session state and persist history.
 
     Returns the string result (formatted) or a safe fallback string.
     """
     try:
-        ss = st.session_state
-        prev: str = ss.get('previous_value', '')
-        op: Optional[str] = ss.get('operator')
-        curr: str = ss.get('current_input', '0')
-
-        # If no operator or previous value, treat current input as the result
-        if not op or not prev:
-            # Do not store in history; just ensure display reflects current input
-            ss['display_value'] = curr
-            ss['current_input'] = curr
-            ss['previous_value'] = ""
-            ss['operator'] = None
-            ss['waiting_for_operand'] = True
-            ss['error_state'] = None
-            return curr
-
-        # Map UI operator to parser operator for evaluation
-        eval_op = op
-        if op == '×':
-            eval_op = '*'
-        elif op == '÷':
-            eval_op = '/'
-
-        # Build expression for history using UI operator
-        expression = f"{prev} {op} {curr}"
-        # Build expression for evaluation using parser operators
-        eval_expression = f"{prev} {eval_op} {curr}"
-
-        try:
-            result_dec = _parser.evaluate_expression(eval_expression)
-            formatted = _calculator.format_result(result_dec)
-
-            # Append to history
-            try:
-                ss['calculation_history'].append({
-                    'expression': expression,
-                    'result': formatted,
-                })
-            except Exception:
-                # ensure history exists and append
-                ss['calculation_history'] = ss.get('calculation_history', []) + [{
-                    'expression': expression,
-                    'result': formatted,
-                }]
-
-            # Update state for chaining
-            ss['display_value'] = formatted
-            ss['current_input'] = formatted
-            ss['previous_value'] = ""
-            ss['operator'] = None
-            ss['waiting_for_operand'] = True
-            ss['error_state'] = None
-
-            return formatted
-        except ValueError as e:
-            # Calculation error (e.g., division by zero or malformed)
-            try:
-                ss['error_state'] = str(e)
-            except Exception:
-                pass
-            try:
-                ss['display_value'] = 'Error'
-            except Exception:
-                pass
-            try:
-                ss['current_input'] = '0'
-                ss['previous_value'] = ""
-                ss['operator'] = None
-                ss['waiting_for_operand'] = True
-            except Exception:
-                pass
-            try:
-                print('Component:', e)
-            except Exception:
-                pass
-            # Do not append failed calculation to history
-            return '0'
+        state = _state()
+        failure = _engine.equals(state)
+        if failure is not None:
+            # failed calculations are not added to the history
+            _report_calculation_error(failure)
+        else:
+            # index each calculation as it is made, so no search indexes a long history
+            _sync_history_index(state.history)
+        return state.current_input
     except Exception as e:
+        _errors.report('calculation_handler_error', e)
+        # Best-effort fallback
         try:
-            print('Component:', e)
+            return _state().current_input
         except Exception:
-            pass
-        # Best-effort fallback
-        return st.session_state.get('current_input', '0')
+            return '0'
 
 
+@_metrics.timed("app.handle_digit")
 def _handle_digit(digit: str) -> None:
     """Handle digit or decimal point input, updating session state.
 
@@ -292,155 +213,342 @@ def _handle_digit(digit: str) -> None:
     - If waiting_for_operand is True, start a new current_input with the digit.
     - Prevent multiple decimal points.
     - Replace leading '0' with a non-zero digit.
-    - Update display_value to reflect current_input.
+    - Update the display to reflect current_input.
     """
     try:
-        if digit not in {"0", "1", "2", "3", "4", "5", "6", "7", "8", "9", '.'}:
-            return
-
-        ss = st.session_state
+        _engine.digit(_state(), digit)
+    except Exception as e:
+        _errors.report('digit_handler_error', e)
+        _set_error_state('digit_handler_error')
 
-        # If we are waiting for the next operand, begin a new input
-        if ss.get('waiting_for_operand'):
-            if digit == '.':
-                ss['current_input'] = '0.'
-            else:
-                ss['current_input'] = digit
-            ss['waiting_for_operand'] = False
-            ss['display_value'] = ss['current_input']
-            return
 
-        # Not waiting: append or manage decimal/leading zero rules
-        current = ss.get('current_input', '0')
+@_metrics.timed("app.handle_operator")
+def _handle_operator(op: str) -> None:
+    """Handle operator selection, managing previous_value, operator, and waiting flag.
 
-        if digit == '.':
-            if '.' in current:
-                # ignore additional decimal points
-                return
-            # append decimal point
-            ss['current_input'] = current + '.'
-            ss['display_value'] = ss['current_input']
-            return
+    If there is a pending operation it is performed first to enable chaining.
+    """
+    try:
+        failure = _engine.operator(_state(), op)
+        if failure is not None:
+            _report_calculation_error(failure)
+    except Exception as e:
+        _errors.report('operator_handler_error', e)
+        _set_error_state('operator_handler_error')
 
-        # digit is 0-9
-        if current == '0':
-            # Replace leading zero unless digit is also zero
-            if digit == '0':
-                ss['current_input'] = '0'
-            else:
-                ss['current_input'] = digit
-        else:
-            ss['current_input'] = current + digit
 
-        ss['display_value'] = ss['current_input']
+def _handle_backspace() -> None:
+    """Handle backspace keyboard action: remove last char or reset to '0'."""
+    try:
+        _engine.backspace(_state())
     except Exception as e:
-        try:
-            print('Component:', e)
-        except Exception:
-            pass
-        try:
-            st.session_state['error_state'] = 'digit_handler_error'
-        except Exception:
-            pass
+        _errors.report('backspace_handler_error', e)
+        _set_error_state('backspace_handler_error')
+
+
+# Hidden text input that receives bursts of coalesced keystrokes from the
+# keyboard JS, so a burst costs one rerun instead of one per key.
+_KEY_BUFFER_KEY = 'calc_key_buffer'
+_KEY_BUFFER_LABEL = 'calc-keys'
+# flush a burst after this much keyboard idle time, or once it has this many keys
+KEY_BUFFER_IDLE_MS = 250
+KEY_BUFFER_MAX_KEYS = 64
+
+# button label -> (handler, error code reported if the click fails)
+_BUTTONS = {
+    'AC': (_clear_state, 'button_click_error'),
+    'C': (_handle_clear_entry, 'button_click_error'),
+    '±': (_handle_toggle_sign, 'button_click_error'),
+    '%': (_handle_percentage, 'button_click_error'),
+    **{op: (partial(_handle_operator, op), 'button_click_error') for op in ('+', '-', '×', '÷')},
+    **{key: (partial(_handle_digit, key), 'button_click_error') for key in '123456789'},
+    '0': (partial(_handle_digit, '0'), 'digit_click_error'),
+    '.': (partial(_handle_digit, '.'), 'digit_click_error'),
+    '=': (_perform_calculation, 'equals_click_error'),
+    '⌫': (_handle_backspace, 'backspace_click_error'),
+}
+
+# Keypad rows as (st.columns spec, labels), approximating the iOS layout.
+# The top row intentionally has 5 columns so that 'AC' (reset everything)
+# and 'C' (clear the current entry only) are separate buttons; the last row
+# makes '0' double width.
+_KEYPAD_ROWS = (
+    (5, ('AC', 'C', '±', '%', '÷')),
+    (4, ('7', '8', '9', '×')),
+    (4, ('4', '5', '6', '-')),
+    (4, ('1', '2', '3', '+')),
+    ([2, 1, 1], ('0', '.', '=')),
+)
+
+# the same rows resolved once to (spec, ((label, handler, error code), ...))
+_KEYPAD = tuple(
+    (spec, tuple((label,) + _BUTTONS[label] for label in labels)) for spec, labels in _KEYPAD_ROWS
+)
+
+
+def _click(handler, code: str) -> None:
+    """Button callback: run handler, reporting failures under code."""
+    try:
+        handler()
+    except Exception as e:
+        _errors.report(code, e)
+        _set_error_state(code)
 
 
-def _handle_operator(op: str) -> None:
-    """Handle operator selection, managing previous_value, operator, and waiting flag.
+def _keypad_button(container, label: str, handler, code: str) -> None:
+    """Render one button whose click runs handler via on_click.
 
-    If there is a pending operation, invoke _perform_calculation to enable chaining.
+    Streamlit runs the callback before the next rerun. Test fakes whose
+    button(label) takes no callback are handled by dispatching on the
+    returned click state instead.
     """
     try:
-        if op not in {'+', '-', '×', '÷'}:
-            return
+        container.button(label, on_click=_click, args=(handler, code))
+        return
+    except TypeError:
+        pass
+    if container.button(label):
+        _click(handler, code)
 
-        ss = st.session_state
-        prev = ss.get('previous_value', '')
-        curr = ss.get('current_input', '0')
-        existing_op = ss.get('operator')
 
-        if not prev:
-            # No previous value recorded, set it from current input
-            ss['previous_value'] = curr
-        else:
-            # There is a previous value; if there's an existing operator, perform pending calculation
-            if existing_op:
-                # Perform calculation and update previous_value with result
-                result = _perform_calculation()
-                ss['previous_value'] = result
-
-        ss['operator'] = op
-        ss['waiting_for_operand'] = True
-        # update display to show the previous value (or current if prev absent)
-        ss['display_value'] = ss.get('previous_value') or ss.get('current_input')
+def _apply_key_buffer() -> None:
+    """on_change callback of the key buffer: apply one burst of keys in order.
+
+    The value is '<submission id>:<labels>', one character per button label;
+    the id keeps two identical bursts from looking like an unchanged value.
+    """
+    try:
+        value = st.session_state.get(_KEY_BUFFER_KEY) or ''
+        _, _, labels = value.partition(':')
+        for label in labels:
+            button = _BUTTONS.get(label)
+            if button is not None:
+                button[0]()
     except Exception as e:
-        try:
-            print('Component:', e)
-        except Exception:
-            pass
-        try:
-            st.session_state['error_state'] = 'operator_handler_error'
-        except Exception:
-            pass
+        _errors.report('key_buffer_error', e)
 
 
-def _handle_backspace() -> None:
-    """Handle backspace keyboard action: remove last char or reset to '0'."""
+def _render_key_buffer() -> None:
+    """Render the hidden key buffer input (hidden via styles.css)."""
     try:
-        ss = st.session_state
-        # If waiting for operand, treat backspace as resetting current input
-        if ss.get('waiting_for_operand'):
-            ss['current_input'] = '0'
-            ss['display_value'] = '0'
-            ss['waiting_for_operand'] = True
+        text_input = getattr(st, 'text_input', None)
+        if text_input is None:
+            # test fakes have no text_input; the JS then clicks buttons per key
             return
+        text_input(_KEY_BUFFER_LABEL, key=_KEY_BUFFER_KEY, on_change=_apply_key_buffer, label_visibility='collapsed')
+    except Exception as e:
+        _errors.report('key_buffer_render_error', e)
 
-        curr = ss.get('current_input', '0') or '0'
 
-        # If current is '0' or empty, keep '0'
-        if not curr or curr == '0':
-            ss['current_input'] = '0'
-            ss['display_value'] = '0'
-            return
+# session_state keys of the history export/import controls
+_EXPORT_KEY = 'calc_history_export'  # format picked for download, None until one is
+_EXPORT_DATA_KEY = 'calc_history_export_data'  # (history, length, format, encoded bytes) of the last export
+_UPLOAD_KEY = 'calc_history_upload'
+_IMPORT_REPORT_KEY = 'calc_history_import_report'
+
+
+def _request_export(fmt: str) -> None:
+    st.session_state[_EXPORT_KEY] = fmt
+
 
-        # Remove last character
-        new = curr[:-1]
-        # If removing leaves empty or just '-', normalize to '0'
-        if not new or new == '-' or len(curr) <= 1:
-            new = '0'
+def _finish_export() -> None:
+    st.session_state[_EXPORT_KEY] = None
+    st.session_state[_EXPORT_DATA_KEY] = None
 
-        ss['current_input'] = new
-        ss['display_value'] = new
+
+def _export_data(history, fmt: str) -> bytes:
+    """The encoded export, reused on reruns until the history or format changes."""
+    from utils import history_io as _history_io
+
+    cached = st.session_state.get(_EXPORT_DATA_KEY)
+    # the list itself, not its id: AC replaces it and a freed id can be reused
+    if cached is None or cached[0] is not history or cached[1] != len(history) or cached[2] != fmt:
+        cached = (history, len(history), fmt, b''.join(_history_io.iter_export(history, fmt)))
+        st.session_state[_EXPORT_DATA_KEY] = cached
+    return cached[3]
+
+
+def _import_upload() -> None:
+    """on_change callback of the history uploader: import the new file once."""
+    try:
+        from utils import history_io as _history_io
+
+        upload = st.session_state.get(_UPLOAD_KEY)
+        if upload is None:
+            return
+        fmt = _history_io.format_for(upload.name)
+        history = _state().history
+        imported, rejected = _history_io.import_into(history, upload, fmt)
+        _sync_history_index(history)
+        st.session_state[_IMPORT_REPORT_KEY] = f"Imported {imported} entries from {upload.name}, skipped {rejected}."
     except Exception as e:
-        try:
-            print('Component:', e)
-        except Exception:
-            pass
-        try:
-            st.session_state['error_state'] = 'backspace_handler_error'
-        except Exception:
-            pass
+        _errors.report('history_import_error', e)
+        st.session_state[_IMPORT_REPORT_KEY] = f"Import failed, nothing was imported: {e}"
 
 
-def _inject_keyboard_handlers() -> None:
-    """Inject JavaScript to map physical keyboard events to existing buttons.
+def _render_history_io() -> None:
+    """Export the history as CSV/JSONL and import a previous export.
 
-    Defensive: swallow any errors when Streamlit components are not available (tests).
+    The export is only encoded once a format is picked, so ordinary reruns
+    never serialize a long history. Streamlit reads download data in full
+    on every rerun, so the encoded bytes are then kept until the history
+    changes or the download is taken.
     """
     try:
-        # Import components in a try to avoid test failures when fake streamlit lacks components
-        import streamlit.components.v1 as components
+        if not all(hasattr(st, name) for name in ('expander', 'download_button', 'file_uploader')):
+            # test fakes may lack the file widgets
+            return
+        from utils import history_io as _history_io
+
+        with st.expander('Export / import history'):
+            history = _state().history
+            fmt = st.session_state.get(_EXPORT_KEY)
+            if history and fmt is None:
+                for col, choice in zip(_safe_columns(len(_history_io.FORMATS)), _history_io.FORMATS):
+                    col.button(f'Export {choice.upper()}', on_click=_request_export, args=(choice,))
+            elif history:
+                st.download_button(
+                    f'Download {fmt.upper()} ({len(history)} entries)',
+                    data=_export_data(history, fmt),
+                    file_name=f'calculation_history.{fmt}',
+                    mime=_history_io.MIME_TYPES[fmt],
+                    on_click=_finish_export,
+                )
+            st.file_uploader(
+                'Import history',
+                type=[*_history_io.FORMATS, 'ndjson'],
+                key=_UPLOAD_KEY,
+                on_change=_import_upload,
+            )
+            report = st.session_state.get(_IMPORT_REPORT_KEY)
+            if report:
+                st.caption(report)
+    except Exception as e:
+        _errors.report('history_io_render_error', e)
+
+
+# session_state keys of the history search box and its index
+_HISTORY_SEARCH_KEY = 'calc_history_search'
+_HISTORY_INDEX_KEY = 'calc_history_index'
+# matches listed for a history search (the rest are only counted)
+MAX_SEARCH_RESULTS = 100
+
+
+def _sync_history_index(history):
+    """Return the session's HistoryIndex, indexing the entries added since its last sync."""
+    from utils.history_index import HistoryIndex
+
+    index = st.session_state.get(_HISTORY_INDEX_KEY)
+    if index is None:
+        index = st.session_state[_HISTORY_INDEX_KEY] = HistoryIndex()
+    index.sync(history)
+    return index
+
+
+def _search_history(history, query: str) -> Tuple[list, int]:
+    """The first MAX_SEARCH_RESULTS entries matching query, and the number of matches.
+
+    Queries go through the per-session HistoryIndex, which is kept current
+    as calculations are made and files imported, instead of rescanning the
+    history. Only the first MAX_SEARCH_RESULTS matches are collected.
+    """
+    index = _sync_history_index(history)
+    return [history[position] for position in index.search(query, MAX_SEARCH_RESULTS)], index.count(query)
+
+
+def _render_history_search(panel: '_Panel') -> None:
+    """Search box over the history; its matches are listed in the display panel."""
+    text_input = getattr(st, 'text_input', None)
+    if text_input is None:
+        # test fakes may lack text_input
+        return
+    text_input('Search history', key=_HISTORY_SEARCH_KEY, placeholder='e.g. ×12 or a result range such as 10..20')
+    if panel.query:
+        st.caption(f"{panel.matches} of {len(_state().history)} entries match")
+
 
-        js = r"""
+# session_state key of the session's cached display panel
+_PANEL_KEY = 'calc_panel'
+# newest history entries listed in the panel; older ones are found by searching
+HISTORY_ROWS = 500
+
+
+class _Panel:
+    """A session's display-and-history HTML block and the state it was built from.
+
+    History lists are only appended to until AC replaces them, so the list
+    object and its length identify their contents; holding the list keeps its
+    id from being reused.
+    """
+
+    __slots__ = ('history', 'count', 'query', 'matches', 'rows', 'display', 'html')
+
+    def __init__(self) -> None:
+        self.history = None
+        self.count = 0
+        self.query = ''
+        self.matches = 0
+        self.rows = ''
+        self.display = None
+        self.html = ''
+
+
+# HTML escapes for panel text (the html module is not otherwise loaded at startup)
+_ESCAPES = str.maketrans({'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#x27;'})
+
+
+def _history_rows(entries: Iterable[Tuple[str, str]]) -> str:
+    # expressions may come from imported files, so they are escaped
+    return ''.join(f'<div>{str(expr).translate(_ESCAPES)} = {str(res).translate(_ESCAPES)}</div>' for expr, res in entries)
+
+
+def _panel() -> _Panel:
+    """This session's panel, rebuilt only for a changed display, history or search."""
+    ss = st.session_state
+    panel = ss.get(_PANEL_KEY)
+    if panel is None:
+        panel = ss[_PANEL_KEY] = _Panel()
+    state = _state()
+    history = state.history
+    query = (ss.get(_HISTORY_SEARCH_KEY) or '').strip()
+    stale = panel.history is not history or panel.count != len(history) or panel.query != query
+    if stale:
+        if query and history:
+            entries, panel.matches = _search_history(history, query)
+            title = 'Matches'
+        else:
+            entries, panel.matches = history[-HISTORY_ROWS:], 0
+            hidden = len(history) - len(entries)
+            title = f'History ({hidden} earlier entries: search to find them)' if hidden else 'History'
+        panel.rows = (
+            f'<div class="calc-history"><div><div class="calc-history-title">{title}</div>{_history_rows(entries)}</div></div>'
+            if entries or query and history else ''
+        )
+        panel.history, panel.count, panel.query = history, len(history), query
+    display = state.display_value
+    if stale or panel.display != display:
+        panel.display = display
+        panel.html = f'<div class="calc-panel">{panel.rows}<div class="calc-display">{str(display).translate(_ESCAPES)}</div></div>'
+    return panel
+
+
+_KEYBOARD_JS = r"""
 (function(){
   try{
-    if (window.__calcKbInstalled) return; window.__calcKbInstalled = true;
+    // components.html runs this in an iframe; listen on the app page itself
+    var win = window;
+    try{ if(window.parent && window.parent.document) win = window.parent; }catch(e){}
+    var doc = win.document;
+    var BUFFER_LABEL = '__KEY_BUFFER_LABEL__';
+    var IDLE_MS = __KEY_BUFFER_IDLE_MS__;
+    var MAX_KEYS = __KEY_BUFFER_MAX_KEYS__;
     function findButtonByLabel(label){
       try{
         // try aria-label first
-        var q = document.querySelector('[aria-label="' + label + '"]');
+        var q = doc.querySelector('[aria-label="' + label + '"]');
         if(q) return q;
         // fallback: search all buttons for trimmed innerText match
-        var btns = document.querySelectorAll('button');
+        var btns = doc.querySelectorAll('button');
         for(var i=0;i<btns.length;i++){
           try{
             var text = (btns[i].innerText || btns[i].textContent || '').trim();
@@ -451,245 +559,224 @@ def _inject_keyboard_handlers() -> None:
       return null;
     }
 
-    window.addEventListener('keydown', function(ev){
+    // Keys are buffered and sent as one burst to the hidden key buffer input,
+    // which the server applies in a single rerun.
+    var pending = '';
+    var timer = null;
+    var submissions = 0;
+    function flush(){
+      if(timer){ clearTimeout(timer); timer = null; }
+      if(!pending) return;
+      var labels = pending; pending = '';
+      var input = doc.querySelector('input[aria-label="' + BUFFER_LABEL + '"]');
+      if(!input){
+        // no buffer input: click the buttons one by one
+        for(var i=0;i<labels.length;i++){
+          var b = findButtonByLabel(labels.charAt(i)); if(b){ b.click(); }
+        }
+        return;
+      }
+      submissions += 1;
+      // Streamlit commits a text input on blur, so type the burst into the
+      // focused input, blur it and give focus back
+      var previous = doc.activeElement;
+      input.tabIndex = -1;
+      input.focus({preventScroll: true});
+      var setValue = Object.getOwnPropertyDescriptor(win.HTMLInputElement.prototype, 'value').set;
+      setValue.call(input, Date.now() + '.' + submissions + ':' + labels);
+      input.dispatchEvent(new win.Event('input', {bubbles: true}));
+      input.blur();
+      if(previous && previous !== input && previous !== doc.body && previous.focus){
+        try{ previous.focus({preventScroll: true}); }catch(e){}
+      }
+    }
+    function press(label, now){
+      pending += label;
+      if(now || pending.length >= MAX_KEYS){ flush(); return; }
+      if(timer) clearTimeout(timer);
+      timer = setTimeout(flush, IDLE_MS);
+    }
+
+    function onKeyDown(ev){
       try{
+        // ignore our own submissions to the buffer input
+        if(ev.target && ev.target.getAttribute && ev.target.getAttribute('aria-label') === BUFFER_LABEL) return;
+        // leave typing in other inputs (e.g. the history search) alone
+        if(ev.target && (ev.target.tagName === 'INPUT' || ev.target.tagName === 'TEXTAREA' || ev.target.isContentEditable)) return;
         var key = ev.key;
-        var handled = false;
+        var label = null;
         if(/^[0-9]$/.test(key)){
-          var b = findButtonByLabel(key);
-          if(b){ b.click(); handled = true; }
+          label = key;
         } else if(key === '.'){
-          var b = findButtonByLabel('.'); if(b){ b.click(); handled = true; }
+          label = '.';
         } else if(key === '+' || key === '-'){
-          var b = findButtonByLabel(key);
-          if(b){ b.click(); handled = true; }
+          label = key;
         } else if(key === '*'){
-          var b = findButtonByLabel('×'); if(b){ b.click(); handled = true; }
+          label = '×';
         } else if(key === '/'){
-          var b = findButtonByLabel('÷'); if(b){ b.click(); handled = true; }
+          label = '÷';
         } else if(key === '%'){
-          var b = findButtonByLabel('%'); if(b){ b.click(); handled = true; }
+          label = '%';
         } else if(key === 'Enter'){
-          var b = findButtonByLabel('='); if(b){ b.click(); handled = true; }
+          label = '=';
         } else if(key === 'Escape'){
-          var b = findButtonByLabel('C'); if(b){ b.click(); handled = true; }
+          label = 'C';
         } else if(key === 'Backspace'){
-          var b = findButtonByLabel('⌫'); if(b){ b.click(); handled = true; }
+          label = '⌫';
         }
-        if(handled){
+        if(label !== null){
+          // show results right away; everything else waits for the burst to end
+          press(label, label === '=');
           try{ ev.preventDefault(); }catch(e){}
         }
       }catch(e){
         // Avoid spamming console
         console.error('Component:', e);
       }
-    }, true);
+    }
+    // a remounted component replaces the listener of the previous one
+    if(win.__calcKbHandler) win.removeEventListener('keydown', win.__calcKbHandler, true);
+    win.__calcKbHandler = onKeyDown;
+    win.addEventListener('keydown', onKeyDown, true);
   }catch(e){ console.error('Component:', e); }
 })();
-"""
+""".replace('__KEY_BUFFER_LABEL__', _KEY_BUFFER_LABEL).replace(
+    '__KEY_BUFFER_IDLE_MS__', str(KEY_BUFFER_IDLE_MS)
+).replace('__KEY_BUFFER_MAX_KEYS__', str(KEY_BUFFER_MAX_KEYS))
+
+
+def _inject_keyboard_handlers() -> None:
+    """Inject JavaScript that maps physical keyboard events to calculator buttons.
+
+    Keystrokes are coalesced into bursts submitted through the key buffer
+    (see _apply_key_buffer). Defensive: swallow any errors when Streamlit
+    components are not available (tests).
+    """
+    try:
+        # Import components in a try to avoid test failures when fake streamlit lacks components
+        import streamlit.components.v1 as components
+
         # render invisible html so it mounts and registers handlers; height 0 to be unobtrusive
         try:
-            components.html(f"<script>{js}</script>", height=0)
+            components.html(f"<script>{_KEYBOARD_JS}</script>", height=0)
         except Exception as e:
-            try:
-                print('Component:', e)
-            except Exception:
-                pass
+            _errors.report('keyboard_handler_error', e)
     except Exception as e:
-        try:
-            print('Component:', e)
-        except Exception:
-            pass
+        _errors.report('keyboard_handler_error', e)
 
 
+@_metrics.timed("app.render_calculator")
 def render_calculator() -> None:
     """Render a minimal calculator UI using session state and wire inputs.
 
-    Buttons for digits and operators call helper handlers to mutate session state.
+    Buttons are laid out from the static _KEYPAD table and call their
+    handlers through on_click callbacks to mutate session state.
     """
     try:
         _init_session_state()
+        _start_metrics_endpoint()
         _inject_styles()
         # Ensure keyboard handlers are injected so physical keys map to UI buttons
         _inject_keyboard_handlers()
+        _render_key_buffer()
 
-        # Styled Display area: always show current display_value
+        # Display and history: one cached HTML element instead of one per entry
+        panel = _Panel()
         try:
-            disp = st.session_state.get('display_value', '0')
-            st.markdown(f"<div class=\\"calc-display\\">{disp}</div>", unsafe_allow_html=True)
+            panel = _panel()
+            st.markdown(panel.html, unsafe_allow_html=True)
         except Exception as e:
             # Defensive logging similar to existing patterns
-            try:
-                print('Component:', e)
-            except Exception:
-                pass
+            _errors.report('display_render_error', e)
             # fallback to write for compatibility
             try:
-                st.write(st.session_state.get('display_value', '0'))
+                st.write(_state().display_value)
             except Exception:
                 pass
 
         # Hidden backspace button to be clicked by injected JS
         try:
             # This button is hidden via CSS but exists in DOM so JS can click it.
-            try:
-                if st.button('⌫'):
-                    _handle_backspace()
-            except Exception:
-                # If columns API used in test fake, fallback to module-level button
-                try:
-                    if getattr(st, 'button', lambda x: False)('⌫'):
-                        _handle_backspace()
-                except Exception:
-                    pass
+            _keypad_button(st, '⌫', *_BUTTONS['⌫'])
         except Exception as e:
-            try:
-                print('Component:', e)
-            except Exception:
-                pass
+            _errors.report('backspace_click_error', e)
 
-        # Layout buttons in rows using columns to approximate iOS layout
+        # Keypad: each button dispatches straight to its handler via on_click
         try:
-            # Note: The calculator's first/top row intentionally uses a 5-column layout
-            # (st.columns(5)) so that both 'AC' (All Clear) and 'C' (Clear Entry)
-            # appear as separate, distinct buttons. Other digit/operator rows use
-            # a 4-column layout (st.columns(4)). This preserves expected behavior:
-            # - 'AC' -> _clear_state() (resets entire session state)
-            # - 'C'  -> _handle_clear_entry() (clears only the current entry/display)
-            # The rest of the labels in this row are '±', '%', and '÷'.
-            first_row = ['AC', 'C', '±', '%', '÷']
-            cols5 = _safe_columns(5)
-            for i, label in enumerate(first_row):
-                try:
-                    if cols5[i].button(label):
-                        try:
-                            if label == 'AC':
-                                _clear_state()
-                            elif label == 'C':
-                                _handle_clear_entry()
-                            elif label == '±':
-                                _handle_toggle_sign()
-                            elif label == '%':
-                                _handle_percentage()
-                            elif label in {'+', '-', '×', '÷'}:
-                                _handle_operator(label)
-                        except Exception as e:
-                            try:
-                                print('Component:', e)
-                            except Exception:
-                                pass
-                            st.session_state['error_state'] = 'button_click_error'
-                except Exception as e:
-                    try:
-                        print('Component:', e)
-                    except Exception:
-                        pass
-
-            rows = [
-                ['7', '8', '9', '×'],
-                ['4', '5', '6', '-'],
-                ['1', '2', '3', '+'],
-            ]
-
-            for row in rows:
-                cols = _safe_columns(4)
-                for i, label in enumerate(row):
+            for spec, buttons in _KEYPAD:
+                cols = _safe_columns(spec)
+                for col, (label, handler, code) in zip(cols, buttons):
                     try:
-                        if cols[i].button(label):
-                            try:
-                                if label in {'+', '-', '×', '÷'}:
-                                    _handle_operator(label)
-                                else:
-                                    _handle_digit(label)
-                            except Exception as e:
-                                try:
-                                    print('Component:', e)
-                                except Exception:
-                                    pass
-                                st.session_state['error_state'] = 'button_click_error'
+                        _keypad_button(col, label, handler, code)
                     except Exception as e:
-                        try:
-                            print('Component:', e)
-                        except Exception:
-                            pass
-
-            # Last row: make 0 wide by using three columns ratios
-            cols = _safe_columns([2, 1, 1])
-            # 0 spans first (wide)
-            if cols[0].button('0'):
-                try:
-                    _handle_digit('0')
-                except Exception as e:
-                    try:
-                        print('Component:', e)
-                    except Exception:
-                        pass
-                    st.session_state['error_state'] = 'digit_click_error'
-
-            # dot
-            if cols[1].button('.'):
-                try:
-                    _handle_digit('.')
-                except Exception as e:
-                    try:
-                        print('Component:', e)
-                    except Exception:
-                        pass
-                    st.session_state['error_state'] = 'digit_click_error'
-
-            # equals
-            if cols[2].button('='):
-                try:
-                    _perform_calculation()
-                except Exception as e:
-                    try:
-                        print('Component:', e)
-                    except Exception:
-                        pass
-                    st.session_state['error_state'] = 'equals_click_error'
-
+                        _errors.report('button_render_error', e)
         except Exception as e:
-            try:
-                print('Component:', e)
-            except Exception:
-                pass
+            _errors.report('keypad_render_error', e)
 
-        # Render calculation history if present
         try:
-            history = st.session_state.get('calculation_history', [])
-            if history:
-                st.write('History')
-                for item in history:
-                    expr = item.get('expression')
-                    res = item.get('result')
-                    try:
-                        st.write(f"{expr} = {res}")
-                    except Exception:
-                        # best-effort: fallback to writing raw item
-                        try:
-                            st.write(item)
-                        except Exception:
-                            pass
+            if _state().history:
+                _render_history_search(panel)
         except Exception as e:
-            try:
-                print('Component:', e)
-            except Exception:
-                pass
+            _errors.report('history_render_error', e)
+
+        _render_history_io()
 
     except Exception as e:
         # Catch unexpected errors during UI rendering
-        try:
-            print('Component:', e)
-        except Exception:
-            pass
+        _errors.report('render_error', e)
         # try to reflect error in session state
-        try:
-            st.session_state['error_state'] = str(e)
-        except Exception:
-            pass
+        _set_error_state(str(e))
+
+
+def _profiling_requested() -> bool:
+    """Profiling mode is on when CALC_PROFILE is set, or when the page URL has
+    ?profile=1 and the operator has allowed that with CALC_PROFILE_ALLOW."""
+    truthy = {'1', 'true', 'yes', 'on'}
+    if os.environ.get('CALC_PROFILE', '').strip().lower() in truthy:
+        return True
+    if os.environ.get('CALC_PROFILE_ALLOW', '').strip().lower() not in truthy:
+        # any visitor could otherwise serialize reruns behind the profiler
+        return False
+    try:
+        params = getattr(st, 'query_params', None)
+        if params is not None:
+            return str(params.get('profile', '')).strip().lower() in truthy
+    except Exception as e:
+        _errors.report('profile_param_error', e)
+    return False
+
+
+def _render_profile_report(profiler) -> None:
+    """Show the aggregated profile as text, a .prof download and the top allocation sites."""
+    try:
+        if not hasattr(st, 'expander'):
+            return
+        with st.expander(f"Profile ({profiler.runs} reruns)"):
+            st.download_button(
+                'Download profile',
+                data=profiler.profile_bytes(),
+                file_name='calculator.prof',
+                mime='application/octet-stream',
+            )
+            st.text(profiler.allocation_report())
+            st.text(profiler.stats_text())
+    except Exception as e:
+        _errors.report('profile_report_error', e)
+
+
+def main() -> None:
+    """Script entry point: render the calculator, under the profiler in profiling mode."""
+    if _profiling_requested():
+        # imported lazily so normal reruns never load cProfile/tracemalloc
+        from utils.profiling import PROFILER
+
+        PROFILER.run(render_calculator)
+        _render_profile_report(PROFILER)
+    else:
+        render_calculator()
 
 
 if __name__ == "__main__":
     # Only run the UI when executed as a script. Tests should import and
     # explicitly call render_calculator() to exercise UI logic deterministically.
-    render_calculator()
+    main()
@@ -0,0 +1,99 @@
+"""Bulk evaluation of an expression file: decoded text lines vs mmap.
+
+Run from the repository root:
+
+    python -m benchmarks.bulk_file --lines 200000
+"""
+import argparse
+import os
+import random
+import tempfile
+import tracemalloc
+from time import perf_counter
+from typing import Callable, List, Optional, Tuple
+
+import mmap
+
+from utils.bulk import evaluate_file, iter_line_spans
+from utils.parser import evaluate_expression, tokenize, tokenize_bytes
+
+
+def write_rows(path: str, lines: int, seed: int = 0) -> None:
+    rng = random.Random(seed)
+    with open(path, "w", encoding="utf-8") as f:
+        for _ in range(lines):
+            terms = [f"{rng.randint(1, 9999)}.{rng.randint(0, 99)}" for _ in range(rng.randint(2, 8))]
+            f.write(f" {rng.choice('+-*/')} ".join(terms) + "\n")
+
+
+def text_lines(path: str) -> int:
+    """The baseline: read the file as text and evaluate each decoded line."""
+    with open(path, encoding="utf-8") as f:
+        rows = f.read().splitlines()
+    count = 0
+    for row in rows:
+        if row.strip():
+            try:
+                evaluate_expression(row)
+            except ValueError:
+                pass
+            count += 1
+    return count
+
+
+def mmap_lines(path: str) -> int:
+    return sum(1 for _ in evaluate_file(path))
+
+
+def text_tokenize(path: str) -> int:
+    with open(path, encoding="utf-8") as f:
+        rows = f.read().splitlines()
+    return sum(1 for row in rows if tokenize(row))
+
+
+def mmap_tokenize(path: str) -> int:
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        return sum(1 for start, end in iter_line_spans(data) if tokenize_bytes(data, start, end))
+
+
+def measure(func: Callable[[str], int], path: str) -> Tuple[int, float, int]:
+    """Return (lines, seconds, peak traced bytes) for one pass of func over path."""
+    tracemalloc.start()
+    started = perf_counter()
+    count = func(path)
+    elapsed = perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return count, elapsed, peak
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    arg_parser = argparse.ArgumentParser(description="Compare bulk evaluation of a file via text lines and mmap")
+    arg_parser.add_argument("--lines", type=int, default=200_000)
+    arg_parser.add_argument("--seed", type=int, default=0)
+    args = arg_parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "rows.txt")
+        write_rows(path, args.lines, args.seed)
+        size = os.path.getsize(path)
+        print(f"file: {args.lines:,} lines, {size / 1e6:.1f} MB")
+        passes = (
+            ("tokenize, text lines", text_tokenize),
+            ("tokenize, mmap", mmap_tokenize),
+            ("evaluate, text lines", text_lines),
+            ("evaluate, mmap", mmap_lines),
+        )
+        for name, func in passes:
+            # best of three untraced passes, then one traced pass for the memory peak
+            elapsed = float("inf")
+            for _ in range(3):
+                started = perf_counter()
+                count = func(path)
+                elapsed = min(elapsed, perf_counter() - started)
+            _, _, peak = measure(func, path)
+            print(f"{name:>20}: {count / elapsed:>10,.0f} lines/s {size / elapsed / 1e6:>6.1f} MB/s  peak {peak / 1e6:>7.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""Repeated evaluation: RPN interpreter vs slot evaluation vs generated code.
+
+Run from the repository root:
+
+    python -m benchmarks.codegen --terms 5 50 500
+"""
+import argparse
+import random
+import timeit
+from typing import List, Optional
+
+from utils.compiled import compile_expression
+from utils.parser import evaluate_rpn, to_rpn, tokenize
+
+
+def random_expression(rng: random.Random, terms: int) -> str:
+    parts = [str(rng.randint(1, 999))]
+    for _ in range(terms - 1):
+        parts.append(rng.choice("+-*/"))
+        parts.append(f"{rng.randint(1, 999)}.{rng.randint(0, 99)}")
+    return " ".join(parts)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    arg_parser = argparse.ArgumentParser(description="Compare evaluation backends for repeated evaluation")
+    arg_parser.add_argument("--terms", type=int, nargs="+", default=[5, 50, 500])
+    arg_parser.add_argument("--seed", type=int, default=0)
+    args = arg_parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    print(f"{'terms':>6} {'evaluate_rpn':>14} {'slots':>14} {'codegen':>14} {'speedup':>8} {'build':>10}")
+    for terms in args.terms:
+        expression = random_expression(rng, terms)
+        rpn = to_rpn(tokenize(expression))
+        compiled = compile_expression(expression)
+        build = min(timeit.repeat(lambda: compile_expression(expression).function, number=1, repeat=5))
+        function = compiled.function
+        assert function() == evaluate_rpn(rpn)
+
+        number = max(1, 20000 // terms)
+        timings = [
+            min(timeit.repeat(call, number=number, repeat=5)) / number
+            for call in (lambda: evaluate_rpn(rpn), compiled.evaluate, function)
+        ]
+        print(
+            f"{terms:>6} {timings[0] * 1e6:>11.1f} us {timings[1] * 1e6:>11.1f} us {timings[2] * 1e6:>11.1f} us"
+            f" {timings[0] / timings[2]:>7.1f}x {build * 1e6:>7.0f} us"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""Throughput of the keypad engine: key events applied per second.
+
+Run from the repository root:
+
+    python -m benchmarks.engine_events --events 1000000
+"""
+import argparse
+import random
+from time import perf_counter
+from typing import List, Optional
+
+from benchmarks.load_sessions import click_sequence
+from utils import engine
+from utils.state import CalculatorState
+
+
+def events_per_second(events: List[str]) -> float:
+    """Apply events to one state with engine.run and return the event rate."""
+    state = CalculatorState()
+    started = perf_counter()
+    engine.run(events, state)
+    elapsed = perf_counter() - started
+    return len(events) / elapsed if elapsed else 0.0
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    arg_parser = argparse.ArgumentParser(description="Measure keypad engine throughput")
+    arg_parser.add_argument("--events", type=int, default=1_000_000)
+    arg_parser.add_argument("--seed", type=int, default=0)
+    args = arg_parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    mixes = {
+        # AC every 10 events keeps the inputs and the history short
+        "digits only": ["AC" if i % 10 == 9 else rng.choice("0123456789") for i in range(args.events)],
+        "keypad mix": [
+            "AC" if i % 10 == 9 else label for i, label in enumerate(click_sequence(rng, args.events))
+        ],
+    }
+    for name, events in mixes.items():
+        print(f"{name:>12}: {events_per_second(events):>12,.0f} events/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Money-style expressions through try_evaluate: the fixed-point fast path vs Decimal.
+
+Rows are integers and two-decimal amounts joined by + - * /, with the
+given number of terms each. The fast path only takes two-term rows; longer
+ones show what checking for it costs. Each workload runs with the fast path
+on and with it switched off, and the formatted results must be identical.
+
+Run from the repository root:
+
+    python -m benchmarks.fixed_point --rows 20000
+"""
+import argparse
+import random
+import time
+from typing import Callable, List, Optional
+
+from utils import parser
+from utils.calculator import format_result
+
+_ENABLED = parser._FIXED_ENABLED
+
+
+def money_rows(rng: random.Random, rows: int, terms: int) -> List[str]:
+    result = []
+    for _ in range(rows):
+        parts = []
+        for i in range(terms):
+            if i:
+                parts.append(rng.choice("+-*/"))
+            if rng.random() < 0.5:
+                parts.append(str(rng.randint(1, 999)))
+            else:
+                parts.append(f"{rng.randint(0, 9999)}.{rng.randint(0, 99):02d}")
+        result.append(" ".join(parts))
+    return result
+
+
+def try_evaluate_rows(rows: List[str]) -> List[str]:
+    return [format_result(r.value) if r.ok else r.code for r in map(parser.try_evaluate, rows)]
+
+
+def best_of(func: Callable, rows: List[str], runs: int) -> List[float]:
+    """Best time of func(rows) with the fast path off and on; the two modes
+    alternate within each run so that machine noise affects both alike."""
+    best = [float("inf"), float("inf")]
+    for _ in range(runs):
+        for mode, enabled in enumerate((False, True)):
+            parser._FIXED_ENABLED = enabled
+            start = time.perf_counter()
+            func(rows)
+            best[mode] = min(best[mode], time.perf_counter() - start)
+    parser._FIXED_ENABLED = _ENABLED
+    return best
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    arg_parser = argparse.ArgumentParser(description="Compare the fixed-point fast path with Decimal evaluation")
+    arg_parser.add_argument("--rows", type=int, default=20000)
+    arg_parser.add_argument("--terms", type=int, nargs="+", default=[2, 3, 5])
+    arg_parser.add_argument("--seed", type=int, default=0)
+    arg_parser.add_argument("--runs", type=int, default=5)
+    args = arg_parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    print(f"{'terms':>6} {'Decimal rows/s':>15} {'fixed-point rows/s':>19} {'speedup':>8}")
+    for terms in args.terms:
+        rows = money_rows(rng, args.rows, terms)
+        outputs = []
+        for enabled in (False, True):
+            parser._FIXED_ENABLED = enabled
+            outputs.append(try_evaluate_rows(rows))
+        parser._FIXED_ENABLED = _ENABLED
+        assert outputs[0] == outputs[1], "fast path changed formatted results"
+        rates = [len(rows) / seconds for seconds in best_of(try_evaluate_rows, rows, args.runs)]
+        print(f"{terms:>6} {rates[0]:>15,.0f} {rates[1]:>19,.0f} {rates[1] / rates[0]:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+import importlib
+import sys
+import threading
+import types
+from typing import Dict, Iterable, Optional, Set
+
+__all__ = ["SessionStreamlit", "SimulatedSession", "load_app", "deep_sizeof"]
+
+
+class SimulatedSession:
+    """One simulated browser session: its session state and the button pressed next."""
+
+    __slots__ = ("session_state", "click")
+
+    def __init__(self) -> None:
+        self.session_state: Dict = {}
+        self.click: Optional[str] = None
+
+
+class SessionStreamlit(types.ModuleType):
+    """Minimal Streamlit stand-in for driving app.render_calculator outside a browser.
+
+    Like Streamlit, st.session_state resolves to the session whose script is
+    running on the current thread; activate() selects it. A rerun presses at
+    most one button, as a real click does.
+    """
+
+    def __init__(self) -> None:
+        super().__init__("streamlit")
+        self._local = threading.local()
+
+    def activate(self, session: SimulatedSession) -> None:
+        self._local.session = session
+
+    @property
+    def session_state(self) -> Dict:
+        return self._local.session.session_state
+
+    def set_page_config(self, **kwargs) -> None:
+        pass
+
+    def write(self, *args, **kwargs) -> None:
+        pass
+
+    def markdown(self, *args, **kwargs) -> None:
+        pass
+
+    def button(self, label, on_click=None, args=(), **kwargs) -> bool:
+        session = self._local.session
+        if session.click == label:
+            session.click = None
+            if on_click is not None:
+                on_click(*args)
+            return True
+        return False
+
+
+def load_app(fake: types.ModuleType):
+    """Import a fresh app module bound to fake as its streamlit module."""
+    sys.modules.pop("app", None)
+    sys.modules["streamlit"] = fake
+    return importlib.import_module("app")
+
+
+def _iter_slots(obj) -> Iterable[str]:
+    for cls in type(obj).__mro__:
+        slots = getattr(cls, "__slots__", ())
+        yield from ((slots,) if isinstance(slots, str) else slots)
+
+
+def deep_sizeof(obj, _seen: Optional[Set[int]] = None) -> int:
+    """Approximate retained size in bytes of obj and everything it references.
+
+    Follows dicts, sequences, sets and __slots__/__dict__ attributes; shared
+    objects are counted once.
+    """
+    if _seen is None:
+        _seen = set()
+    if id(obj) in _seen:
+        return 0
+    _seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        for key, value in obj.items():
+            size += deep_sizeof(key, _seen) + deep_sizeof(value, _seen)
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        for item in obj:
+            size += deep_sizeof(item, _seen)
+    elif not isinstance(obj, (str, bytes, int, float, bool, type(None))):
+        for name in _iter_slots(obj):
+            if hasattr(obj, name):
+                size += deep_sizeof(getattr(obj, name), _seen)
+        if hasattr(obj, "__dict__"):
+            size += deep_sizeof(vars(obj), _seen)
+    return size
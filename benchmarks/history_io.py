@@ -0,0 +1,110 @@
+"""History export/import of a long session: streamed chunks vs whole-payload.
+
+Run from the repository root:
+
+    python -m benchmarks.history_io --entries 100000
+"""
+import argparse
+import csv
+import io
+import json
+import random
+import tracemalloc
+from time import perf_counter
+from typing import Callable, List, Optional, Tuple
+
+from utils.calculator import format_result
+from utils.history_io import IMPORT_BATCH_ROWS, iter_export, iter_import
+from utils.parser import evaluate_expression
+
+Entry = Tuple[str, str]
+
+
+def make_history(entries: int, seed: int = 0) -> List[Entry]:
+    rng = random.Random(seed)
+    history = []
+    for _ in range(entries):
+        prev, curr = f"{rng.randint(1, 99999)}.{rng.randint(0, 99)}", str(rng.randint(1, 999))
+        op, parser_op = rng.choice([("+", "+"), ("-", "-"), ("×", "*"), ("÷", "/")])
+        history.append((f"{prev} {op} {curr}", format_result(evaluate_expression(f"{prev} {parser_op} {curr}"))))
+    return history
+
+
+def export_whole(history: List[Entry], fmt: str) -> int:
+    """Baseline: build the complete payload as one string, then encode it."""
+    if fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
+        writer.writerow(("expression", "result"))
+        writer.writerows(history)
+        payload = buffer.getvalue()
+    else:
+        payload = "".join(json.dumps({"expression": e, "result": r}, ensure_ascii=False) + "\n" for e, r in history)
+    return len(payload.encode("utf-8"))
+
+
+def export_streamed(history: List[Entry], fmt: str) -> int:
+    # consume chunk by chunk, as a response body or file writer would
+    return sum(len(chunk) for chunk in iter_export(history, fmt))
+
+
+def import_whole(data: bytes, fmt: str) -> int:
+    """Baseline: decode the whole upload and parse every row before evaluating any."""
+    text = data.decode("utf-8")
+    if fmt == "csv":
+        rows = [(row["expression"], row["result"]) for row in csv.DictReader(io.StringIO(text))]
+    else:
+        rows = [(row["expression"], row["result"]) for row in map(json.loads, text.splitlines())]
+    entries = []
+    for expression, _ in rows:
+        try:
+            value = evaluate_expression(expression.replace("×", "*").replace("÷", "/"))
+        except ValueError:
+            continue
+        entries.append((expression, format_result(value)))
+    return len(entries)
+
+
+def import_batched(data: bytes, fmt: str) -> int:
+    # each batch would be appended to the session's history and released
+    return sum(len(batch.entries) for batch in iter_import(io.BytesIO(data), fmt, IMPORT_BATCH_ROWS))
+
+
+def measure(func: Callable, *args) -> Tuple[float, int]:
+    """Return (seconds, peak traced bytes) of one call, the time being the best of three."""
+    elapsed = float("inf")
+    for _ in range(3):
+        started = perf_counter()
+        func(*args)
+        elapsed = min(elapsed, perf_counter() - started)
+    tracemalloc.start()
+    func(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    arg_parser = argparse.ArgumentParser(description="Measure history export and import of a long session")
+    arg_parser.add_argument("--entries", type=int, default=100_000)
+    arg_parser.add_argument("--seed", type=int, default=0)
+    args = arg_parser.parse_args(argv)
+
+    history = make_history(args.entries, args.seed)
+    print(f"history: {len(history):,} entries")
+    for fmt in ("csv", "jsonl"):
+        data = b"".join(iter_export(history, fmt))
+        assert import_batched(data, fmt) == import_whole(data, fmt) == len(history)
+        passes = (
+            ("export, whole payload", export_whole, history),
+            ("export, streamed", export_streamed, history),
+            ("import, whole file", import_whole, data),
+            ("import, batched", import_batched, data),
+        )
+        for name, func, source in passes:
+            elapsed, peak = measure(func, source, fmt)
+            print(f"{fmt:>5} {name:>22}: {len(history) / elapsed:>10,.0f} entries/s  peak {peak / 1e6:>7.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""History search over a long session: HistoryIndex vs scanning every entry.
+
+Run from the repository root:
+
+    python -m benchmarks.history_search --entries 50000
+"""
+import argparse
+from decimal import Decimal, InvalidOperation
+from time import perf_counter
+from typing import Callable, List, Optional, Tuple
+
+from benchmarks.history_io import make_history
+from utils.history_index import HistoryIndex, parse_range
+
+# matches the app lists per search
+LIMIT = 100
+
+Entry = Tuple[str, str]
+
+# substring queries of growing selectivity, and result ranges
+QUERIES = ("7", "12", "× 3", "123.4", "99999.9", "÷ 512", "1..2", "10000..10100", "..-99999")
+
+
+def scan(history: List[Entry], query: str) -> List[int]:
+    """Baseline: test every entry, as the history list did before the index."""
+    bounds = parse_range(query)
+    if bounds is None:
+        text = query.strip().lower()
+        return [i for i, (expression, _) in enumerate(history) if text in expression.lower()]
+    low, high = bounds
+    matches = []
+    for i, (_, result) in enumerate(history):
+        try:
+            value = Decimal(result)
+        except InvalidOperation:
+            continue
+        if (low is None or value >= low) and (high is None or value <= high):
+            matches.append((value, i))
+    return [i for _, i in sorted(matches)]
+
+
+def best_of(func: Callable, *args, runs: int = 5) -> float:
+    elapsed = float("inf")
+    for _ in range(runs):
+        started = perf_counter()
+        func(*args)
+        elapsed = min(elapsed, perf_counter() - started)
+    return elapsed
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    arg_parser = argparse.ArgumentParser(description="Measure history search with and without the index")
+    arg_parser.add_argument("--entries", type=int, default=50_000)
+    arg_parser.add_argument("--seed", type=int, default=0)
+    args = arg_parser.parse_args(argv)
+
+    history = make_history(args.entries, args.seed)
+    print(f"history: {len(history):,} entries")
+    index = HistoryIndex()
+    build = best_of(lambda: HistoryIndex().sync(history), runs=1)
+    index.sync(history)
+    # new calculations, each synced when '=' is pressed
+    started = perf_counter()
+    for entry in history[:100]:
+        history.append(entry)
+        index.sync(history)
+    append = (perf_counter() - started) / 100
+    print(f"index build: {build * 1e3:.0f} ms, sync after each new entry: {append * 1e6:.1f} us")
+    for query in QUERIES:
+        matches = index.search(query)
+        assert matches == scan(history, query), query
+        assert index.count(query) == len(matches) and index.search(query, LIMIT) == matches[:LIMIT], query
+        # what a search rerun does: count the matches and list the first LIMIT
+        indexed = best_of(lambda: (index.count(query), index.search(query, LIMIT)))
+        scanned = best_of(scan, history, query)
+        print(
+            f"{query!r:>16}: {len(matches):>6} matches  scan {scanned * 1e3:>8.2f} ms  "
+            f"index {indexed * 1e3:>8.3f} ms  ({scanned / indexed:>6.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Server reruns for typed input: one per keystroke vs coalesced bursts.
+
+Simulates the flush policy of the app's keyboard JS (idle timeout, burst
+size cap, '=' flushes at once) over synthetic typing sessions.
+
+Run from the repository root:
+
+    python -m benchmarks.keystroke_coalescing --expressions 1000 --interval-ms 90
+"""
+import argparse
+import random
+from typing import List, Optional, Sequence, Tuple
+
+# defaults of app.KEY_BUFFER_IDLE_MS and app.KEY_BUFFER_MAX_KEYS (app.py needs streamlit)
+IDLE_MS = 250
+MAX_KEYS = 64
+
+# (milliseconds since the previous key, button label)
+Keystroke = Tuple[float, str]
+
+
+def typing_session(rng: random.Random, expressions: int, interval_ms: float) -> List[Keystroke]:
+    """Keystrokes for expressions like '1250*3.5=' with think time between them."""
+    keys: List[Keystroke] = []
+    for _ in range(expressions):
+        text = f"{rng.randint(1, 99999)}{rng.choice('+-×÷')}{rng.randint(1, 999)}"
+        if rng.random() < 0.3:
+            text += f".{rng.randint(1, 99)}"
+        # pause to think, then type at roughly the given pace
+        keys.append((rng.uniform(400, 2000), text[0]))
+        keys.extend((rng.uniform(0.5, 1.5) * interval_ms, label) for label in text[1:])
+        keys.append((rng.uniform(0.5, 1.5) * interval_ms, "="))
+    return keys
+
+
+def coalesced_submissions(keys: Sequence[Keystroke], idle_ms: float = IDLE_MS, max_keys: int = MAX_KEYS) -> int:
+    """Number of bursts (and so reruns) the keyboard JS would submit."""
+    submissions = 0
+    pending = 0
+    for gap, label in keys:
+        if pending and gap >= idle_ms:
+            # the idle timer fired before this key
+            submissions += 1
+            pending = 0
+        pending += 1
+        if label == "=" or pending >= max_keys:
+            submissions += 1
+            pending = 0
+    return submissions + (1 if pending else 0)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    arg_parser = argparse.ArgumentParser(description="Compare reruns for per-key vs coalesced keyboard input")
+    arg_parser.add_argument("--expressions", type=int, default=1000)
+    arg_parser.add_argument("--interval-ms", type=float, nargs="+", default=[60.0, 90.0, 140.0])
+    arg_parser.add_argument("--idle-ms", type=float, default=IDLE_MS)
+    arg_parser.add_argument("--max-keys", type=int, default=MAX_KEYS)
+    arg_parser.add_argument("--seed", type=int, default=0)
+    args = arg_parser.parse_args(argv)
+
+    print(f"{'key gap ms':>10} {'keys':>8} {'reruns':>8} {'per key':>8}")
+    for interval in args.interval_ms:
+        keys = typing_session(random.Random(args.seed), args.expressions, interval)
+        reruns = coalesced_submissions(keys, args.idle_ms, args.max_keys)
+        print(f"{interval:>10.0f} {len(keys):>8,} {reruns:>8,} {len(keys) / reruns:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
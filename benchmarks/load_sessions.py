@@ -0,0 +1,131 @@
+"""Load generator: many concurrent simulated calculator sessions.
+
+Run from the repository root:
+
+    python -m benchmarks.load_sessions --sessions 300 --clicks 50 --threads 8
+"""
+import argparse
+import io
+import random
+import threading
+from time import perf_counter
+from typing import List, NamedTuple, Optional, Sequence
+
+from benchmarks.harness import SessionStreamlit, SimulatedSession, deep_sizeof, load_app
+
+DIGITS = ["0", "1", "2", "3", "4", "5", "6", "7", "8", "9"]
+OPERATORS = ["+", "-", "×", "÷"]
+
+# (labels, relative weight) approximating real keypad usage
+CLICK_MIX = [
+    (DIGITS, 60),
+    (OPERATORS, 15),
+    (["="], 10),
+    (["."], 4),
+    (["AC"], 3),
+    (["C"], 2),
+    (["%"], 3),
+    (["±"], 3),
+]
+
+
+class LoadReport(NamedTuple):
+    sessions: int
+    reruns: int
+    seconds: float
+    throughput: float  # reruns per second
+    p50_ms: float
+    p99_ms: float
+    bytes_per_session: float
+
+
+def click_sequence(rng: random.Random, length: int) -> List[str]:
+    """Return a random but plausible sequence of button labels."""
+    groups = [labels for labels, _ in CLICK_MIX]
+    weights = [weight for _, weight in CLICK_MIX]
+    return [rng.choice(rng.choices(groups, weights)[0]) for _ in range(length)]
+
+
+def _percentile(sorted_values: Sequence[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def run_load(sessions: int = 200, clicks: int = 50, threads: int = 8, seed: int = 0) -> LoadReport:
+    """Drive render_calculator for every session, one click per rerun.
+
+    Sessions are spread over threads (as Streamlit runs each session's script
+    on its own thread) and interleaved click by click.
+    """
+    from utils import error_log
+
+    # keep app error reporting realistic but off the terminal
+    error_log.configure(stream=io.StringIO())
+
+    fake = SessionStreamlit()
+    app = load_app(fake)
+    rng = random.Random(seed)
+    simulated = [SimulatedSession() for _ in range(sessions)]
+    scripts = [click_sequence(rng, clicks) for _ in range(sessions)]
+    latencies: List[List[float]] = [[] for _ in range(threads)]
+
+    def worker(index: int) -> None:
+        owned = range(index, sessions, threads)
+        timings = latencies[index]
+        # the first rerun of a session initializes its state, like opening the page
+        for step in range(-1, clicks):
+            for s in owned:
+                session = simulated[s]
+                fake.activate(session)
+                session.click = scripts[s][step] if step >= 0 else None
+                start = perf_counter()
+                app.render_calculator()
+                timings.append(perf_counter() - start)
+
+    pool = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    started = perf_counter()
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    elapsed = perf_counter() - started
+    error_log.shutdown()
+
+    all_latencies = sorted(t for per_thread in latencies for t in per_thread)
+    reruns = len(all_latencies)
+    memory = sum(deep_sizeof(session.session_state) for session in simulated)
+    return LoadReport(
+        sessions=sessions,
+        reruns=reruns,
+        seconds=elapsed,
+        throughput=reruns / elapsed if elapsed else 0.0,
+        p50_ms=_percentile(all_latencies, 0.50) * 1000,
+        p99_ms=_percentile(all_latencies, 0.99) * 1000,
+        bytes_per_session=memory / sessions if sessions else 0.0,
+    )
+
+
+def format_report(report: LoadReport) -> str:
+    return (
+        f"sessions:          {report.sessions}\n"
+        f"reruns:            {report.reruns} in {report.seconds:.2f}s\n"
+        f"throughput:        {report.throughput:,.0f} reruns/s\n"
+        f"rerun latency:     p50 {report.p50_ms:.3f} ms, p99 {report.p99_ms:.3f} ms\n"
+        f"session state:     {report.bytes_per_session:,.0f} bytes/session\n"
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    arg_parser = argparse.ArgumentParser(description="Simulate concurrent calculator sessions")
+    arg_parser.add_argument("--sessions", type=int, default=200)
+    arg_parser.add_argument("--clicks", type=int, default=50, help="clicks (reruns) per session")
+    arg_parser.add_argument("--threads", type=int, default=8)
+    arg_parser.add_argument("--seed", type=int, default=0)
+    args = arg_parser.parse_args(argv)
+    print(format_report(run_load(args.sessions, args.clicks, args.threads, args.seed)), end="")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Display and history rendering per rerun: one element per entry vs the cached panel.
+
+Streamlit turns every st.write/st.markdown call into an element delta that it
+serializes and sends on each rerun. This counts the elements and bytes the
+display and history produce per rerun, and times producing them, for
+sessions with a growing history. Reruns alternate between a digit click
+(the display changes) and an unchanged rerun.
+
+Run from the repository root:
+
+    python -m benchmarks.render_panel --history 10 100 1000
+"""
+import argparse
+from time import perf_counter
+from typing import List, Optional, Tuple
+
+from benchmarks.harness import SessionStreamlit, SimulatedSession, load_app
+
+
+class CountingStreamlit(SessionStreamlit):
+    """SessionStreamlit that counts element calls and their payload size."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.elements = 0
+        self.payload = 0
+
+    def write(self, *args, **kwargs) -> None:
+        self.elements += 1
+        self.payload += sum(len(str(arg)) for arg in args)
+
+    def markdown(self, body, **kwargs) -> None:
+        self.elements += 1
+        self.payload += len(body)
+
+
+def render_per_entry(fake, state) -> None:
+    """Baseline: the display as one markdown element, then one write per history entry."""
+    fake.markdown(f"<div class=\"calc-display\">{state.display_value}</div>", unsafe_allow_html=True)
+    if state.history:
+        fake.write('History')
+        for expr, res in state.history:
+            fake.write(f"{expr} = {res}")
+
+
+def measure(history: int, reruns: int) -> List[Tuple[str, float, float, float]]:
+    """(approach, elements/rerun, payload bytes/rerun, us/rerun) for a session with history entries."""
+    fake = CountingStreamlit()
+    app = load_app(fake)
+    session = SimulatedSession()
+    fake.activate(session)
+    app._init_session_state()
+    state = app._state()
+    entries = [(f'{i} × 1.5', f'{i * 1.5:g}') for i in range(history)]
+
+    def panel() -> None:
+        fake.markdown(app._panel().html, unsafe_allow_html=True)
+
+    results = []
+    for name, render in (('per entry', lambda: render_per_entry(fake, state)), ('cached panel', panel)):
+        fake.elements = fake.payload = 0
+        app._clear_state()
+        state.history.extend(entries)
+        elapsed = 0.0
+        for rerun in range(reruns):
+            if rerun % 2:
+                app._handle_digit(str(rerun % 10))
+            started = perf_counter()
+            render()
+            elapsed += perf_counter() - started
+        results.append((name, fake.elements / reruns, fake.payload / reruns, elapsed / reruns * 1e6))
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    arg_parser = argparse.ArgumentParser(description="Measure display/history rendering per rerun")
+    arg_parser.add_argument("--history", type=int, nargs="+", default=[10, 100, 1000])
+    arg_parser.add_argument("--reruns", type=int, default=200)
+    args = arg_parser.parse_args(argv)
+    for history in args.history:
+        for name, elements, payload, us in measure(history, args.reruns):
+            print(f"history {history:>6}  {name:>12}: {elements:>7.1f} elements  {payload:>10,.0f} bytes  {us:>9.1f} us per rerun")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Replay speed: recorded keypresses pushed through utils.replay per second.
+
+Run from the repository root:
+
+    python -m benchmarks.replay_events --keys 1000000
+"""
+import argparse
+import random
+from time import perf_counter
+from typing import List, Optional
+
+from utils.replay import replay
+
+# keyboard keys approximating real typing, plus keys the calculator ignores
+KEY_MIX = [
+    (list("0123456789"), 60),
+    (["+", "-", "*", "/"], 15),
+    (["Enter"], 10),
+    (["."], 4),
+    (["Escape"], 2),
+    (["Backspace"], 3),
+    (["%"], 3),
+    (["Shift", "Tab"], 3),
+]
+
+
+def key_log(rng: random.Random, length: int) -> List[str]:
+    groups = [keys for keys, _ in KEY_MIX]
+    weights = [weight for _, weight in KEY_MIX]
+    return [rng.choice(rng.choices(groups, weights)[0]) for _ in range(length)]
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    arg_parser = argparse.ArgumentParser(description="Measure key log replay throughput")
+    arg_parser.add_argument("--keys", type=int, default=1_000_000)
+    arg_parser.add_argument("--session-length", type=int, default=50, help="keys per replayed session")
+    arg_parser.add_argument("--seed", type=int, default=0)
+    args = arg_parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    sessions = max(1, args.keys // args.session_length)
+    logs = [key_log(rng, args.session_length) for _ in range(sessions)]
+
+    started = perf_counter()
+    results = [replay(log) for log in logs]
+    elapsed = perf_counter() - started
+    keys = sessions * args.session_length
+    print(f"sessions:   {sessions:,} x {args.session_length} keys")
+    print(f"replayed:   {keys:,} keys in {elapsed:.2f}s ({keys / elapsed:,.0f} keys/s)")
+    print(f"history:    {sum(len(r.history) for r in results):,} calculations")
+    print(f"failures:   {sum(r.failures for r in results):,} handled, {sum(r.errors for r in results):,} unexpected")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""Throughput of the launcher's proxy as the number of worker processes grows.
+
+Each worker is a stand-in for a Streamlit process: an HTTP server whose
+requests each run one simulated session (a rerun of app.render_calculator
+per click, as in benchmarks/load_sessions.py) on its threads, under its own
+GIL. Clients are separate browsers, pinned to workers by the launcher.
+
+Run from the repository root:
+
+    python -m benchmarks.scaling --workers 1 2 4 8 16 --clients 32
+"""
+import argparse
+import asyncio
+import http.client
+import io
+import random
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from time import perf_counter
+from typing import List, Optional
+
+from benchmarks.harness import SessionStreamlit, SimulatedSession, load_app
+from benchmarks.load_sessions import click_sequence
+from launcher import Launcher, Worker
+
+# clicks (reruns) per request
+CLICKS = 20
+
+
+def serve_worker(port: int) -> None:
+    """Stand-in worker: /_stcore/health answers ok, any other GET runs one simulated session."""
+    from utils import error_log
+
+    error_log.configure(stream=io.StringIO())
+    fake = SessionStreamlit()
+    app = load_app(fake)
+    rng = random.Random(port)
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self) -> None:
+            if self.path != "/_stcore/health":
+                session = SimulatedSession()
+                fake.activate(session)
+                for click in [None, *click_sequence(rng, CLICKS)]:
+                    session.click = click
+                    app.render_calculator()
+            body = b"ok"
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args) -> None:
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    server.daemon_threads = True
+    server.serve_forever()
+
+
+def _client(port: int, deadline: float, counts: List[int], index: int) -> None:
+    """One browser: a keep-alive connection, reusing the worker cookie it was given."""
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+    cookie = None
+    while perf_counter() < deadline:
+        connection.request("GET", "/rerun", headers={"Cookie": cookie} if cookie else {})
+        response = connection.getresponse()
+        response.read()
+        cookie = (response.getheader("Set-Cookie") or "").split(";")[0] or cookie
+        counts[index] += 1
+    connection.close()
+
+
+def measure(workers: int, clients: int, seconds: float, first_port: int) -> float:
+    """Sessions per second through the launcher with workers stand-in processes."""
+
+    async def scenario() -> float:
+        pool = [
+            Worker(i, first_port + i, [sys.executable, "-m", "benchmarks.scaling", "--serve-worker", str(first_port + i)])
+            for i in range(workers)
+        ]
+        launcher = Launcher(pool, host="127.0.0.1", port=0, health_interval=0.2)
+        await launcher.start()
+        try:
+            while not all(w.healthy for w in pool):
+                await asyncio.sleep(0.1)
+            counts = [0] * clients
+            deadline = perf_counter() + seconds
+            threads = [threading.Thread(target=_client, args=(launcher.port, deadline, counts, i)) for i in range(clients)]
+            started = perf_counter()
+            for thread in threads:
+                thread.start()
+            # the proxy runs on this loop while the clients wait on it
+            while any(thread.is_alive() for thread in threads):
+                await asyncio.sleep(0.05)
+            return sum(counts) / (perf_counter() - started)
+        finally:
+            await launcher.close()
+
+    return asyncio.run(scenario())
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    arg_parser = argparse.ArgumentParser(description="Measure throughput scaling with the launcher's worker count")
+    arg_parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    arg_parser.add_argument("--clients", type=int, default=16, help="concurrent browsers")
+    arg_parser.add_argument("--seconds", type=float, default=5.0, help="load duration per worker count")
+    arg_parser.add_argument("--first-port", type=int, default=8700)
+    arg_parser.add_argument("--serve-worker", type=int, metavar="PORT", help=argparse.SUPPRESS)
+    args = arg_parser.parse_args(argv)
+    if args.serve_worker is not None:
+        serve_worker(args.serve_worker)
+        return
+
+    baseline = None
+    for workers in args.workers:
+        rate = measure(workers, args.clients, args.seconds, args.first_port)
+        baseline = baseline or rate
+        print(
+            f"{workers:>3} workers: {rate:>8,.1f} sessions/s ({rate * (CLICKS + 1):>9,.0f} reruns/s)  "
+            f"speedup {rate / baseline:>5.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""Per-session memory of calculator state: legacy per-key layout vs CalculatorState.
+
+Run from the repository root:
+
+    python -m benchmarks.session_footprint --history 0 10 100
+"""
+import argparse
+from typing import Dict, List, Optional, Tuple
+
+from benchmarks.harness import deep_sizeof
+from utils.state import CalculatorState
+
+
+def legacy_session(history: int) -> Dict:
+    """A typical mid-calculation session in the old seven-key layout."""
+    return {
+        'current_input': '1250.5',
+        'previous_value': '',
+        'operator': None,
+        'waiting_for_operand': False,
+        'display_value': '1250.5',
+        'calculation_history': [
+            {'expression': f'{i} + 0.5', 'result': f'{i}.5'} for i in range(history)
+        ],
+        'error_state': None,
+    }
+
+
+def measure(history: int) -> Tuple[int, int]:
+    """Return (legacy bytes, CalculatorState bytes) for a session with history entries."""
+    legacy = legacy_session(history)
+    state = CalculatorState.from_mapping(legacy)
+    return deep_sizeof(legacy), deep_sizeof(state)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    arg_parser = argparse.ArgumentParser(description="Compare per-session state footprint")
+    arg_parser.add_argument("--history", type=int, nargs="+", default=[0, 10, 100, 1000])
+    args = arg_parser.parse_args(argv)
+    print(f"{'history':>8} {'legacy B':>10} {'state B':>10} {'saved':>7}")
+    for entries in args.history:
+        legacy, compact = measure(entries)
+        print(f"{entries:>8} {legacy:>10,} {compact:>10,} {1 - compact / legacy:>7.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""Cold start: import time of app.py and Streamlit time to first response.
+
+Run from the repository root:
+
+    python -m benchmarks.startup --runs 10
+    python -m benchmarks.startup --serve   # needs streamlit installed
+
+Import time is measured with python -X importtime in fresh interpreters,
+with a stand-in streamlit module so only this project's imports count.
+--serve launches "streamlit run app.py" directly and times how long the
+server takes to answer its health check and serve the page.
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+from typing import Dict, List, Optional, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# import app with a minimal stand-in for streamlit
+IMPORT_APP = (
+    "import sys, types\n"
+    "st = types.ModuleType('streamlit')\n"
+    "st.set_page_config = lambda **kwargs: None\n"
+    "st.session_state = {}\n"
+    "sys.modules['streamlit'] = st\n"
+    "import app\n"
+)
+
+# target for the median cumulative import time of app.py (stand-in streamlit)
+IMPORT_TARGET_MS = 100.0
+# target for streamlit run to answer /_stcore/health and serve the page
+FIRST_RESPONSE_TARGET_S = 5.0
+
+
+def import_times(code: str = IMPORT_APP) -> Dict[str, int]:
+    """Run code in a fresh interpreter and return cumulative import time (us) per module."""
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times: Dict[str, int] = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def app_import_ms(runs: int = 5) -> Tuple[float, Dict[str, int]]:
+    """Median cumulative import time of app in ms, with the module times of the last run."""
+    samples = []
+    times: Dict[str, int] = {}
+    for _ in range(runs):
+        times = import_times()
+        samples.append(times["app"] / 1000)
+    return statistics.median(samples), times
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def first_response_seconds(timeout: float = 60.0) -> float:
+    """Start streamlit run app.py and return seconds until the page is served."""
+    port = _free_port()
+    started = time.perf_counter()
+    proc = subprocess.Popen(
+        [
+            sys.executable, "-m", "streamlit", "run", "app.py",
+            f"--server.port={port}", "--server.headless=true", "--browser.gatherUsageStats=false",
+        ],
+        cwd=ROOT,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - started < timeout:
+            if proc.poll() is not None:
+                raise RuntimeError(f"streamlit exited with code {proc.returncode}")
+            try:
+                urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1).read()
+                urllib.request.urlopen(f"http://127.0.0.1:{port}/", timeout=5).read()
+                return time.perf_counter() - started
+            except OSError:
+                time.sleep(0.05)
+        raise RuntimeError("streamlit did not respond in time")
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    arg_parser = argparse.ArgumentParser(description="Measure app import time and Streamlit startup")
+    arg_parser.add_argument("--runs", type=int, default=10)
+    arg_parser.add_argument("--top", type=int, default=10, help="slowest imports to list")
+    arg_parser.add_argument("--serve", action="store_true", help="also time streamlit run to first response")
+    args = arg_parser.parse_args(argv)
+
+    median_ms, times = app_import_ms(args.runs)
+    print(f"app import: {median_ms:.1f} ms median of {args.runs} (target {IMPORT_TARGET_MS:.0f} ms)")
+    for name, us in sorted(times.items(), key=lambda item: item[1], reverse=True)[1:args.top + 1]:
+        print(f"  {us / 1000:>8.1f} ms  {name}")
+
+    if args.serve:
+        seconds = first_response_seconds()
+        print(f"streamlit first response: {seconds:.2f} s (target {FIRST_RESPONSE_TARGET_S:.0f} s)")
+
+
+if __name__ == "__main__":
+    main()
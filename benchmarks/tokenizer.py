@@ -0,0 +1,43 @@
+"""Tokenizer throughput: regex engine vs the per-character reference loop.
+
+Run from the repository root:
+
+    python -m benchmarks.tokenizer --terms 10 100 10000
+"""
+import argparse
+import random
+import timeit
+from typing import List, Optional
+
+from utils.parser import _tokenize_chars, tokenize
+
+
+def long_expression(rng: random.Random, terms: int) -> str:
+    parts = [f"{rng.randint(1, 99999)}.{rng.randint(0, 999)}"]
+    for _ in range(terms - 1):
+        parts.append(rng.choice(["+", "-", "*", "/", "* -", "+ ("]))
+        parts.append(f"{rng.randint(1, 99999)}.{rng.randint(0, 999)}e{rng.randint(-5, 5)}")
+    return " ".join(parts)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    arg_parser = argparse.ArgumentParser(description="Measure tokenizer throughput on long expressions")
+    arg_parser.add_argument("--terms", type=int, nargs="+", default=[10, 100, 10000])
+    arg_parser.add_argument("--seed", type=int, default=0)
+    args = arg_parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    print(f"{'terms':>7} {'chars':>9} {'reference MB/s':>15} {'regex MB/s':>11} {'speedup':>8}")
+    for terms in args.terms:
+        text = long_expression(rng, terms)
+        assert tokenize(text) == _tokenize_chars(text)
+        number = max(1, 200_000 // len(text))
+        rates = []
+        for func in (_tokenize_chars, tokenize):
+            best = min(timeit.repeat(lambda: func(text), number=number, repeat=5)) / number
+            rates.append(len(text) / best / 1e6)
+        print(f"{terms:>7} {len(text):>9,} {rates[0]:>15.1f} {rates[1]:>11.1f} {rates[1] / rates[0]:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
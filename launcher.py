@@ -0,0 +1,325 @@
+"""Run several Streamlit processes for app.py behind one sticky reverse proxy (stdlib only).
+
+A Streamlit process executes session scripts under one GIL, so a single
+process keeps one core busy however many the host has. The launcher starts
+N worker processes on local ports and accepts connections on the public
+port itself, handing each one to a healthy worker.
+
+Streamlit keeps every session in the memory of the process serving its
+websocket, so clients are pinned to a worker with a cookie: a connection
+without one goes to the worker with the fewest open connections, and the
+first response on it sets the cookie. Workers are health checked on
+/_stcore/health; a failing worker gets no new clients and is restarted if
+its process exits or it stays unhealthy.
+"""
+import argparse
+import asyncio
+import os
+import re
+import signal
+import subprocess
+import sys
+import zlib
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+DEFAULT_HOST = "0.0.0.0"
+DEFAULT_PORT = 8501
+APP = "app.py"
+ROOT = Path(__file__).resolve().parent
+
+# seconds between health checks of each worker, and the timeout of one check
+HEALTH_INTERVAL = 2.0
+HEALTH_TIMEOUT = 2.0
+# consecutive failed checks before a worker gets no new clients, and before it is restarted
+HEALTH_FAILURES = 3
+RESTART_FAILURES = 15
+# largest request head (request line and headers) read before choosing a worker
+MAX_HEAD_BYTES = 64 * 1024
+COPY_CHUNK_BYTES = 64 * 1024
+
+COOKIE = "calc_worker"
+_COOKIE_VALUE = re.compile(rb"^cookie:.*?\b" + COOKIE.encode() + rb"=(\d+)", re.IGNORECASE | re.MULTILINE)
+_UNAVAILABLE = (
+    b"HTTP/1.1 503 Service Unavailable\r\nContent-Type: text/plain\r\nContent-Length: 26\r\n"
+    b"Connection: close\r\nRetry-After: 1\r\n\r\nNo calculator worker ready"
+)
+
+
+def default_workers() -> int:
+    """CALC_WORKERS, else the CPUs this process may run on."""
+    configured = os.environ.get("CALC_WORKERS")
+    if configured:
+        return max(1, int(configured))
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def streamlit_command(port: int, options: Sequence[str] = ()) -> List[str]:
+    """Command line of a Streamlit worker serving app.py on a local port."""
+    return [
+        sys.executable, "-m", "streamlit", "run", APP,
+        f"--server.port={port}", "--server.address=127.0.0.1",
+        "--server.headless=true", "--browser.gatherUsageStats=false",
+        *options,
+    ]
+
+
+def _log(message: str) -> None:
+    print(f"launcher: {message}", file=sys.stderr, flush=True)
+
+
+class Worker:
+    """One worker process, its health and its open proxied connections."""
+
+    __slots__ = ("index", "port", "command", "env", "process", "healthy", "failures", "connections")
+
+    def __init__(self, index: int, port: int, command: List[str], env: Optional[dict] = None) -> None:
+        self.index = index
+        self.port = port
+        self.command = command
+        self.env = env
+        self.process: Optional[subprocess.Popen] = None
+        self.healthy = False
+        self.failures = 0
+        self.connections = 0
+
+    @property
+    def running(self) -> bool:
+        return self.process is not None and self.process.poll() is None
+
+    def start(self) -> None:
+        self.process = subprocess.Popen(self.command, cwd=ROOT, env=self.env)
+        self.healthy = False
+        self.failures = 0
+
+    def stop(self, timeout: float = 10.0) -> None:
+        if not self.running:
+            return
+        self.process.terminate()
+        try:
+            self.process.wait(timeout)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+
+
+async def check_health(port: int, timeout: float = HEALTH_TIMEOUT) -> bool:
+    """True when the server on a local port answers GET /_stcore/health with 200."""
+    writer = None
+    try:
+        reader, writer = await asyncio.wait_for(asyncio.open_connection("127.0.0.1", port), timeout)
+        writer.write(b"GET /_stcore/health HTTP/1.0\r\nHost: 127.0.0.1\r\n\r\n")
+        status = await asyncio.wait_for(reader.readline(), timeout)
+        return status.split(b" ", 2)[1:2] == [b"200"]
+    except (OSError, asyncio.TimeoutError):
+        return False
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def pinned_worker(head: bytes) -> Optional[int]:
+    """The worker index in a request head's cookie, if it has one."""
+    match = _COOKIE_VALUE.search(head)
+    return int(match.group(1)) if match else None
+
+
+def set_cookie(response_head: bytes, index: int) -> bytes:
+    """response_head with a Set-Cookie header pinning the client to worker index."""
+    status, sep, rest = response_head.partition(b"\r\n")
+    cookie = f"Set-Cookie: {COOKIE}={index}; Path=/; HttpOnly; SameSite=Lax\r\n".encode()
+    return status + sep + cookie + rest
+
+
+async def _copy(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    try:
+        while True:
+            data = await reader.read(COPY_CHUNK_BYTES)
+            if not data:
+                break
+            writer.write(data)
+            await writer.drain()
+        if writer.can_write_eof():
+            writer.write_eof()
+    except (OSError, RuntimeError):
+        # the other side went away; closing the connection ends the copy the other way too
+        writer.close()
+
+
+class Launcher:
+    """Worker processes and the proxy in front of them."""
+
+    def __init__(
+        self,
+        workers: List[Worker],
+        host: str = DEFAULT_HOST,
+        port: int = DEFAULT_PORT,
+        health_interval: float = HEALTH_INTERVAL,
+    ) -> None:
+        self.workers = workers
+        self.host = host
+        self.port = port
+        self.health_interval = health_interval
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._health: Optional[asyncio.Task] = None
+
+    def pick(self, head: bytes, peer: str) -> Optional[Worker]:
+        """The worker for a new connection: the pinned one if healthy, else the least busy.
+
+        Ties go to a stable per-client choice, so one client's parallel
+        connections tend to reach the same worker.
+        """
+        pinned = pinned_worker(head)
+        if pinned is not None and pinned < len(self.workers) and self.workers[pinned].healthy:
+            return self.workers[pinned]
+        healthy = [worker for worker in self.workers if worker.healthy]
+        if not healthy:
+            return None
+        return min(healthy, key=lambda w: (w.connections, zlib.crc32(f"{peer}/{w.index}".encode())))
+
+    async def _handle(self, client_reader: asyncio.StreamReader, client_writer: asyncio.StreamWriter) -> None:
+        backend_writer = None
+        worker = None
+        try:
+            try:
+                head = await client_reader.readuntil(b"\r\n\r\n")
+            except (asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+                return
+            peer = client_writer.get_extra_info("peername") or ("",)
+            while backend_writer is None:
+                worker = self.pick(head, peer[0])
+                if worker is None:
+                    client_writer.write(_UNAVAILABLE)
+                    return
+                try:
+                    backend_reader, backend_writer = await asyncio.open_connection("127.0.0.1", worker.port)
+                except OSError:
+                    # died since its last health check; try the next one
+                    _log(f"worker {worker.index} refused a connection")
+                    worker.healthy = False
+                    worker = None
+            worker.connections += 1
+            backend_writer.write(head)
+            if pinned_worker(head) != worker.index:
+                try:
+                    response_head = await backend_reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+                    return
+                client_writer.write(set_cookie(response_head, worker.index))
+            await asyncio.gather(_copy(client_reader, backend_writer), _copy(backend_reader, client_writer))
+        except OSError:
+            pass
+        finally:
+            if worker is not None:
+                worker.connections -= 1
+            if backend_writer is not None:
+                backend_writer.close()
+            client_writer.close()
+
+    async def _check(self, worker: Worker) -> None:
+        if not worker.running:
+            code = worker.process.returncode if worker.process is not None else None
+            _log(f"worker {worker.index} exited with code {code}, restarting")
+            worker.start()
+            return
+        if await check_health(worker.port, min(HEALTH_TIMEOUT, self.health_interval * 2)):
+            if not worker.healthy:
+                _log(f"worker {worker.index} ready on port {worker.port}")
+            worker.healthy = True
+            worker.failures = 0
+            return
+        worker.failures += 1
+        if worker.healthy and worker.failures >= HEALTH_FAILURES:
+            _log(f"worker {worker.index} failed {worker.failures} health checks")
+            worker.healthy = False
+        if worker.failures >= RESTART_FAILURES:
+            _log(f"worker {worker.index} still unhealthy, restarting")
+            await asyncio.get_running_loop().run_in_executor(None, worker.stop)
+            worker.start()
+
+    async def _monitor(self) -> None:
+        while True:
+            await asyncio.gather(*(self._check(worker) for worker in self.workers))
+            await asyncio.sleep(self.health_interval)
+
+    async def start(self) -> None:
+        """Start the workers, the proxy and the health checks; self.port is then the bound port."""
+        for worker in self.workers:
+            worker.start()
+        self._server = await asyncio.start_server(self._handle, self.host, self.port, limit=MAX_HEAD_BYTES)
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._health = asyncio.ensure_future(self._monitor())
+
+    async def close(self) -> None:
+        if self._health is not None:
+            self._health.cancel()
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(None, worker.stop) for worker in self.workers))
+
+    async def run(self) -> None:
+        """Serve until SIGINT or SIGTERM, then stop the workers."""
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, stop.set)
+            except (NotImplementedError, RuntimeError):
+                # no signal handlers on this platform/thread; Ctrl+C still ends asyncio.run
+                pass
+        await self.start()
+        _log(f"serving {len(self.workers)} workers on http://{self.host}:{self.port}")
+        try:
+            await stop.wait()
+        finally:
+            await self.close()
+
+
+def create_workers(count: int, first_port: int, options: Sequence[str] = ()) -> List[Worker]:
+    """count Streamlit workers on consecutive local ports.
+
+    With CALC_METRICS_PORT set, worker i serves its metrics on that port + i.
+    """
+    metrics_port = os.environ.get("CALC_METRICS_PORT")
+    workers = []
+    for index in range(count):
+        env = None
+        if metrics_port:
+            env = dict(os.environ, CALC_METRICS_PORT=str(int(metrics_port) + index))
+        port = first_port + index
+        workers.append(Worker(index, port, streamlit_command(port, options), env))
+    return workers
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    arg_parser = argparse.ArgumentParser(
+        description="Run Streamlit workers for app.py behind a sticky reverse proxy",
+        epilog="Arguments after -- are passed to every streamlit run, e.g. -- --server.fileWatcherType=none",
+    )
+    arg_parser.add_argument("--workers", type=int, default=None, help="default: CALC_WORKERS or the CPU count")
+    arg_parser.add_argument("--host", default=DEFAULT_HOST)
+    arg_parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    arg_parser.add_argument("--worker-port", type=int, default=None, help="first worker port (default: --port + 1)")
+    arg_parser.add_argument("--health-interval", type=float, default=HEALTH_INTERVAL)
+    arg_parser.add_argument("streamlit_options", nargs=argparse.REMAINDER)
+    args = arg_parser.parse_args(argv)
+
+    options = args.streamlit_options
+    if options[:1] == ["--"]:
+        options = options[1:]
+    count = args.workers if args.workers is not None else default_workers()
+    first_port = args.worker_port if args.worker_port is not None else args.port + 1
+    launcher = Launcher(create_workers(count, first_port, options), args.host, args.port, args.health_interval)
+    try:
+        asyncio.run(launcher.run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
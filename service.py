@@ -0,0 +1,251 @@
+"""Headless HTTP/JSON evaluation service over utils.parser (stdlib only)."""
+import argparse
+import json
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Union
+
+from utils import calculator as _calculator
+from utils import error_log as _errors
+from utils import metrics as _metrics
+from utils import engine as _engine
+from utils import parser as _parser
+from utils.state import CalculatorState
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8000
+CACHE_SIZE = 65536
+# longer expressions are evaluated but not cached, so the cache holds at
+# most CACHE_SIZE * MAX_CACHED_LENGTH characters of keys
+MAX_CACHED_LENGTH = 256
+MAX_BODY_BYTES = 1024 * 1024
+
+Outcome = _parser.EvalResult
+
+
+class ResultCache:
+    """Thread-safe bounded LRU cache of evaluation results (EvalResult) per expression."""
+
+    def __init__(self, maxsize: int = CACHE_SIZE, max_length: int = MAX_CACHED_LENGTH) -> None:
+        self.maxsize = maxsize
+        self.max_length = max_length
+        self._data: "OrderedDict[str, Outcome]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, expression: str) -> Optional[Outcome]:
+        with self._lock:
+            outcome = self._data.get(expression)
+            if outcome is not None:
+                self._data.move_to_end(expression)
+            return outcome
+
+    def put(self, expression: str, outcome: Outcome) -> None:
+        if self.maxsize <= 0 or len(expression) > self.max_length:
+            return
+        with self._lock:
+            self._data[expression] = outcome
+            self._data.move_to_end(expression)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+_cache = ResultCache()
+
+
+def _payload(outcome: Outcome) -> Dict[str, Union[str, int, None]]:
+    if outcome.code is not None:
+        return {"error": outcome.message, "code": outcome.code, "position": outcome.position}
+    value = outcome.value
+    try:
+        result = _calculator.format_result(value)
+    except ArithmeticError:
+        # e.g. 1e100: too many digits to quantize to two places under the context's precision
+        return {"error": "result is too large to format", "code": _parser.ARITHMETIC_ERROR, "position": None}
+    return {"value": str(value), "result": result}
+
+
+def evaluate(expression: str, cache: ResultCache = _cache) -> Dict[str, Union[str, int, None]]:
+    """Evaluate one expression through the result cache and return its payload.
+
+    Errors carry the parser's error code and the character position of the
+    offending token alongside the message.
+    """
+    outcome = cache.get(expression)
+    if outcome is None:
+        outcome = _parser.try_evaluate(expression)
+        cache.put(expression, outcome)
+    return _payload(outcome)
+
+
+def evaluate_batch(expressions: List[str], cache: ResultCache = _cache) -> List[Dict[str, Union[str, int, None]]]:
+    """Evaluate a batch through the result cache, one payload per expression.
+
+    Each distinct cache miss is evaluated once, without raising, so invalid
+    rows cost no exception and do not affect the others.
+    """
+    outcomes: Dict[str, Outcome] = {}
+    misses: List[str] = []
+    for expression in dict.fromkeys(expressions):
+        outcome = cache.get(expression)
+        if outcome is None:
+            misses.append(expression)
+        else:
+            outcomes[expression] = outcome
+
+    for expression in misses:
+        outcome = _parser.try_evaluate(expression)
+        cache.put(expression, outcome)
+        outcomes[expression] = outcome
+
+    return [_payload(outcomes[expression]) for expression in expressions]
+
+
+def run_keypad(events: List[str], state: Optional[Dict] = None) -> Dict:
+    """Replay keypad events (button labels) on a calculator and return its final state.
+
+    state optionally resumes from a state in the app's session layout.
+    Raises ValueError on an unknown event or an invalid state.
+    """
+    initial = CalculatorState.from_mapping(state) if state else None
+    return _engine.run(events, initial).as_dict()
+
+
+class EvaluationHandler(BaseHTTPRequestHandler):
+    """JSON request handler; HTTP/1.1 so clients can reuse connections."""
+
+    protocol_version = "HTTP/1.1"
+    server_version = "CalculatorService/0.1"
+
+    def log_message(self, format, *args) -> None:
+        # per-request logging to stderr would dominate the request cost
+        pass
+
+    def _send_json(self, status: int, body: Dict) -> None:
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _read_json(self) -> Optional[Dict]:
+        try:
+            length = int(self.headers.get("Content-Length", "0"))
+        except ValueError:
+            length = -1
+        if length < 0:
+            self._send_json(400, {"error": "invalid Content-Length"})
+            return None
+        if length > MAX_BODY_BYTES:
+            # the body is not read, so the connection cannot be reused
+            self.close_connection = True
+            self._send_json(413, {"error": "request body too large"})
+            return None
+        raw = self.rfile.read(length)
+        try:
+            body = json.loads(raw.decode("utf-8"))
+        except Exception:
+            self._send_json(400, {"error": "request body must be valid JSON"})
+            return None
+        if not isinstance(body, dict):
+            self._send_json(400, {"error": "request body must be a JSON object"})
+            return None
+        return body
+
+    def do_GET(self) -> None:
+        if self.path == "/health":
+            self._send_json(200, {"status": "ok"})
+        elif self.path == "/metrics":
+            data = _metrics.render_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self) -> None:
+        try:
+            self._post()
+        except Exception as e:
+            _errors.report('service_handler_error', e, path=self.path)
+            # never leave the client with a dropped connection
+            self.close_connection = True
+            self._send_json(500, {"error": "internal error"})
+
+    def _post(self) -> None:
+        if self.path not in ("/evaluate", "/evaluate/batch", "/keypad"):
+            self._send_json(404, {"error": "not found"})
+            return
+        body = self._read_json()
+        if body is None:
+            return
+
+        if self.path == "/evaluate":
+            expression = body.get("expression")
+            if not isinstance(expression, str):
+                self._send_json(400, {"error": "'expression' must be a string"})
+                return
+            result = evaluate(expression)
+            self._send_json(400 if "error" in result else 200, result)
+            return
+
+        if self.path == "/keypad":
+            events = body.get("events")
+            state = body.get("state")
+            if not isinstance(events, list) or not all(isinstance(e, str) for e in events):
+                self._send_json(400, {"error": "'events' must be a list of strings"})
+                return
+            if state is not None and not isinstance(state, dict):
+                self._send_json(400, {"error": "'state' must be an object"})
+                return
+            try:
+                self._send_json(200, {"state": run_keypad(events, state)})
+            except ValueError as e:
+                self._send_json(400, {"error": str(e)})
+            return
+
+        expressions = body.get("expressions")
+        if not isinstance(expressions, list) or not all(isinstance(e, str) for e in expressions):
+            self._send_json(400, {"error": "'expressions' must be a list of strings"})
+            return
+        self._send_json(200, {"results": evaluate_batch(expressions)})
+
+
+def create_server(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> ThreadingHTTPServer:
+    """Create (but do not start) the threaded evaluation server."""
+    server = ThreadingHTTPServer((host, port), EvaluationHandler)
+    server.daemon_threads = True
+    return server
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    arg_parser = argparse.ArgumentParser(description="Headless calculator evaluation service")
+    arg_parser.add_argument("--host", default=DEFAULT_HOST)
+    arg_parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    arg_parser.add_argument("--metrics", action="store_true", help="record call timings for GET /metrics")
+    args = arg_parser.parse_args(argv)
+    if args.metrics:
+        _metrics.enable()
+
+    server = create_server(args.host, args.port)
+    print(f"Serving calculator evaluation on http://{args.host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+import pytest
+
+from utils import aio
+from utils.parser import evaluate_expression
+from utils.aio import aevaluate_expression, aevaluate_many, set_default_executor
+
+
+class CountingExecutor(ThreadPoolExecutor):
+    """Thread pool that records how many submitted jobs ran at the same time."""
+
+    def __init__(self, max_workers):
+        super().__init__(max_workers=max_workers)
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.running = 0
+        self.peak = 0
+
+    def submit(self, fn, *args, **kwargs):
+        def tracked(*a, **kw):
+            with self._lock:
+                self.running += 1
+                self.peak = max(self.peak, self.running)
+            try:
+                return fn(*a, **kw)
+            finally:
+                with self._lock:
+                    self.running -= 1
+
+        with self._lock:
+            self.submitted += 1
+        return super().submit(tracked, *args, **kwargs)
+
+
+def test_aevaluate_expression():
+    assert asyncio.run(aevaluate_expression("2 + 3 * 4")) == Decimal("14")
+
+
+def test_aevaluate_expression_raises_value_error():
+    with pytest.raises(ValueError):
+        asyncio.run(aevaluate_expression("1 / 0"))
+
+
+def test_aevaluate_many_preserves_order():
+    exprs = [f"{i} * 2 + 1" for i in range(1000)]
+    results = asyncio.run(aevaluate_many(exprs, chunk_size=7, concurrency=3))
+    assert results == [evaluate_expression(e) for e in exprs]
+
+
+def test_aevaluate_many_empty_input():
+    assert asyncio.run(aevaluate_many([])) == []
+
+
+def test_aevaluate_many_respects_concurrency_limit():
+    executor = CountingExecutor(max_workers=8)
+    try:
+        exprs = [" + ".join(["1"] * 50)] * 400
+        asyncio.run(aevaluate_many(exprs, executor=executor, chunk_size=10, concurrency=2))
+    finally:
+        executor.shutdown()
+    assert executor.submitted == 40
+    assert executor.peak <= 2
+
+
+def test_aevaluate_many_reads_input_lazily():
+    consumed = []
+
+    def source():
+        for i in range(10000):
+            consumed.append(i)
+            if i == 25:
+                yield "1 / 0"
+            else:
+                yield "1 + 1"
+
+    with pytest.raises(ValueError):
+        asyncio.run(aevaluate_many(source(), chunk_size=5, concurrency=1, max_pending=1))
+    # the failing chunk stops the producer long before the input is exhausted
+    assert len(consumed) < 100
+
+
+def test_event_loop_stays_responsive():
+    ticks = []
+
+    async def ticker(stop):
+        while not stop.is_set():
+            ticks.append(1)
+            await asyncio.sleep(0)
+
+    async def main():
+        stop = asyncio.Event()
+        tick_task = asyncio.ensure_future(ticker(stop))
+        await aevaluate_many(["(1 + 2) * 3"] * 2000, chunk_size=50)
+        stop.set()
+        await tick_task
+
+    asyncio.run(main())
+    assert len(ticks) > 10
+
+
+def test_default_executor_is_used():
+    executor = CountingExecutor(max_workers=1)
+    set_default_executor(executor)
+    try:
+        assert asyncio.run(aevaluate_expression("1 + 1")) == Decimal("2")
+    finally:
+        set_default_executor(None)
+        executor.shutdown()
+    assert executor.submitted == 1
+    assert aio.get_default_executor() is None
+
+
+@pytest.mark.parametrize("kwargs", [{"chunk_size": 0}, {"concurrency": -1}, {"max_pending": 0}])
+def test_aevaluate_many_rejects_bad_limits(kwargs):
+    with pytest.raises(ValueError):
+        asyncio.run(aevaluate_many(["1"], **kwargs))
+
+
+def test_set_default_executor_rejects_non_executor():
+    with pytest.raises(TypeError):
+        set_default_executor(object())
@@ -1,3 +1,5 @@
+import contextlib
+import io
 import sys
 import types
 import importlib
@@ -62,7 +64,7 @@ def test_session_state_initialized_defaults(monkeypatch):
     # Call render to initialize session state
     mod.render_calculator()
 
-    ss = fake.session_state
+    ss = fake.session_state['calculator'].as_dict()
     assert ss.get('current_input') == "0"
     assert ss.get('previous_value') == ""
     assert ss.get('operator') is None
@@ -93,7 +95,7 @@ def test_ac_button_clears_state(monkeypatch):
     mod = importlib.import_module('app')
     mod.render_calculator()
 
-    ss = fake.session_state
+    ss = fake.session_state['calculator'].as_dict()
     # after AC, values should be reset to defaults
     assert ss.get('current_input') == "0"
     assert ss.get('previous_value') == ""
@@ -116,3 +118,109 @@ def test_display_shows_display_value_on_render(monkeypatch):
     found_write = any('0' in str(arg) for call in fake.writes for arg in call[0])
     found_markdown = any('0' in str(arg) for call in fake.markdowns for arg in call[0])
     assert found_write or found_markdown, f"expected '0' in writes/markdowns but got writes={fake.writes} markdowns={fake.markdowns}"
+
+
+class CallbackStreamlit(FakeStreamlit):
+    """FakeStreamlit whose button accepts on_click like Streamlit's."""
+
+    def __init__(self):
+        super().__init__()
+        self.buttons = []
+        self.callbacks = {}
+
+    def button(self, label, on_click=None, args=()):
+        self.buttons.append(label)
+        self.callbacks[label] = (on_click, args)
+        return False
+
+
+def test_keypad_buttons_use_on_click_callbacks(monkeypatch):
+    fake = CallbackStreamlit()
+    monkeypatch.setitem(sys.modules, 'streamlit', fake)
+    mod = importlib.import_module('app')
+
+    mod.render_calculator()
+
+    assert fake.buttons == ['⌫', 'AC', 'C', '±', '%', '÷', '7', '8', '9', '×', '4', '5', '6', '-', '1', '2', '3', '+', '0', '.', '=']
+    # a click runs the callback once, before the next rerun
+    for label in ('4', '×', '5', '='):
+        on_click, args = fake.callbacks[label]
+        on_click(*args)
+    mod.render_calculator()
+
+    ss = fake.session_state['calculator'].as_dict()
+    assert ss['display_value'] == '20'
+    assert ss['calculation_history'] == [{'expression': '4 × 5', 'result': '20'}]
+
+
+def test_keypad_table_covers_every_button(monkeypatch):
+    monkeypatch.setitem(sys.modules, 'streamlit', FakeStreamlit())
+    mod = importlib.import_module('app')
+
+    labels = [label for _, buttons in mod._KEYPAD for label, _, _ in buttons]
+    assert sorted(labels + ['⌫']) == sorted(mod._BUTTONS)
+    for spec, buttons in mod._KEYPAD:
+        assert len(buttons) == (spec if isinstance(spec, int) else len(spec))
+
+
+class FileWidgetStreamlit(CallbackStreamlit):
+    """CallbackStreamlit with the expander, download and upload widgets."""
+
+    def __init__(self):
+        super().__init__()
+        self.downloads = []
+        self.uploaders = []
+        self.captions = []
+
+    @contextlib.contextmanager
+    def expander(self, label):
+        yield self
+
+    def download_button(self, label, data, file_name, mime, on_click=None):
+        self.downloads.append((file_name, data, on_click))
+
+    def file_uploader(self, label, type, key, on_change):
+        self.uploaders.append((key, on_change))
+
+    def caption(self, text):
+        self.captions.append(text)
+
+
+def test_history_export_and_import(monkeypatch):
+    fake = FileWidgetStreamlit()
+    monkeypatch.setitem(sys.modules, 'streamlit', fake)
+    mod = importlib.import_module('app')
+
+    mod.render_calculator()
+    # nothing to export yet
+    assert 'Export CSV' not in fake.buttons
+    fake.session_state['calculator'].history.append(('4 × 5', '20'))
+
+    mod.render_calculator()
+    on_click, args = fake.callbacks['Export JSONL']
+    on_click(*args)
+    mod.render_calculator()
+    file_name, data, finish = fake.downloads[-1]
+    assert file_name == 'calculation_history.jsonl'
+    assert data == b'{"expression": "4 \xc3\x97 5", "result": "20"}\n'
+    # reruns before the download reuse the encoded export until the history changes
+    mod.render_calculator()
+    assert fake.downloads[-1][1] is data
+    fake.session_state['calculator'].history.append(('1 + 2', '3'))
+    mod.render_calculator()
+    assert fake.downloads[-1][1].count(b'\n') == 2
+    finish()
+    assert fake.session_state['calc_history_export'] is None
+    assert fake.session_state['calc_history_export_data'] is None
+    fake.session_state['calculator'].history.pop()
+
+    upload = io.BytesIO(b'expression,result\n1 + 1,2\n2 x 2,4\n')
+    upload.name = 'old_session.csv'
+    key, on_change = fake.uploaders[-1]
+    fake.session_state[key] = upload
+    on_change()
+    mod.render_calculator()
+    assert fake.session_state['calculator'].history == [('4 × 5', '20'), ('1 + 1', '2')]
+    assert fake.captions[-1] == 'Imported 1 entries from old_session.csv, skipped 1.'
+    # imported entries are searchable without indexing on the next search
+    assert fake.session_state[mod._HISTORY_INDEX_KEY].find('+') == [1]
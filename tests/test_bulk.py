@@ -0,0 +1,66 @@
+import pytest
+from decimal import Decimal
+
+from utils.bulk import evaluate_buffer, evaluate_file, iter_line_spans
+from utils.parser import evaluate_expression, tokenize, tokenize_bytes
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "1 + 2 * 3",
+        "  (1.5e3 - -2) / .5  ",
+        "1..2",
+        ".",
+        "1e",
+        "1e5e3",
+        "abc",
+        "3 \x1c+ 4",
+        "2 ² 3",
+        "",
+    ],
+)
+def test_tokenize_bytes_matches_tokenize(text):
+    try:
+        expected = tokenize(text)
+    except ValueError as e:
+        with pytest.raises(ValueError) as raised:
+            tokenize_bytes(text.encode("utf-8"))
+        assert str(raised.value) == str(e)
+    else:
+        assert tokenize_bytes(text.encode("utf-8")) == expected
+
+
+def test_tokenize_bytes_scans_a_slice_in_place():
+    data = memoryview(b"xx(1+2)*3yy")
+    assert tokenize_bytes(data, 2, 9) == ["(", "1", "+", "2", ")", "*", "3"]
+    with pytest.raises(ValueError, match="invalid character"):
+        tokenize_bytes(b"\xff\xfe")
+
+
+def test_iter_line_spans():
+    data = b"1+1\r\n\n2*3\nlast"
+    assert [data[s:e] for s, e in iter_line_spans(data)] == [b"1+1", b"", b"2*3", b"last"]
+
+
+def test_evaluate_buffer_reports_values_and_errors_per_line():
+    results = list(evaluate_buffer(b"1 + 1\n\n1 / 0\n3 * -2\nabc\n"))
+    assert [r.line for r in results] == [1, 3, 4, 5]
+    assert results[0].value == Decimal("2")
+    assert results[1].error == "division by zero"
+    assert results[2].value == Decimal("-6")
+    assert "invalid character" in results[3].error
+    assert (results[1].code, results[1].column) == ("division_by_zero", 2)
+    assert (results[3].code, results[3].column) == ("invalid_character", 0)
+
+
+def test_evaluate_file_uses_mmap(tmp_path):
+    lines = [f"{i} * 2 + 0.5" for i in range(1000)]
+    path = tmp_path / "rows.txt"
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    results = list(evaluate_file(str(path)))
+    assert [r.value for r in results] == [evaluate_expression(line) for line in lines]
+
+    empty = tmp_path / "empty.txt"
+    empty.write_bytes(b"")
+    assert list(evaluate_file(str(empty))) == []
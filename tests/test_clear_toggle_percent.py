@@ -50,26 +50,30 @@ def _fresh_import_app(fake):
     return importlib.import_module('app')
 
 
+def _press(app, fake, *labels):
+    """Click each label in turn, one rerun per click as in a browser session."""
+    for label in labels:
+        fake._click_labels = {label}
+        fake._clicked_labels = set()
+        app.render_calculator()
+
+
 def test_clear_entry_clears_current_input_and_display_only(monkeypatch):
     fake = FakeStreamlit()
-    # enter 1,2,3 then C
-    fake._click_labels.update({'1', '2', '3', 'C'})
     app = _fresh_import_app(fake)
+    # enter 1,2,3 then C
+    _press(app, fake, '1', '2', '3', 'C')
 
-    app.render_calculator()
-
-    ss = fake.session_state
+    ss = fake.session_state['calculator'].as_dict()
     assert ss.get('current_input') == '0'
     assert ss.get('display_value') == '0'
 
     # Now sequence with previous/operator preserved: 4,5,6, +, 7,8,9, C
     fake = FakeStreamlit()
-    fake._click_labels.update({'4', '5', '6', '+', '7', '8', '9', 'C'})
     app = _fresh_import_app(fake)
+    _press(app, fake, '4', '5', '6', '+', '7', '8', '9', 'C')
 
-    app.render_calculator()
-
-    ss = fake.session_state
+    ss = fake.session_state['calculator'].as_dict()
     assert ss.get('display_value') == '0'
     # previous_value should still be '456' and operator be '+'
     assert ss.get('previous_value') == '456'
@@ -78,22 +82,17 @@ def test_clear_entry_clears_current_input_and_display_only(monkeypatch):
 
 def test_toggle_sign_behaviour(monkeypatch):
     fake = FakeStreamlit()
-    # enter 1,2,3 then ± once
-    fake._click_labels.update({'1', '2', '3', '±'})
     app = _fresh_import_app(fake)
-    app.render_calculator()
+    # enter 1,2,3 then ± once
+    _press(app, fake, '1', '2', '3', '±')
 
-    ss = fake.session_state
+    ss = fake.session_state['calculator'].as_dict()
     assert ss.get('display_value') == '-123' or ss.get('current_input') == '-123'
 
-    # simulate pressing ± again by allowing the label to be clickable again
-    # clear clicked labels so button can be clicked again and set the label
-    fake._clicked_labels.discard('±')
-    fake._click_labels = {'±'}
-    # call render again (state persists in fake.session_state)
-    app.render_calculator()
+    # press ± again (state persists in fake.session_state)
+    _press(app, fake, '±')
 
-    ss = fake.session_state
+    ss = fake.session_state['calculator'].as_dict()
     # toggled back to positive
     assert ss.get('display_value') == '123' or ss.get('current_input') == '123'
 
@@ -104,27 +103,25 @@ def test_toggle_sign_behaviour(monkeypatch):
     app = _fresh_import_app(fake)
     app.render_calculator()
 
-    ss = fake.session_state
+    ss = fake.session_state['calculator'].as_dict()
     assert ss.get('display_value') == '0'
 
 
 def test_percentage_behaviour(monkeypatch):
     # 200 -> 2
     fake = FakeStreamlit()
-    fake._click_labels.update({'2', '0', '0', '%'})
     app = _fresh_import_app(fake)
-    app.render_calculator()
+    _press(app, fake, '2', '0', '0', '%')
 
-    ss = fake.session_state
+    ss = fake.session_state['calculator'].as_dict()
     assert ss.get('display_value') == '2' or ss.get('current_input') == '2'
 
     # 50 -> 0.5
     fake = FakeStreamlit()
-    fake._click_labels.update({'5', '0', '%'})
     app = _fresh_import_app(fake)
-    app.render_calculator()
+    _press(app, fake, '5', '0', '%')
 
-    ss = fake.session_state
+    ss = fake.session_state['calculator'].as_dict()
     assert ss.get('display_value') == '0.5' or ss.get('current_input') == '0.5'
 
     # 0 -> 0
@@ -134,5 +131,5 @@ def test_percentage_behaviour(monkeypatch):
     app = _fresh_import_app(fake)
     app.render_calculator()
 
-    ss = fake.session_state
+    ss = fake.session_state['calculator'].as_dict()
     assert ss.get('display_value') == '0' or ss.get('current_input') == '0'
@@ -0,0 +1,119 @@
+import pytest
+from decimal import Decimal
+
+from utils.parser import evaluate_expression, evaluate_rpn, to_rpn, tokenize
+from utils.compiled import CompiledExpression, codegen, compile_expression, compiled_function
+
+
+@pytest.mark.parametrize(
+    "expr",
+    ["2 + 3 * 4", "(2 + 3) * 4", "10 / (2 + 3)", "1.5 + 2.5 * 3", "7"],
+)
+def test_compiled_evaluate_matches_evaluate_expression(expr):
+    assert compile_expression(expr).evaluate() == evaluate_expression(expr)
+
+
+def test_literals_are_numbered_in_source_order():
+    compiled = compile_expression("2 + 3 * 4")
+    assert compiled.literals == (Decimal("2"), Decimal("3"), Decimal("4"))
+
+
+def test_set_literal_updates_value():
+    inc = compile_expression("2 + 3 * 4").incremental()
+    assert inc.value == Decimal("14")
+    assert inc.set_literal(1, "5") == Decimal("22")
+    assert inc.set_literal(0, Decimal("0")) == Decimal("20")
+    assert inc.literals() == (Decimal("0"), Decimal("5"), Decimal("4"))
+    assert inc.value == evaluate_expression("0 + 5 * 4")
+
+
+def test_set_literal_recomputes_only_path_to_root():
+    # balanced tree of 8 literals has depth 3
+    expr = "((1 + 2) + (3 + 4)) + ((5 + 6) + (7 + 8))"
+    inc = compile_expression(expr).incremental()
+    inc.set_literal(5, "16")
+    assert inc.recomputed == 3
+    assert inc.value == Decimal("46")
+
+
+def test_set_literal_failure_leaves_state_intact():
+    inc = compile_expression("8 / 2 + 1").incremental()
+    with pytest.raises(ValueError):
+        inc.set_literal(1, "0")
+    assert inc.value == Decimal("5")
+    assert inc.literal(1) == Decimal("2")
+
+
+@pytest.mark.parametrize("position", [-1, 3, "0"])
+def test_set_literal_rejects_bad_position(position):
+    inc = compile_expression("1 + 2 + 3").incremental()
+    with pytest.raises(ValueError):
+        inc.set_literal(position, "1")
+
+
+def test_set_literal_rejects_bad_value():
+    inc = compile_expression("1 + 2").incremental()
+    with pytest.raises(ValueError):
+        inc.set_literal(0, "abc")
+
+
+def test_compile_expression_rejects_malformed():
+    with pytest.raises(ValueError):
+        compile_expression("1 + (2")
+    with pytest.raises(ValueError):
+        CompiledExpression(["1", "+"])
+
+
+@pytest.mark.parametrize(
+    "expression",
+    ["42", "1 + 2 * 3", "(1 + 2) * 3 - 4 / 5", "10 / 3 * 3", "0.1 + 0.2 - 0.3", "((2))"],
+)
+def test_codegen_matches_interpreter(expression):
+    rpn = to_rpn(tokenize(expression))
+    assert codegen(rpn)() == evaluate_rpn(rpn)
+    assert compile_expression(expression).function() == evaluate_rpn(rpn)
+
+
+def test_codegen_handles_long_expressions():
+    expression = " + ".join(["1.5"] * 5000)
+    assert compiled_function(expression)() == Decimal("7500.0")
+
+
+def test_codegen_errors_match_interpreter():
+    with pytest.raises(ValueError, match="division by zero"):
+        compiled_function("1 / (2 - 2)")()
+    rpn = ["1E999999", "10", "*"]
+    with pytest.raises(ValueError) as generated:
+        codegen(rpn)()
+    with pytest.raises(ValueError) as interpreted:
+        evaluate_rpn(rpn)
+    assert str(generated.value) == str(interpreted.value)
+
+
+def test_codegen_rejects_malformed_rpn():
+    with pytest.raises(ValueError):
+        codegen(["1", "+"])
+    with pytest.raises(ValueError):
+        compiled_function("1 +")
+
+
+def test_compiled_function_is_cached_per_expression():
+    compiled = compile_expression("2 * 21")
+    assert compiled.function is compiled.function
+    assert compiled_function("2 * 21") is compiled_function("2 * 21")
+
+
+@pytest.mark.parametrize("expression", ["3 + -5", "-(2 + 3) * -4", "- - 1e2", "2 * +3 / -4"])
+def test_unary_signs_in_all_backends(expression):
+    expected = evaluate_expression(expression)
+    compiled = compile_expression(expression)
+    assert compiled.evaluate() == expected
+    assert compiled.function() == expected
+    inc = compiled.incremental()
+    assert inc.value == expected
+
+
+def test_incremental_update_through_unary_sign():
+    inc = compile_expression("-(2 + 3) * 4").incremental()
+    assert inc.set_literal(0, "10") == Decimal("-52")
+    assert inc.recomputed == 3
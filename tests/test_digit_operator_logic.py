@@ -50,15 +50,21 @@ def _fresh_import_app(fake):
     return importlib.import_module('app')
 
 
+def _press(app, fake, *labels):
+    """Click each label in turn, one rerun per click as in a browser session."""
+    for label in labels:
+        fake._click_labels = {label}
+        fake._clicked_labels = set()
+        app.render_calculator()
+
+
 def test_digit_entry_updates_current_input_and_display():
     fake = FakeStreamlit()
-    # configure clicks for digits 1,2,3
-    fake._click_labels.update({'1', '2', '3'})
     app = _fresh_import_app(fake)
+    # click digits 1,2,3
+    _press(app, fake, '1', '2', '3')
 
-    app.render_calculator()
-
-    ss = fake.session_state
+    ss = fake.session_state['calculator'].as_dict()
     assert ss.get('current_input') == '123'
     assert ss.get('display_value') == '123'
     assert ss.get('waiting_for_operand') is False
@@ -74,7 +80,7 @@ def test_decimal_point_only_once():
 
     app.render_calculator()
 
-    ss = fake.session_state
+    ss = fake.session_state['calculator'].as_dict()
     assert ss.get('current_input') == '1.2'
     assert ss.get('display_value') == '1.2'
 
@@ -87,20 +93,18 @@ def test_initial_zero_replacement():
 
     app.render_calculator()
 
-    ss = fake.session_state
+    ss = fake.session_state['calculator'].as_dict()
     assert ss.get('current_input') == '5'
     assert ss.get('display_value') == '5'
 
 
 def test_operator_after_number_sets_previous_and_waiting():
     fake = FakeStreamlit()
-    # enter 4 then 2 then +
-    fake._click_labels.update({'4', '2', '+'})
     app = _fresh_import_app(fake)
+    # enter 4 then 2 then +
+    _press(app, fake, '4', '2', '+')
 
-    app.render_calculator()
-
-    ss = fake.session_state
+    ss = fake.session_state['calculator'].as_dict()
     assert ss.get('previous_value') == '42'
     assert ss.get('operator') == '+'
     assert ss.get('waiting_for_operand') is True
@@ -109,13 +113,11 @@ def test_operator_after_number_sets_previous_and_waiting():
 
 def test_digit_operator_digit_sequence():
     fake = FakeStreamlit()
-    # sequence: 3 + 5
-    fake._click_labels.update({'3', '+', '5'})
     app = _fresh_import_app(fake)
+    # sequence: 3 + 5
+    _press(app, fake, '3', '+', '5')
 
-    app.render_calculator()
-
-    ss = fake.session_state
+    ss = fake.session_state['calculator'].as_dict()
     assert ss.get('previous_value') == '3'
     assert ss.get('operator') == '+'
     assert ss.get('current_input') == '5'
@@ -125,13 +127,11 @@ def test_digit_operator_digit_sequence():
 
 def test_chained_operator_initiates_pending_calculation():
     fake = FakeStreamlit()
-    # sequence: 3 + 5 - (clicking another operator triggers placeholder calc)
-    fake._click_labels.update({'3', '+', '5', '-'})
     app = _fresh_import_app(fake)
+    # sequence: 3 + 5 - (clicking another operator completes the pending calculation)
+    _press(app, fake, '3', '+', '5', '-')
 
-    app.render_calculator()
-
-    ss = fake.session_state
+    ss = fake.session_state['calculator'].as_dict()
     # operator should be updated to the last one
     assert ss.get('operator') == '-'
     assert ss.get('waiting_for_operand') is True
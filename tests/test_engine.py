@@ -0,0 +1,129 @@
+import pytest
+
+from utils import engine
+from utils.state import CalculatorState
+
+
+def _run(*events):
+    return engine.run(events)
+
+
+def test_digits_and_decimal_point():
+    state = _run('0', '0', '1', '.', '5', '.', '2')
+    assert state.current_input == '1.52'
+    assert state.display_value == '1.52'
+    assert state.waiting_for_operand is False
+
+
+def test_leading_decimal_point_starts_with_zero():
+    assert _run('.', '5').current_input == '0.5'
+
+
+def test_operator_shows_previous_value_until_next_operand():
+    state = _run('1', '2', '+')
+    assert state.display_value == '12'
+    assert state.previous_value == '12'
+    assert state.operator == '+'
+    engine.apply(state, '3')
+    assert state.display_value == '3'
+
+
+def test_equals_records_history():
+    state = _run('1', '2', '+', '7', '=')
+    assert state.display_value == '19'
+    assert state.history == [('12 + 7', '19')]
+    assert state.previous_value == ''
+    assert state.operator is None
+
+
+def test_chained_operators_calculate_pending_operation():
+    state = _run('2', '×', '3', '-', '1', '=')
+    assert state.display_value == '5'
+    assert state.history == [('2 × 3', '6'), ('6 - 1', '5')]
+
+
+def test_equals_without_pending_operation_keeps_input():
+    state = _run('7', '=')
+    assert state.display_value == '7'
+    assert state.history == []
+
+
+def test_division_by_zero_returns_error_and_skips_history():
+    state = _run('5', '÷', '0')
+    failure = engine.equals(state)
+    assert isinstance(failure, ValueError)
+    assert state.error_state == 'division by zero'
+    assert state.display_value == 'Error'
+    assert state.current_input == '0'
+    assert state.history == []
+
+
+def test_result_too_large_to_format_returns_error():
+    state = _run(*'9' * 15, '×', *'9' * 15)
+    failure = engine.equals(state)
+    assert isinstance(failure, ValueError)
+    assert state.error_state == 'result is too large to format'
+    assert state.display_value == 'Error'
+    assert state.history == []
+
+
+def test_negative_operand_is_evaluated():
+    state = _run('5', '+', '3', '±', '=')
+    assert state.display_value == '2'
+    assert state.history == [('5 + -3', '2')]
+    state = _run('5', '±', '×', '4', '=')
+    assert state.history == [('-5 × 4', '-20')]
+
+
+def test_run_validates_a_given_state():
+    for fields in ({'current_input': 'abc'}, {'previous_value': '1.2.3'}, {'operator': '^'}):
+        with pytest.raises(ValueError):
+            engine.run(['='], CalculatorState(**fields))
+    state = engine.run(['='], CalculatorState(current_input='2.', previous_value='.5', operator='×'))
+    assert state.display_value == '1'
+
+
+def test_toggle_sign_and_percentage():
+    assert _run('5', '±').current_input == '-5'
+    assert _run('5', '0', '%').current_input == '0.5'
+
+
+def test_invalid_input_sets_error_state_and_keeps_input():
+    state = CalculatorState(current_input='abc', waiting_for_operand=False)
+    assert engine.toggle_sign(state) is not None
+    assert state.current_input == 'abc'
+    assert state.error_state == 'toggle_sign_invalid_input'
+    assert engine.percentage(state) is not None
+    assert state.error_state == 'percentage_invalid_input'
+
+
+def test_clear_entry_and_clear_all():
+    state = _run('1', '+', '2', 'C')
+    assert state.current_input == '0'
+    assert state.previous_value == '1'
+    assert state.operator == '+'
+    engine.apply(state, '=')
+    engine.apply(state, 'AC')
+    assert state.as_dict() == CalculatorState().as_dict()
+
+
+def test_backspace():
+    assert _run('1', '2', '3', '⌫').current_input == '12'
+    assert _run('5', '⌫').current_input == '0'
+    assert _run('5', '±', '⌫').current_input == '0'
+    assert _run('5', '+', '⌫').current_input == '0'
+
+
+def test_apply_returns_state_and_rejects_unknown_events():
+    state = CalculatorState()
+    assert engine.apply(state, '4') is state
+    with pytest.raises(ValueError):
+        engine.apply(state, 'sqrt')
+    with pytest.raises(ValueError):
+        engine.run(['1', None])
+
+
+def test_run_resumes_given_state():
+    state = _run('8', '÷')
+    assert engine.run(['2', '='], state) is state
+    assert state.display_value == '4'
@@ -49,15 +49,21 @@ def _fresh_import_app(fake):
     return importlib.import_module('app')
 
 
+def _press(app, fake, *labels):
+    """Click each label in turn, one rerun per click as in a browser session."""
+    for label in labels:
+        fake._click_labels = {label}
+        fake._clicked_labels = set()
+        app.render_calculator()
+
+
 def test_basic_calculation_and_history():
     fake = FakeStreamlit()
-    # Simulate pressing: 5 + 3 =
-    fake._click_labels.update({'5', '+', '3', '='})
     app = _fresh_import_app(fake)
+    # Simulate pressing: 5 + 3 =
+    _press(app, fake, '5', '+', '3', '=')
 
-    app.render_calculator()
-
-    ss = fake.session_state
+    ss = fake.session_state['calculator'].as_dict()
     assert ss.get('display_value') == '8'
     # last history entry
     history = ss.get('calculation_history')
@@ -72,41 +78,30 @@ def test_basic_calculation_and_history():
 
 def test_chaining_operations():
     fake = FakeStreamlit()
-    # Sequence: 5 + 3 =  then + 2 =
-    fake._click_labels.update({'5', '+', '3', '=', '2'})
-    # Note: '=' will be processed once; we reuse render to simulate pressing + and =
     app = _fresh_import_app(fake)
+    # Sequence: 5 + 3 =
+    _press(app, fake, '5', '+', '3', '=')
 
-    # First render: will process initial clicks including '=' and '2'
-    app.render_calculator()
-
-    ss = fake.session_state
-    # After first render we expect first calculation done
-    assert ss.get('display_value') in {'8', '82', '8'}  # tolerant to ordering quirks
+    ss = fake.session_state['calculator'].as_dict()
+    assert ss.get('display_value') == '8'
 
-    # Now simulate pressing + and = to finish chain (ensure we register + and = clicks now)
-    fake._click_labels.update({'+', '='})
-    # import app anew to refresh click handling
-    app = _fresh_import_app(fake)
-    app.render_calculator()
+    # then + 2 = chains from the result
+    _press(app, fake, '+', '2', '=')
 
-    ss = fake.session_state
-    # Final expected value should be 10 if chaining worked
-    # history should have two entries: 5 + 3 -> 8 and 8 + 2 -> 10
-    history = ss.get('calculation_history', [])
-    # basic validation: last result equals formatted '10'
-    if history:
-        assert history[-1].get('result') in {'10', '10.0', '10.00'} or ss.get('display_value') == '10'
+    ss = fake.session_state['calculator'].as_dict()
+    assert ss.get('display_value') == '10'
+    assert ss.get('calculation_history') == [
+        {'expression': '5 + 3', 'result': '8'},
+        {'expression': '8 + 2', 'result': '10'},
+    ]
 
 
 def test_division_by_zero_sets_error():
     fake = FakeStreamlit()
-    fake._click_labels.update({'1', '÷', '0', '='})
     app = _fresh_import_app(fake)
+    _press(app, fake, '1', '÷', '0', '=')
 
-    app.render_calculator()
-
-    ss = fake.session_state
+    ss = fake.session_state['calculator'].as_dict()
     assert ss.get('display_value') == 'Error'
     err = ss.get('error_state')
     assert err is not None
@@ -128,6 +123,6 @@ def test_equals_without_prior_operator_displays_current_input():
 
     app.render_calculator()
 
-    ss = fake.session_state
+    ss = fake.session_state['calculator'].as_dict()
     assert ss.get('display_value') == '0'
     assert ss.get('calculation_history') == []
@@ -0,0 +1,112 @@
+import io
+import json
+import sys
+import types
+import importlib
+import logging
+import queue
+
+import pytest
+
+from utils import error_log
+
+
+class FakeStreamlit(types.ModuleType):
+    def __init__(self):
+        super().__init__("streamlit")
+        # emulate streamlit.session_state as a simple dict
+        self.session_state = {}
+
+    def set_page_config(self, **kwargs):
+        pass
+
+    def write(self, *args, **kwargs):
+        pass
+
+    def markdown(self, *args, **kwargs):
+        pass
+
+    def button(self, label):
+        return False
+
+
+def _fresh_import_app(fake):
+    # Ensure fresh import for app with provided fake streamlit
+    if 'app' in sys.modules:
+        del sys.modules['app']
+    sys.modules['streamlit'] = fake
+    return importlib.import_module('app')
+
+
+@pytest.fixture
+def log_stream():
+    stream = io.StringIO()
+    yield stream
+    error_log.shutdown()
+
+
+def _records(stream):
+    # stop the listener so every queued record has been written
+    error_log.shutdown()
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+
+def test_report_writes_structured_json(log_stream):
+    error_log.configure(stream=log_stream)
+    error_log.report('digit_handler_error', KeyError('x'), session='abc')
+    records = _records(log_stream)
+    assert len(records) == 1
+    record = records[0]
+    assert record['code'] == 'digit_handler_error'
+    assert record['level'] == 'ERROR'
+    assert record['error_type'] == 'KeyError'
+    assert record['session'] == 'abc'
+
+
+def test_duplicates_are_sampled(log_stream):
+    error_log.configure(stream=log_stream, sample_every=10, rate=1e6, burst=1000)
+    for _ in range(25):
+        error_log.report('calculation_error', ValueError('division by zero'))
+    error_log.report('other_error', ValueError('boom'))
+    records = _records(log_stream)
+    assert [r['code'] for r in records] == ['calculation_error', 'calculation_error', 'calculation_error', 'other_error']
+    # emitted at occurrences 1, 10 and 20
+    assert records[1]['suppressed'] == 8
+    assert records[2]['suppressed'] == 9
+
+
+def test_rate_limit_drops_bursts(log_stream):
+    error_log.configure(stream=log_stream, sample_every=1, rate=0.001, burst=5)
+    for i in range(50):
+        error_log.report('storm', ValueError(f'error {i}'))
+    assert len(_records(log_stream)) == 5
+
+
+def test_full_queue_drops_instead_of_blocking():
+    handler = error_log.DroppingQueueHandler(queue.Queue(maxsize=2))
+    for i in range(5):
+        handler.handle(logging.LogRecord('calculator', logging.ERROR, __file__, 1, f'm{i}', None, None))
+    assert handler.queue.qsize() == 2
+    assert handler.dropped == 3
+
+
+def test_app_errors_are_reported_with_error_state_code(log_stream):
+    error_log.configure(stream=log_stream)
+    fake = FakeStreamlit()
+    fake.session_state.update({'current_input': 'not-a-number'})
+    app = _fresh_import_app(fake)
+
+    app._handle_toggle_sign()
+
+    assert fake.session_state['calculator'].error_state == 'toggle_sign_invalid_input'
+    codes = [r['code'] for r in _records(log_stream)]
+    assert codes == ['toggle_sign_invalid_input']
+
+
+def test_report_never_raises():
+    class Unprintable(Exception):
+        def __str__(self):
+            raise RuntimeError('nope')
+
+    error_log.report('weird_error', Unprintable())
+    error_log.shutdown()
@@ -0,0 +1,83 @@
+import pytest
+from decimal import Decimal
+
+from utils.parser import tokenize, to_rpn, evaluate_expression
+from utils.expr_ast import Num, BinOp, NodeTable, SubtreeEvaluator, build_tree, evaluate_many
+
+
+def _rpn(expr):
+    return to_rpn(tokenize(expr))
+
+
+def test_build_tree_shape():
+    root = build_tree(_rpn("2 + 3 * 4"))
+    assert isinstance(root, BinOp)
+    assert root.op == "+"
+    assert root.left == Num(root.left.uid, "2")
+    assert root.right.op == "*"
+
+
+def test_identical_subtrees_are_shared():
+    table = NodeTable()
+    root = table.from_rpn(_rpn("(1 + 2) * (1 + 2)"))
+    assert root.left is root.right
+    # literals 1 and 2, the sum, and the product
+    assert len(table) == 4
+
+
+def test_subtrees_shared_across_expressions():
+    table = NodeTable()
+    a = table.from_rpn(_rpn("(10 * 3) + 1"))
+    b = table.from_rpn(_rpn("(10 * 3) - 1"))
+    assert a.left is b.left
+
+
+def test_evaluator_computes_each_distinct_subtree_once():
+    table = NodeTable()
+    evaluator = SubtreeEvaluator(table)
+    first = table.from_rpn(_rpn("(1.5 * 4) + (1.5 * 4)"))
+    second = table.from_rpn(_rpn("(1.5 * 4) / 2"))
+
+    assert evaluator.evaluate(first) == Decimal("12.0")
+    assert evaluator.evaluations == 4
+    assert evaluator.evaluate(second) == Decimal("3.0")
+    # only the literal 2 and the division are new
+    assert evaluator.evaluations == 6
+
+
+def test_literal_tokens_are_not_merged_by_value():
+    table = NodeTable()
+    assert table.num("1") is not table.num("1.0")
+
+
+def test_evaluate_many_matches_evaluate_expression():
+    exprs = ["2 + 3 * 4", "(2 + 3) * 4", "10 / (2 + 3)", "1.5 + 2.5 * 3", "(2 + 3) * 4 - 1"]
+    assert evaluate_many(exprs) == [evaluate_expression(e) for e in exprs]
+
+
+def test_deep_tree_does_not_recurse():
+    expr = " + ".join(["1"] * 5000)
+    assert evaluate_many([expr]) == [Decimal("5000")]
+
+
+@pytest.mark.parametrize("bad_batch", [["1 + 2", "1 / 0"], ["1 + (2"], ["abc"]])
+def test_evaluate_many_raises_value_error(bad_batch):
+    with pytest.raises(ValueError):
+        evaluate_many(bad_batch)
+
+
+def test_from_rpn_rejects_malformed_rpn():
+    with pytest.raises(ValueError):
+        NodeTable().from_rpn(["1", "+"])
+    with pytest.raises(ValueError):
+        NodeTable().from_rpn(["1", "2"])
+
+
+def test_unary_signs_are_interned_and_evaluated():
+    from utils.expr_ast import UnaryOp
+
+    table = NodeTable()
+    a = build_tree(to_rpn(tokenize("-(1 + 2) * -(1 + 2)")), table)
+    assert isinstance(a.left, UnaryOp)
+    assert a.left is a.right
+    assert evaluate_many(["-(1 + 2) * -(1 + 2)", "3 - -1e1"]) == [Decimal("9"), Decimal("13")]
@@ -0,0 +1,83 @@
+from decimal import Decimal
+
+import pytest
+
+from utils.history_index import BULK_SYNC, HistoryIndex, parse_range
+
+
+HISTORY = [("12 × 3", "36"), ("4 + 4", "8"), ("120 ÷ 4", "30"), ("1 ÷ 0", "Error"), ("-3 - 5", "-8")]
+
+
+def _index(history):
+    index = HistoryIndex()
+    index.sync(history)
+    return index
+
+
+@pytest.mark.parametrize(
+    "text, positions",
+    [("12", [0, 2]), ("÷", [2, 3]), ("12 ×", [0]), ("4 + 4", [1]), ("120 ÷ 4", [2]), ("99", []), ("÷ 5", [])],
+)
+def test_find_matches_substrings(text, positions):
+    assert _index(HISTORY).find(text) == positions
+
+
+def test_prefix_and_ranges():
+    index = _index(HISTORY)
+    assert index.prefix("12") == [0, 2]
+    assert index.prefix("3") == []
+    # ascending by result; 'Error' is not part of range queries
+    assert index.in_range(Decimal(0)) == [1, 2, 0]
+    assert index.search("..8") == [4, 1]
+    assert index.search(" 8 .. 30 ") == [1, 2]
+
+
+@pytest.mark.parametrize("query, count", [("1", 3), ("12", 2), ("12 ×", 1), ("..8", 2), ("30..8", 0), ("99", 0)])
+def test_search_limit_and_count(query, count):
+    index = _index(HISTORY)
+    assert index.count(query) == count == len(index.search(query))
+    assert index.search(query, limit=1) == index.search(query)[:1]
+
+
+@pytest.mark.parametrize("query, bounds", [("10..20", (10, 20)), ("..0", (None, 0)), ("1e3..", (1000, None))])
+def test_parse_range(query, bounds):
+    assert parse_range(query) == tuple(None if b is None else Decimal(b) for b in bounds)
+
+
+@pytest.mark.parametrize("query", ["..", "1..2..3", "12", "a..b"])
+def test_parse_range_rejects_other_queries(query):
+    assert parse_range(query) is None
+
+
+def test_sync_is_incremental_and_rebuilds_after_shrinking():
+    history = list(HISTORY[:2])
+    index = _index(history)
+    history.extend(HISTORY[2:])
+    index.sync(history)
+    assert len(index) == len(HISTORY)
+    assert index.find("12") == [0, 2]
+
+    del history[1:]
+    index.sync(history)
+    assert index.find("4") == []
+    assert index.in_range() == [0]
+
+
+def test_index_matches_linear_scan_on_random_history():
+    import random
+
+    rng = random.Random(3)
+    history = []
+    index = HistoryIndex()
+    for size in (5, BULK_SYNC + 10, 50):
+        for _ in range(size):
+            a, b = rng.randint(0, 200), rng.randint(1, 200)
+            history.append((f"{a} {rng.choice('+-×÷')} {b}", str(rng.randint(-50, 50))))
+        index.sync(history)
+    for text in ("1", "12", "÷", "3 +", "× 1", "200", "7 ÷ 19"):
+        expected = [i for i, (expr, _) in enumerate(history) if text in expr]
+        assert index.find(text) == expected and index.count(text) == len(expected)
+        assert index.find(text, limit=10) == expected[:10]
+    low, high = Decimal(-5), Decimal(5)
+    expected = sorted((i for i, (_, res) in enumerate(history) if low <= Decimal(res) <= high), key=lambda i: (Decimal(history[i][1]), i))
+    assert index.in_range(low, high) == expected
@@ -0,0 +1,76 @@
+import io
+
+import pytest
+
+from utils.history_io import ExportStream, format_for, import_into, iter_export, iter_import
+
+
+HISTORY = [("4 × 5", "20"), ("1 ÷ 4", "0.25"), ("-2 - 1", "-3"), ("1e3 + 0.5", "1000.5")]
+
+
+@pytest.mark.parametrize("fmt", ["csv", "jsonl"])
+def test_export_import_round_trip(fmt):
+    data = b"".join(iter_export(HISTORY, fmt))
+    history = []
+    assert import_into(history, io.BytesIO(data), fmt) == (len(HISTORY), 0)
+    assert history == HISTORY
+
+
+def test_export_is_chunked_and_csv_has_a_header():
+    chunks = list(iter_export(HISTORY * 3, "csv", chunk_rows=5))
+    assert len(chunks) == 3
+    assert chunks[0].startswith(b"expression,result\n")
+    assert b"".join(chunks).count(b"\n") == 13
+
+
+def test_export_stream_reads_like_a_file():
+    stream = ExportStream(HISTORY, "jsonl", chunk_rows=1)
+    assert stream.seek(0) == 0
+    assert stream.read(5) == b'{"exp'
+    assert stream.read() == b"".join(iter_export(HISTORY, "jsonl"))[5:]
+    with pytest.raises(io.UnsupportedOperation):
+        stream.seek(0)
+
+
+def test_import_validates_and_re_evaluates_in_batches():
+    rows = b"expression,result\n2 + 2,5\n1 / 0,\n,3\n3 \xc3\x97 3,9\nabc,1\n"
+    batches = list(iter_import(io.BytesIO(rows), "csv", batch_rows=2))
+    assert [len(b.entries) + b.rejected for b in batches] == [2, 2, 1]
+    entries = [entry for b in batches for entry in b.entries]
+    assert entries == [("2 + 2", "4"), ("3 × 3", "9")]
+    assert sum(b.changed for b in batches) == 1
+    errors = [error for b in batches for error in b.errors]
+    assert errors == [(2, "division by zero"), (3, "missing expression"), (5, "invalid character in expression: 'a'")]
+
+
+def test_import_rejects_results_too_large_to_format():
+    history = []
+    rows = b"expression,result\n1 + 1,2\n1e30 * 1,x\n"
+    assert import_into(history, io.BytesIO(rows), batch_rows=1) == (1, 1)
+    assert history == [("1 + 1", "2")]
+    (_, batch) = iter_import(io.BytesIO(rows), batch_rows=1)
+    assert batch.errors == [(2, "result is too large to format")]
+
+
+def test_import_into_appends_nothing_if_reading_fails_part_way():
+    history = [("1 + 1", "2")]
+    # the invalid UTF-8 is only decoded after several batches were read
+    rows = b"expression,result\n" + b"2 + 2,4\n" * 2000 + b"\xff,1\n"
+    with pytest.raises(UnicodeDecodeError):
+        import_into(history, io.BytesIO(rows), batch_rows=10)
+    assert history == [("1 + 1", "2")]
+
+
+def test_import_jsonl_rejects_malformed_lines():
+    rows = b'{"expression": "1 + 1", "result": "2"}\nnot json\n\n[1, 2]\n'
+    (batch,) = iter_import(io.BytesIO(rows), "jsonl")
+    assert batch.entries == [("1 + 1", "2")]
+    assert batch.rejected == 2
+
+
+def test_format_for_and_unknown_format():
+    assert format_for("session.JSONL") == "jsonl"
+    assert format_for("session.ndjson") == "jsonl"
+    assert format_for("session.csv") == "csv"
+    with pytest.raises(ValueError):
+        next(iter_export(HISTORY, "xml"))
@@ -2,6 +2,8 @@ import sys
 import types
 import importlib
 
+import pytest
+
 
 class FakeStreamlit(types.ModuleType):
     def __init__(self):
@@ -44,7 +46,7 @@ def test_backspace_multidigit():
 
     app._handle_backspace()
 
-    ss = fake.session_state
+    ss = fake.session_state['calculator'].as_dict()
     assert ss.get('current_input') == '12'
     assert ss.get('display_value') == '12'
 
@@ -56,7 +58,7 @@ def test_backspace_single_digit_to_zero():
 
     app._handle_backspace()
 
-    ss = fake.session_state
+    ss = fake.session_state['calculator'].as_dict()
     assert ss.get('current_input') == '0'
     assert ss.get('display_value') == '0'
 
@@ -68,7 +70,7 @@ def test_backspace_from_zero_remains_zero():
 
     app._handle_backspace()
 
-    ss = fake.session_state
+    ss = fake.session_state['calculator'].as_dict()
     assert ss.get('current_input') == '0'
     assert ss.get('display_value') == '0'
 
@@ -80,7 +82,7 @@ def test_backspace_while_waiting_resets_to_zero():
 
     app._handle_backspace()
 
-    ss = fake.session_state
+    ss = fake.session_state['calculator'].as_dict()
     assert ss.get('current_input') == '0'
     assert ss.get('display_value') == '0'
 
@@ -92,7 +94,7 @@ def test_backspace_negative_edge_case():
 
     app._handle_backspace()
 
-    ss = fake.session_state
+    ss = fake.session_state['calculator'].as_dict()
     # Removing last char leaves '-' -> normalize to '0'
     assert ss.get('current_input') == '0'
     assert ss.get('display_value') == '0'
@@ -136,4 +138,191 @@ def test_inject_keyboard_handlers_includes_percent_key():
     # Check that findButtonByLabel is referenced so aria-label support is used
     assert 'findButtonByLabel' in js
     # Check the event listener is added
-    assert 'window.addEventListener' in js
+    assert "win.addEventListener('keydown'" in js
+
+
+class KeyBufferStreamlit(FakeStreamlit):
+    """FakeStreamlit with a text_input that records its on_change callback."""
+
+    def __init__(self):
+        super().__init__()
+        self.text_inputs = {}
+
+    def text_input(self, label, key=None, on_change=None, **kwargs):
+        self.text_inputs[key] = on_change
+        return self.session_state.get(key, '')
+
+
+def test_key_buffer_applies_a_burst_in_one_rerun():
+    fake = KeyBufferStreamlit()
+    app = _fresh_import_app(fake)
+    app.render_calculator()
+    callback = fake.text_inputs[app._KEY_BUFFER_KEY]
+
+    # what the browser submits after "12*3" then Enter
+    fake.session_state[app._KEY_BUFFER_KEY] = '1700000000000.1:12×3='
+    callback()
+
+    state = fake.session_state['calculator']
+    assert state.display_value == '36'
+    assert state.history == [('12 × 3', '36')]
+
+
+def test_key_buffer_ignores_unknown_labels_and_empty_values():
+    fake = KeyBufferStreamlit()
+    app = _fresh_import_app(fake)
+    app._init_session_state()
+
+    fake.session_state[app._KEY_BUFFER_KEY] = ''
+    app._apply_key_buffer()
+    fake.session_state[app._KEY_BUFFER_KEY] = '7.2:4x2⌫5'
+    app._apply_key_buffer()
+
+    assert fake.session_state['calculator'].current_input == '45'
+
+
+@pytest.mark.parametrize('labels', ['12×3=', '2+3×4=', '7÷0=4+1=', '5+3%=', '9⌫8.5.2C4×2='])
+def test_key_buffer_burst_matches_clicking_each_button(labels):
+    clicked = KeyBufferStreamlit()
+    app = _fresh_import_app(clicked)
+    for label in labels:
+        clicked._click_labels = {label}
+        clicked._clicked_labels = set()
+        app.render_calculator()
+
+    typed = KeyBufferStreamlit()
+    app = _fresh_import_app(typed)
+    app.render_calculator()
+    typed.session_state[app._KEY_BUFFER_KEY] = '1.1:' + labels
+    typed.text_inputs[app._KEY_BUFFER_KEY]()
+
+    assert typed.session_state['calculator'].as_dict() == clicked.session_state['calculator'].as_dict()
+
+
+def test_key_buffer_applies_consecutive_bursts_in_order():
+    fake = KeyBufferStreamlit()
+    app = _fresh_import_app(fake)
+    app._init_session_state()
+
+    for value in ('1.1:12', '1.2:+3', '1.3:=×2', '1.4:='):
+        fake.session_state[app._KEY_BUFFER_KEY] = value
+        app._apply_key_buffer()
+
+    state = fake.session_state['calculator']
+    assert state.display_value == '30'
+    assert state.history == [('12 + 3', '15'), ('15 × 2', '30')]
+
+
+def test_keystroke_coalescing_policy():
+    from benchmarks.keystroke_coalescing import coalesced_submissions
+
+    # one burst ended by '=', then a pause splits the next burst in two
+    keys = [(900, '1'), (80, '2'), (80, '+'), (80, '3'), (80, '='), (900, '4'), (400, '5'), (80, '6')]
+    assert coalesced_submissions(keys, idle_ms=250, max_keys=64) == 3
+    # the size cap flushes a long burst
+    assert coalesced_submissions([(50, '1')] * 10, idle_ms=250, max_keys=4) == 3
+
+
+class SearchStreamlit(KeyBufferStreamlit):
+    """KeyBufferStreamlit that records captions and markdown blocks."""
+
+    def __init__(self):
+        super().__init__()
+        self.captions = []
+        self.markdowns = []
+
+    def markdown(self, body, **kwargs):
+        # only the display panel, not the injected styles
+        if 'calc-panel' in body:
+            self.markdowns.append(body)
+
+    def caption(self, text):
+        self.captions.append(text)
+
+
+def test_history_search_lists_only_matching_entries():
+    fake = SearchStreamlit()
+    app = _fresh_import_app(fake)
+    app._init_session_state()
+    fake.session_state['calculator'].history.extend([('12 × 3', '36'), ('4 + 4', '8'), ('120 ÷ 4', '30')])
+
+    fake.session_state[app._HISTORY_SEARCH_KEY] = '12'
+    app.render_calculator()
+    panel = fake.markdowns[-1]
+    assert fake.captions == ['2 of 3 entries match']
+    assert '12 × 3 = 36' in panel and '120 ÷ 4 = 30' in panel
+    assert '4 + 4 = 8' not in panel
+
+    # the index picks up new entries on the next search
+    fake.session_state['calculator'].history.append(('7 + 1', '8'))
+    fake.session_state[app._HISTORY_SEARCH_KEY] = '5..10'
+    app.render_calculator()
+    panel = fake.markdowns[-1]
+    assert fake.captions[-1] == '2 of 4 entries match'
+    assert '4 + 4 = 8' in panel and '7 + 1 = 8' in panel and '12 × 3' not in panel
+
+
+def test_display_and_history_render_as_one_cached_block():
+    fake = SearchStreamlit()
+    app = _fresh_import_app(fake)
+    app._init_session_state()
+    state = fake.session_state['calculator']
+    state.history.extend([('1 + 1', '2'), ('<b>2</b> × 2', '4')])
+
+    app.render_calculator()
+    app.render_calculator()
+    first, second = fake.markdowns[-2:]
+    # unchanged state reuses the block instead of rebuilding it
+    assert second is first
+    assert first.count('class="calc-display"') == 1
+    assert '1 + 1 = 2' in first and '&lt;b&gt;2&lt;/b&gt; × 2 = 4' in first
+
+    fake.session_state[app._KEY_BUFFER_KEY] = '1.1:7×6='
+    app._apply_key_buffer()
+    app.render_calculator()
+    assert '7 × 6 = 42' in fake.markdowns[-1] and '>42</div></div>' in fake.markdowns[-1]
+
+    # AC replaces the history; the block follows it
+    app._clear_state()
+    app.render_calculator()
+    assert 'calc-history' not in fake.markdowns[-1]
+
+
+def test_long_history_lists_only_the_newest_entries():
+    fake = SearchStreamlit()
+    app = _fresh_import_app(fake)
+    app._init_session_state()
+    fake.session_state['calculator'].history.extend((f'{i} + 0', str(i)) for i in range(app.HISTORY_ROWS + 5))
+
+    app.render_calculator()
+    panel = fake.markdowns[-1]
+    assert '5 earlier entries' in panel
+    assert '<div>4 + 0 = 4</div>' not in panel and '<div>5 + 0 = 5</div>' in panel
+
+
+def test_history_search_lists_only_the_first_matches(monkeypatch):
+    fake = SearchStreamlit()
+    app = _fresh_import_app(fake)
+    app._init_session_state()
+    fake.session_state['calculator'].history.extend([(f'{i} + 1', str(i + 1)) for i in range(5)])
+    monkeypatch.setattr(app, 'MAX_SEARCH_RESULTS', 2)
+
+    fake.session_state[app._HISTORY_SEARCH_KEY] = '+'
+    app.render_calculator()
+    panel = fake.markdowns[-1]
+    assert fake.captions == ['5 of 5 entries match']
+    assert '0 + 1 = 1' in panel and '1 + 1 = 2' in panel
+    assert '2 + 1 = 3' not in panel
+
+
+def test_history_index_follows_new_calculations():
+    fake = SearchStreamlit()
+    app = _fresh_import_app(fake)
+    app._init_session_state()
+
+    # indexed as calculations are made, before any search
+    fake.session_state[app._KEY_BUFFER_KEY] = '1.1:4+4=12×3='
+    app._apply_key_buffer()
+    index = fake.session_state[app._HISTORY_INDEX_KEY]
+    assert len(index) == 2
+    assert index.find('× 3') == [1]
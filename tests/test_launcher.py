@@ -0,0 +1,112 @@
+import asyncio
+import socket
+import sys
+
+from launcher import Launcher, Worker, pinned_worker, set_cookie, streamlit_command
+
+
+# stand-in worker: answers the health check with ok and every other path with its own port
+FAKE_WORKER = r"""
+import sys
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+class Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = b"ok" if self.path == "/_stcore/health" else sys.argv[1].encode()
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+HTTPServer(("127.0.0.1", int(sys.argv[1])), Handler).serve_forever()
+"""
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def _get(port, cookie=None):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    headers = f"Cookie: theme=dark; calc_worker={cookie}\r\n" if cookie is not None else ""
+    writer.write(f"GET / HTTP/1.0\r\nHost: localhost\r\n{headers}\r\n".encode())
+    response = await reader.read()
+    writer.close()
+    head, _, body = response.partition(b"\r\n\r\n")
+    return head.decode(), body.decode()
+
+
+async def _wait_until(condition, timeout=10.0):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not condition():
+        assert loop.time() < deadline, "timed out"
+        await asyncio.sleep(0.02)
+
+
+def test_cookie_helpers():
+    assert pinned_worker(b"GET / HTTP/1.1\r\ncookie: a=1; calc_worker=3\r\n\r\n") == 3
+    assert pinned_worker(b"GET / HTTP/1.1\r\nX-Note: calc_worker=3\r\n\r\n") is None
+    head = set_cookie(b"HTTP/1.1 200 OK\r\nContent-Length: 0\r\n\r\n", 2)
+    assert head.startswith(b"HTTP/1.1 200 OK\r\nSet-Cookie: calc_worker=2; Path=/")
+    assert head.endswith(b"Content-Length: 0\r\n\r\n")
+
+
+def test_pick_prefers_pinned_then_least_busy_healthy_worker():
+    workers = [Worker(i, 0, []) for i in range(3)]
+    for worker, healthy, connections in zip(workers, (True, True, False), (5, 1, 0)):
+        worker.healthy, worker.connections = healthy, connections
+    launcher = Launcher(workers)
+    assert launcher.pick(b"GET / HTTP/1.1\r\n\r\n", "10.0.0.1") is workers[1]
+    assert launcher.pick(b"GET / HTTP/1.1\r\nCookie: calc_worker=0\r\n\r\n", "10.0.0.1") is workers[0]
+    # an unhealthy or unknown pinned worker is replaced
+    assert launcher.pick(b"GET / HTTP/1.1\r\nCookie: calc_worker=2\r\n\r\n", "10.0.0.1") is workers[1]
+    assert launcher.pick(b"GET / HTTP/1.1\r\nCookie: calc_worker=9\r\n\r\n", "10.0.0.1") is workers[1]
+
+
+def test_streamlit_command_binds_workers_locally():
+    command = streamlit_command(8600, ["--server.fileWatcherType=none"])
+    assert command[1:5] == ["-m", "streamlit", "run", "app.py"]
+    assert "--server.port=8600" in command and "--server.address=127.0.0.1" in command
+    assert command[-1] == "--server.fileWatcherType=none"
+
+
+def test_proxy_pins_clients_and_fails_over():
+    async def scenario():
+        ports = [_free_port(), _free_port()]
+        workers = [Worker(i, port, [sys.executable, "-c", FAKE_WORKER, str(port)]) for i, port in enumerate(ports)]
+        launcher = Launcher(workers, host="127.0.0.1", port=0, health_interval=0.05)
+        await launcher.start()
+        try:
+            head, _ = await _get(launcher.port)
+            assert "503 Service Unavailable" in head
+            await _wait_until(lambda: all(w.healthy for w in workers))
+
+            # a new client is assigned a worker and pinned to it with a cookie
+            head, body = await _get(launcher.port)
+            first = next(w for w in workers if str(w.port) == body)
+            assert f"Set-Cookie: calc_worker={first.index};" in head
+            for index, worker in enumerate(workers):
+                head, body = await _get(launcher.port, cookie=index)
+                assert body == str(worker.port) and "Set-Cookie" not in head
+
+            # a dead worker's clients move to a healthy one and the worker is restarted
+            workers[0].process.kill()
+            workers[0].process.wait()
+            head, body = await _get(launcher.port, cookie=0)
+            assert body == str(workers[1].port)
+            assert "Set-Cookie: calc_worker=1;" in head
+            await _wait_until(lambda: workers[0].running and workers[0].healthy)
+            _, body = await _get(launcher.port, cookie=0)
+            assert body == str(workers[0].port)
+            await _wait_until(lambda: all(w.connections == 0 for w in workers))
+        finally:
+            await launcher.close()
+        assert not any(w.running for w in workers)
+
+    asyncio.run(scenario())
@@ -0,0 +1,38 @@
+import random
+
+from benchmarks.harness import SessionStreamlit, SimulatedSession, deep_sizeof, load_app
+from benchmarks.load_sessions import click_sequence, format_report, run_load
+
+
+def test_run_load_reports_every_rerun():
+    report = run_load(sessions=12, clicks=5, threads=3, seed=1)
+    # one initial rerun per session plus one per click
+    assert report.reruns == 12 * 6
+    assert report.throughput > 0
+    assert 0 < report.p50_ms <= report.p99_ms
+    assert report.bytes_per_session > 0
+    assert "reruns/s" in format_report(report)
+
+
+def test_click_sequence_is_deterministic_per_seed():
+    assert click_sequence(random.Random(7), 20) == click_sequence(random.Random(7), 20)
+
+
+def test_session_streamlit_isolates_sessions():
+    fake = SessionStreamlit()
+    app = load_app(fake)
+    first, second = SimulatedSession(), SimulatedSession()
+    for session, label in ((first, '7'), (second, '4')):
+        fake.activate(session)
+        app.render_calculator()
+        session.click = label
+        app.render_calculator()
+    assert first.session_state['calculator'].display_value == '7'
+    assert second.session_state['calculator'].display_value == '4'
+
+
+def test_deep_sizeof_counts_nested_objects():
+    flat = deep_sizeof({'a': 1})
+    nested = deep_sizeof({'a': 1, 'history': [{'expression': '1 + 1', 'result': '2'}]})
+    assert nested > flat
+
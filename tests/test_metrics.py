@@ -0,0 +1,110 @@
+import sys
+import types
+import importlib
+import urllib.request
+
+import pytest
+
+from utils import metrics
+from utils.parser import evaluate_expression
+
+
+class FakeStreamlit(types.ModuleType):
+    def __init__(self):
+        super().__init__("streamlit")
+        # emulate streamlit.session_state as a simple dict
+        self.session_state = {}
+        # controls for simulating button clicks
+        self._click_labels = set()
+        self._clicked_labels = set()
+
+    def set_page_config(self, **kwargs):
+        pass
+
+    def write(self, *args, **kwargs):
+        pass
+
+    def markdown(self, *args, **kwargs):
+        pass
+
+    def button(self, label):
+        # Simulate click only if label is configured in _click_labels
+        if label in self._click_labels and label not in self._clicked_labels:
+            self._clicked_labels.add(label)
+            return True
+        return False
+
+
+def _fresh_import_app(fake):
+    # Ensure fresh import for app with provided fake streamlit
+    if 'app' in sys.modules:
+        del sys.modules['app']
+    sys.modules['streamlit'] = fake
+    return importlib.import_module('app')
+
+
+@pytest.fixture
+def enabled_metrics():
+    was_enabled = metrics.is_enabled()
+    metrics.REGISTRY.reset()
+    metrics.enable()
+    yield metrics.REGISTRY
+    if not was_enabled:
+        metrics.disable()
+    metrics.REGISTRY.reset()
+
+
+def test_disabled_metrics_record_nothing():
+    metrics.disable()
+    metrics.REGISTRY.reset()
+    evaluate_expression("1 + 2")
+    assert metrics.REGISTRY.snapshot()["parser.tokenize"]["count"] == 0
+
+
+def test_parser_stages_are_timed(enabled_metrics):
+    evaluate_expression("1 + 2")
+    evaluate_expression("3 * 4")
+    snap = enabled_metrics.snapshot()
+    for stage in ("parser.tokenize", "parser.to_rpn", "parser.evaluate_rpn"):
+        assert snap[stage]["count"] == 2
+        assert snap[stage]["buckets"][-1][1] <= 2
+
+
+def test_errors_are_counted(enabled_metrics):
+    with pytest.raises(ValueError):
+        evaluate_expression("1 / 0")
+    assert enabled_metrics.snapshot()["parser.evaluate_rpn"]["errors"] == 1
+
+
+def test_app_handlers_are_timed(enabled_metrics):
+    fake = FakeStreamlit()
+    fake._click_labels.update({'5', '+', '='})
+    app = _fresh_import_app(fake)
+    app.render_calculator()
+    snap = enabled_metrics.snapshot()
+    assert snap["app.render_calculator"]["count"] == 1
+    assert snap["app.handle_digit"]["count"] == 1
+    assert snap["app.handle_operator"]["count"] == 1
+    assert snap["app.perform_calculation"]["count"] == 1
+
+
+def test_prometheus_text_format(enabled_metrics):
+    timer = enabled_metrics.timer("test.op")
+    timer.observe(0.00002)
+    timer.observe(0.3, error=True)
+    text = metrics.render_prometheus()
+    assert "# TYPE calc_call_duration_seconds histogram" in text
+    assert 'calc_call_duration_seconds_bucket{name="test.op",le="2.5e-05"} 1' in text
+    assert 'calc_call_duration_seconds_bucket{name="test.op",le="+Inf"} 2' in text
+    assert 'calc_call_duration_seconds_count{name="test.op"} 2' in text
+    assert 'calc_call_errors_total{name="test.op"} 1' in text
+
+
+def test_metrics_endpoint_serves_prometheus_text(enabled_metrics):
+    server = metrics.serve(0)
+    assert metrics.serve(0) is server
+    evaluate_expression("1 + 1")
+    url = f"http://127.0.0.1:{server.server_port}/metrics"
+    with urllib.request.urlopen(url) as resp:
+        body = resp.read().decode("utf-8")
+    assert 'calc_call_duration_seconds_count{name="parser.tokenize"} 1' in body
@@ -57,3 +57,202 @@ def test_consecutive_numbers_without_operator_raises():
     with pytest.raises(ValueError):
         # missing operator between numbers
         evaluate_expression("1 2 + 3")
+
+
+@pytest.mark.parametrize(
+    "expr,rpn,expected",
+    [
+        ("3 + -5", ["3", "5", "u-", "+"], Decimal("-2")),
+        ("-3 * 2", ["3", "u-", "2", "*"], Decimal("-6")),
+        ("2 * -3 * 4", ["2", "3", "u-", "*", "4", "*"], Decimal("-24")),
+        ("-(2 + 3)", ["2", "3", "+", "u-"], Decimal("-5")),
+        ("- - 3", ["3", "u-", "u-"], Decimal("3")),
+        ("1 * +2", ["1", "2", "u+", "*"], Decimal("2")),
+        ("(-1) - -1", ["1", "u-", "1", "u-", "-"], Decimal("0")),
+    ],
+)
+def test_unary_signs(expr, rpn, expected):
+    assert to_rpn(tokenize(expr)) == rpn
+    assert evaluate_expression(expr) == expected
+
+
+@pytest.mark.parametrize(
+    "expr,tokens,expected",
+    [
+        ("1e6", ["1e6"], Decimal("1000000")),
+        ("2.5E-3 * 4", ["2.5E-3", "*", "4"], Decimal("0.01")),
+        ("1e+2+1", ["1e+2", "+", "1"], Decimal("101")),
+        ("-1E2", ["-", "1E2"], Decimal("-100")),
+    ],
+)
+def test_exponent_literals(expr, tokens, expected):
+    assert tokenize(expr) == tokens
+    assert evaluate_expression(expr) == expected
+
+
+@pytest.mark.parametrize("bad_expr", ["1e", "1e+", "2 e3", "3 -", "-", "(-)", "1 + * 2", "* 2"])
+def test_malformed_signs_and_exponents_raise(bad_expr):
+    with pytest.raises(ValueError):
+        evaluate_expression(bad_expr)
+
+
+def _outcome(func, text):
+    try:
+        return func(text)
+    except ValueError as e:
+        return f"error: {e}"
+
+
+def test_tokenize_matches_reference_tokenizer_on_random_input():
+    import random
+    from utils.parser import _tokenize_chars
+
+    rng = random.Random(1)
+    alphabet = "0123456789....eE+-*/() \t\nx²٣　"
+    for _ in range(5000):
+        text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 12)))
+        assert _outcome(tokenize, text) == _outcome(_tokenize_chars, text), repr(text)
+
+
+@pytest.mark.parametrize(
+    "text",
+    ["1..2", ".", "1e", "1e+", "1.5.e3", "2 x 3", "1²", "٣ + 1", "1　2", "  12.5e-3*(4)  "],
+)
+def test_tokenize_edge_cases_match_reference(text):
+    from utils.parser import _tokenize_chars
+
+    assert _outcome(tokenize, text) == _outcome(_tokenize_chars, text)
+
+
+@pytest.mark.parametrize(
+    "expr, code, position",
+    [
+        ("1 + x", "invalid_character", 4),
+        ("1..2", "invalid_number", 2),
+        ("2 (3)", "missing_operator", 2),
+        ("1 * * 2", "misplaced_operator", 4),
+        ("()", "misplaced_parenthesis", 1),
+        ("1 + (2 * 3", "mismatched_parentheses", 4),
+        ("3 +", "incomplete_expression", 3),
+        ("   ", "empty_expression", 3),
+        ("4 / (2 - 2)", "division_by_zero", 2),
+    ],
+)
+def test_try_evaluate_reports_code_and_position(expr, code, position):
+    from utils.parser import try_evaluate
+
+    result = try_evaluate(expr)
+    assert not result.ok
+    assert (result.value, result.code, result.position) == (None, code, position)
+    with pytest.raises(ValueError) as exc:
+        evaluate_expression(expr)
+    assert result.message == str(exc.value)
+
+
+def test_try_evaluate_matches_raising_api_on_random_input():
+    import random
+    from utils.parser import try_evaluate, try_evaluate_bytes, validate_expression
+
+    rng = random.Random(2)
+    alphabet = "0123456789....eE+-*/()  x²٣"
+    for _ in range(5000):
+        text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 12)))
+        expected = _outcome(evaluate_expression, text)
+        for result in (try_evaluate(text), try_evaluate_bytes(text.encode())):
+            assert (result.value if result.ok else f"error: {result.message}") == expected, repr(text)
+        if validate_expression(text) is not None:
+            assert str(expected).startswith("error: "), repr(text)
+
+
+def test_try_evaluate_success_and_non_string_input():
+    from utils.parser import try_evaluate, validate_expression
+
+    assert try_evaluate("2 * -3").value == Decimal("-6")
+    assert try_evaluate("2 * -3").ok
+    assert validate_expression("1 / 0") is None
+    assert try_evaluate(None).code == "invalid_input"
+
+
+def _decimal_value(tokens):
+    from utils.parser import _run, _shunt
+
+    rpn, failure = _shunt(tokens)
+    assert failure is None
+    value, failure = _run(rpn)
+    assert failure is None
+    return value
+
+
+@pytest.mark.parametrize(
+    "expr",
+    [
+        "12.50 + 3.25",
+        "19.99 * 3",
+        "4.50 - 19.99",
+        "1.00 / 4",
+        "100 / 0.5",
+        "0.000 + 1",
+        "123456789012345678901234567 + 0.5",
+        "99999999999999 * 99999999999999",
+    ],
+)
+def test_fixed_point_path_matches_decimal_exactly(expr):
+    from utils.parser import _evaluate_fixed
+
+    tokens = tokenize(expr)
+    value = _evaluate_fixed(tokens)
+    assert value is not None
+    assert value.as_tuple() == _decimal_value(tokens).as_tuple()
+
+
+@pytest.mark.parametrize(
+    "expr",
+    [
+        "1 + 2 + 3",
+        "-2 * 3",
+        "(2)",
+        "1e3 + 1",
+        "12345678901234567890123456789 + 1",
+        "1234567890123456789012345678 + 0.5",
+        "9999999999999999999999999999 * 5",
+        "100 / 7",
+        "1 / 4",
+        "2.50 - 2.5",
+        "1 / 0",
+        "1 + +",
+        "²",
+        "1.² + 1",
+        "٣ + 1",
+    ],
+)
+def test_fixed_point_path_leaves_other_input_to_decimal(expr):
+    from utils.parser import _evaluate_fixed, try_evaluate
+
+    assert _evaluate_fixed(tokenize(expr)) is None
+    result = try_evaluate(expr)
+    assert (result.value if result.ok else f"error: {result.message}") == _outcome(evaluate_expression, expr)
+
+
+def test_fixed_point_path_matches_decimal_on_random_input():
+    import random
+    from utils.parser import _evaluate_fixed
+
+    rng = random.Random(4)
+
+    def literal():
+        kind = rng.random()
+        if kind < 0.4:
+            return str(rng.randint(0, 999))
+        if kind < 0.8:
+            return f"{rng.randint(0, 9999)}.{rng.randint(0, 99):02d}"
+        return "".join(rng.choice("0123456789") for _ in range(rng.randint(10, 28)))
+
+    fast = 0
+    for _ in range(3000):
+        tokens = tokenize(f"{literal()} {rng.choice('+-*/')} {literal()}")
+        value = _evaluate_fixed(tokens)
+        if value is None:
+            continue
+        fast += 1
+        assert value.as_tuple() == _decimal_value(tokens).as_tuple(), " ".join(tokens)
+    assert fast > 1500
@@ -0,0 +1,141 @@
+import sys
+import types
+import importlib
+import marshal
+import pstats
+import contextlib
+
+from utils.profiling import RerunProfiler
+
+
+class FakeStreamlit(types.ModuleType):
+    def __init__(self):
+        super().__init__("streamlit")
+        # emulate streamlit.session_state as a simple dict
+        self.session_state = {}
+        self.query_params = {}
+        self.texts = []
+        self.downloads = []
+        self.expanders = []
+
+    def set_page_config(self, **kwargs):
+        pass
+
+    def write(self, *args, **kwargs):
+        pass
+
+    def markdown(self, *args, **kwargs):
+        pass
+
+    def button(self, label):
+        return False
+
+    def text(self, body):
+        self.texts.append(body)
+
+    def download_button(self, label, data=None, **kwargs):
+        self.downloads.append((label, data, kwargs))
+
+    @contextlib.contextmanager
+    def expander(self, label):
+        self.expanders.append(label)
+        yield
+
+
+def _fresh_import_app(fake):
+    # Ensure fresh import for app with provided fake streamlit
+    if 'app' in sys.modules:
+        del sys.modules['app']
+    sys.modules['streamlit'] = fake
+    return importlib.import_module('app')
+
+
+def _work(n):
+    return [str(i) for i in range(n)]
+
+
+def test_profiler_aggregates_runs(tmp_path):
+    profiler = RerunProfiler()
+    assert profiler.run(_work, 1000)[-1] == '999'
+    profiler.run(_work, 1000)
+    assert profiler.runs == 2
+
+    text = profiler.stats_text()
+    assert '_work' in text
+
+    path = tmp_path / 'calc.prof'
+    path.write_bytes(profiler.profile_bytes())
+    stats = pstats.Stats(str(path))
+    calls = [v for k, v in stats.stats.items() if k[2] == '_work']
+    assert calls and calls[0][1] == 2  # two primitive calls across reruns
+
+
+def test_profiler_reports_allocation_sites():
+    profiler = RerunProfiler()
+    keep = profiler.run(_work, 20000)
+    top = profiler.top_allocations(3)
+    assert top and top[0][1] > 0
+    assert 'test_profiling.py' in top[0][0]
+    assert 'Top 3 allocation sites over 1 rerun(s)' in profiler.allocation_report(3)
+    assert len(keep) == 20000
+
+
+def test_profiler_reset():
+    profiler = RerunProfiler()
+    profiler.run(_work, 10)
+    profiler.reset()
+    assert profiler.runs == 0
+    assert profiler.top_allocations() == []
+    assert marshal.loads(profiler.profile_bytes()) == {}
+
+
+def test_main_without_profiling_renders_normally(monkeypatch):
+    monkeypatch.delenv('CALC_PROFILE', raising=False)
+    fake = FakeStreamlit()
+    app = _fresh_import_app(fake)
+    app.main()
+    assert fake.session_state['calculator'].display_value == '0'
+    assert fake.expanders == []
+
+
+def test_main_ignores_query_param_unless_allowed(monkeypatch):
+    monkeypatch.delenv('CALC_PROFILE', raising=False)
+    monkeypatch.delenv('CALC_PROFILE_ALLOW', raising=False)
+    from utils.profiling import PROFILER
+    PROFILER.reset()
+    fake = FakeStreamlit()
+    fake.query_params = {'profile': '1'}
+    app = _fresh_import_app(fake)
+    app.main()
+    assert PROFILER.runs == 0
+    assert fake.expanders == []
+
+
+def test_main_profiles_when_query_param_set(monkeypatch):
+    monkeypatch.delenv('CALC_PROFILE', raising=False)
+    monkeypatch.setenv('CALC_PROFILE_ALLOW', '1')
+    from utils.profiling import PROFILER
+    PROFILER.reset()
+    fake = FakeStreamlit()
+    fake.query_params = {'profile': '1'}
+    app = _fresh_import_app(fake)
+    app.main()
+    app.main()
+    assert PROFILER.runs == 2
+    assert fake.expanders[-1] == 'Profile (2 reruns)'
+    label, data, kwargs = fake.downloads[-1]
+    assert kwargs['file_name'] == 'calculator.prof'
+    assert isinstance(marshal.loads(data), dict)
+    assert any('render_calculator' in t for t in fake.texts)
+    PROFILER.reset()
+
+
+def test_main_profiles_when_env_var_set(monkeypatch):
+    monkeypatch.setenv('CALC_PROFILE', '1')
+    from utils.profiling import PROFILER
+    PROFILER.reset()
+    fake = FakeStreamlit()
+    app = _fresh_import_app(fake)
+    app.main()
+    assert PROFILER.runs == 1
+    PROFILER.reset()
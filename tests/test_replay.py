@@ -0,0 +1,121 @@
+import io
+import random
+import sys
+import types
+import importlib
+
+from utils import error_log
+from utils.replay import KEY_EVENTS, read_key_log, replay, replay_many
+from utils.state import CalculatorState
+
+
+class FakeStreamlit(types.ModuleType):
+    def __init__(self):
+        super().__init__("streamlit")
+        # emulate streamlit.session_state as a simple dict
+        self.session_state = {}
+
+    def set_page_config(self, **kwargs):
+        pass
+
+    def write(self, *args, **kwargs):
+        pass
+
+    def markdown(self, *args, **kwargs):
+        pass
+
+    def button(self, label):
+        return False
+
+
+def _fresh_import_app(fake):
+    # Ensure fresh import for app with provided fake streamlit
+    if 'app' in sys.modules:
+        del sys.modules['app']
+    sys.modules['streamlit'] = fake
+    return importlib.import_module('app')
+
+
+def _press_in_app(app, key):
+    """What a click on the button mapped to key does in the app."""
+    label = KEY_EVENTS[key]
+    if label == '=':
+        app._perform_calculation()
+    elif label == 'C':
+        app._handle_clear_entry()
+    elif label == '%':
+        app._handle_percentage()
+    elif label == '⌫':
+        app._handle_backspace()
+    elif label in {'+', '-', '×', '÷'}:
+        app._handle_operator(label)
+    else:
+        app._handle_digit(label)
+
+
+def test_replay_produces_display_and_history():
+    result = replay(['1', '2', '*', '3', 'Enter', '/', '4', 'Enter'])
+    assert result.display_value == '9'
+    assert result.history == [('12 × 3', '36'), ('36 ÷ 4', '9')]
+    assert (result.applied, result.ignored, result.failures, result.errors) == (8, 0, 0, 0)
+
+
+def test_escape_and_backspace_map_to_clear_entry_and_delete():
+    result = replay(['5', '+', '4', '2', 'Backspace', 'Enter'])
+    assert result.history == [('5 + 4', '9')]
+    result = replay(['5', '+', '4', 'Escape', '1', 'Enter'])
+    assert result.history == [('5 + 1', '6')]
+
+
+def test_unmapped_keys_are_ignored():
+    result = replay(['Shift', '7', 'a', 'ArrowLeft', '%'])
+    assert result.display_value == '0.07'
+    assert result.ignored == 3
+    assert result.applied == 2
+
+
+def test_failures_are_counted_and_replay_continues():
+    result = replay(['1', '/', '0', 'Enter', '2', '+', '2', 'Enter'])
+    assert result.failures == 1
+    assert result.display_value == '4'
+    assert result.history == [('2 + 2', '4')]
+
+
+def test_replay_records_results_too_large_to_format_as_failures():
+    state = CalculatorState(current_input='1', previous_value='9' * 30, operator='×', waiting_for_operand=False)
+    result = replay(['Enter', '+', '3'], state)
+    # formatting a 31-digit result overflows the 28 digit context
+    assert (result.failures, result.errors) == (1, 0)
+    assert result.state.error_state == 'result is too large to format'
+    assert result.display_value == '3'
+
+
+def test_replay_many_uses_fresh_state_per_log():
+    results = replay_many([['1', '+', '1', 'Enter'], ['2']])
+    assert [r.display_value for r in results] == ['2', '2']
+    assert results[1].history == []
+
+
+def test_read_key_log(tmp_path):
+    path = tmp_path / 'keys.log'
+    path.write_text('1\n+\n\n 2 \nEnter\n', encoding='utf-8')
+    assert read_key_log(str(path)) == ['1', '+', '2', 'Enter']
+
+
+def test_replay_matches_app_handlers_on_random_sessions():
+    error_log.configure(stream=io.StringIO())
+    rng = random.Random(7)
+    keys = list(KEY_EVENTS) + ['Tab']
+    fake = FakeStreamlit()
+    app = _fresh_import_app(fake)
+    try:
+        for _ in range(50):
+            fake.session_state.clear()
+            app._init_session_state()
+            log = [rng.choice(keys) for _ in range(40)]
+            for key in log:
+                if key in KEY_EVENTS:
+                    _press_in_app(app, key)
+            assert replay(log).state.as_dict() == fake.session_state['calculator'].as_dict()
+    finally:
+        error_log.shutdown()
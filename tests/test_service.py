@@ -0,0 +1,190 @@
+import http.client
+import json
+import threading
+
+import pytest
+
+import service
+
+
+@pytest.fixture
+def server():
+    service._cache.clear()
+    srv = service.create_server("127.0.0.1", 0)
+    thread = threading.Thread(target=srv.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True)
+    thread.start()
+    yield srv
+    srv.shutdown()
+    srv.server_close()
+
+
+def _request(conn, method, path, body=None):
+    payload = None if body is None else json.dumps(body)
+    headers = {} if payload is None else {"Content-Type": "application/json"}
+    conn.request(method, path, body=payload, headers=headers)
+    resp = conn.getresponse()
+    return resp.status, json.loads(resp.read().decode("utf-8"))
+
+
+def test_health(server):
+    conn = http.client.HTTPConnection("127.0.0.1", server.server_port)
+    assert _request(conn, "GET", "/health") == (200, {"status": "ok"})
+
+
+def test_evaluate_endpoint(server):
+    conn = http.client.HTTPConnection("127.0.0.1", server.server_port)
+    status, body = _request(conn, "POST", "/evaluate", {"expression": "10 / 4"})
+    assert status == 200
+    assert body == {"value": "2.5", "result": "2.5"}
+
+
+def test_evaluate_endpoint_reports_errors(server):
+    conn = http.client.HTTPConnection("127.0.0.1", server.server_port)
+    status, body = _request(conn, "POST", "/evaluate", {"expression": "1 / 0"})
+    assert status == 400
+    assert "division by zero" in body["error"]
+    assert (body["code"], body["position"]) == ("division_by_zero", 2)
+
+
+def test_batch_endpoint_reports_per_item_errors(server):
+    conn = http.client.HTTPConnection("127.0.0.1", server.server_port)
+    status, body = _request(conn, "POST", "/evaluate/batch", {"expressions": ["1 + 1", "1 / 0", "2 / 3"]})
+    assert status == 200
+    results = body["results"]
+    assert results[0] == {"value": "2", "result": "2"}
+    assert "error" in results[1]
+    assert results[2]["result"] == "0.67"
+
+
+def test_batch_reports_syntax_errors_without_failing_valid_rows():
+    service._cache.clear()
+    results = service.evaluate_batch(["1 + 1", "2 *", "1 + 1", "(3"])
+    assert results[0] == results[2] == {"value": "2", "result": "2"}
+    assert results[1] == {"error": "expression ends with incomplete token", "code": "incomplete_expression", "position": 3}
+    assert results[3]["code"] == "mismatched_parentheses"
+
+
+def test_connection_is_kept_alive(server):
+    conn = http.client.HTTPConnection("127.0.0.1", server.server_port)
+    _request(conn, "POST", "/evaluate", {"expression": "1 + 1"})
+    sock = conn.sock
+    _request(conn, "POST", "/evaluate", {"expression": "2 + 2"})
+    assert conn.sock is sock
+
+
+@pytest.mark.parametrize(
+    "path,body",
+    [
+        ("/evaluate", {"expression": 5}),
+        ("/evaluate", ["not", "an", "object"]),
+        ("/evaluate/batch", {"expressions": "1 + 1"}),
+    ],
+)
+def test_bad_requests(server, path, body):
+    conn = http.client.HTTPConnection("127.0.0.1", server.server_port)
+    status, payload = _request(conn, "POST", path, body)
+    assert status == 400
+    assert "error" in payload
+
+
+def test_unknown_path(server):
+    conn = http.client.HTTPConnection("127.0.0.1", server.server_port)
+    assert _request(conn, "GET", "/nope")[0] == 404
+
+
+def test_results_are_cached():
+    cache = service.ResultCache(maxsize=2)
+    service.evaluate("1 + 2", cache)
+    assert cache.get("1 + 2") is not None
+    service.evaluate_batch(["3 * 3", "4 * 4"], cache)
+    # least recently used entry was evicted
+    assert cache.get("1 + 2") is None
+    assert len(cache) == 2
+
+
+def test_keypad_endpoint_replays_events(server):
+    conn = http.client.HTTPConnection("127.0.0.1", server.server_port)
+    status, body = _request(conn, "POST", "/keypad", {"events": ["1", "2", "+", "3", "="]})
+    assert status == 200
+    assert body["state"]["display_value"] == "15"
+    assert body["state"]["calculation_history"] == [{"expression": "12 + 3", "result": "15"}]
+
+    status, body = _request(conn, "POST", "/keypad", {"events": ["×", "2", "="], "state": body["state"]})
+    assert status == 200
+    assert body["state"]["display_value"] == "30"
+    assert len(body["state"]["calculation_history"]) == 2
+
+
+def test_keypad_endpoint_rejects_unknown_events(server):
+    conn = http.client.HTTPConnection("127.0.0.1", server.server_port)
+    status, body = _request(conn, "POST", "/keypad", {"events": ["1", "sqrt"]})
+    assert status == 400
+    assert "sqrt" in body["error"]
+
+
+@pytest.mark.parametrize(
+    "state",
+    [
+        {"previous_value": 3, "operator": "+"},
+        {"previous_value": "3", "operator": "^"},
+        {"current_input": "abc"},
+        {"previous_value": "1e", "operator": "+"},
+    ],
+)
+def test_keypad_endpoint_rejects_invalid_state(server, state):
+    conn = http.client.HTTPConnection("127.0.0.1", server.server_port)
+    status, body = _request(conn, "POST", "/keypad", {"events": ["2", "="], "state": state})
+    assert status == 400
+    assert "error" in body
+
+
+def test_keypad_endpoint_reports_results_too_large_to_format(server):
+    conn = http.client.HTTPConnection("127.0.0.1", server.server_port)
+    status, body = _request(conn, "POST", "/keypad", {"events": ["9"] * 15 + ["×"] + ["9"] * 15 + ["="]})
+    assert status == 200
+    assert body["state"]["display_value"] == "Error"
+    assert body["state"]["error_state"] == "result is too large to format"
+
+
+def test_cache_skips_long_expressions():
+    cache = service.ResultCache(max_length=8)
+    service.evaluate("1 + 2", cache)
+    service.evaluate("1 + 2 + 3 + 4", cache)
+    assert len(cache) == 1 and cache.get("1 + 2 + 3 + 4") is None
+
+
+def test_results_too_large_to_format_are_reported_as_errors(server):
+    results = service.evaluate_batch(["9999999999999999999999999999 * 99", "1 + 1"], service.ResultCache())
+    assert results[0] == {"error": "result is too large to format", "code": "arithmetic_error", "position": None}
+    assert results[1] == {"value": "2", "result": "2"}
+    conn = http.client.HTTPConnection("127.0.0.1", server.server_port)
+    status, body = _request(conn, "POST", "/evaluate", {"expression": "1e100"})
+    assert status == 400
+    assert body["code"] == "arithmetic_error"
+
+
+def test_unexpected_errors_return_500(server, monkeypatch):
+    reported = []
+
+    def fail(expression):
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(service, "evaluate", fail)
+    monkeypatch.setattr(service._errors, "report", lambda code, exc=None, **fields: reported.append((code, str(exc), fields)))
+    conn = http.client.HTTPConnection("127.0.0.1", server.server_port)
+    assert _request(conn, "POST", "/evaluate", {"expression": "1 + 1"}) == (500, {"error": "internal error"})
+    assert reported == [("service_handler_error", "boom", {"path": "/evaluate"})]
+
+
+def test_batch_evaluates_each_distinct_miss_once_without_raising(monkeypatch):
+    calls = []
+    try_evaluate = service._parser.try_evaluate
+
+    def counting(expression):
+        calls.append(expression)
+        return try_evaluate(expression)
+
+    monkeypatch.setattr(service._parser, "try_evaluate", counting)
+    results = service.evaluate_batch(["1 +", "2 * 3", "1 +", "4 / 0"], service.ResultCache())
+    assert calls == ["1 +", "2 * 3", "4 / 0"]
+    assert [r.get("code") for r in results] == ["incomplete_expression", None, "incomplete_expression", "division_by_zero"]
@@ -0,0 +1,16 @@
+from benchmarks.startup import IMPORT_TARGET_MS, app_import_ms, import_times
+
+
+def test_app_import_skips_rarely_used_modules():
+    times = import_times()
+    assert 'app' in times
+    # loaded on demand: keyboard component, metrics endpoint, profiling mode, history export/import and search
+    for module in ('streamlit.components.v1', 'http.server', 'cProfile', 'tracemalloc', 'pathlib', 'utils.history_io', 'utils.history_index'):
+        assert module not in times, module
+
+
+def test_app_import_time_budget():
+    median_ms, _ = app_import_ms(runs=3)
+    # generous multiple of the target so slow CI machines do not flake;
+    # python -m benchmarks.startup reports against the target itself
+    assert median_ms < IMPORT_TARGET_MS * 5
@@ -0,0 +1,119 @@
+import sys
+import types
+import importlib
+
+import pytest
+
+from benchmarks.session_footprint import measure
+from utils.state import CalculatorState, DISPLAY_CURRENT, DISPLAY_ERROR, DISPLAY_PREVIOUS, LEGACY_KEYS
+
+
+class FakeStreamlit(types.ModuleType):
+    def __init__(self):
+        super().__init__("streamlit")
+        # emulate streamlit.session_state as a simple dict
+        self.session_state = {}
+
+    def set_page_config(self, **kwargs):
+        pass
+
+    def write(self, *args, **kwargs):
+        pass
+
+    def markdown(self, *args, **kwargs):
+        pass
+
+    def button(self, label):
+        return False
+
+
+def _fresh_import_app(fake):
+    # Ensure fresh import for app with provided fake streamlit
+    if 'app' in sys.modules:
+        del sys.modules['app']
+    sys.modules['streamlit'] = fake
+    return importlib.import_module('app')
+
+
+def test_defaults():
+    assert CalculatorState().as_dict() == {
+        'current_input': '0',
+        'previous_value': '',
+        'operator': None,
+        'waiting_for_operand': True,
+        'display_value': '0',
+        'calculation_history': [],
+        'error_state': None,
+    }
+
+
+def test_display_value_is_derived():
+    state = CalculatorState(current_input='5', previous_value='12')
+    assert state.display_value == '5'
+    state.display_source = DISPLAY_PREVIOUS
+    assert state.display_value == '12'
+    state.previous_value = ''
+    assert state.display_value == '5'
+    state.display_source = DISPLAY_ERROR
+    assert state.display_value == 'Error'
+
+
+def test_state_has_no_instance_dict():
+    assert not hasattr(CalculatorState(), '__dict__')
+
+
+def test_from_mapping_round_trips_legacy_layout():
+    legacy = {
+        'current_input': '3',
+        'previous_value': '12',
+        'operator': '+',
+        'waiting_for_operand': True,
+        'display_value': '12',
+        'calculation_history': [{'expression': '5 + 7', 'result': '12'}],
+        'error_state': None,
+    }
+    state = CalculatorState.from_mapping(legacy)
+    assert state.display_source == DISPLAY_PREVIOUS
+    assert state.history == [('5 + 7', '12')]
+    assert state.as_dict() == legacy
+
+
+def test_from_mapping_error_display():
+    state = CalculatorState.from_mapping({'display_value': 'Error', 'error_state': 'division by zero'})
+    assert state.display_source == DISPLAY_ERROR
+    assert state.display_value == 'Error'
+
+
+@pytest.mark.parametrize(
+    'data',
+    [{'previous_value': 3}, {'waiting_for_operand': 'yes'}, {'operator': 1}, {'calculation_history': 'x'}],
+)
+def test_from_mapping_rejects_invalid_field_types(data):
+    with pytest.raises(ValueError):
+        CalculatorState.from_mapping(data)
+
+
+def test_reset_replaces_history():
+    state = CalculatorState(current_input='9', history=[('1 + 1', '2')])
+    history = state.history
+    state.reset()
+    assert state.as_dict() == CalculatorState().as_dict()
+    assert history == [('1 + 1', '2')]
+    assert state.display_source == DISPLAY_CURRENT
+
+
+def test_app_migrates_legacy_session_keys():
+    fake = FakeStreamlit()
+    fake.session_state.update({'current_input': '42', 'display_value': '42', 'waiting_for_operand': False})
+    app = _fresh_import_app(fake)
+
+    app.render_calculator()
+
+    assert not any(key in fake.session_state for key in LEGACY_KEYS)
+    assert fake.session_state['calculator'].current_input == '42'
+
+
+def test_compact_state_is_smaller_than_legacy_layout():
+    for history in (0, 10, 100):
+        legacy, compact = measure(history)
+        assert compact < legacy
@@ -0,0 +1,140 @@
+import sys
+import types
+import importlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from decimal import getcontext
+
+import pytest
+
+from utils.parser import tokenize, to_rpn, evaluate_expression
+from utils.expr_ast import NodeTable, SubtreeEvaluator
+from utils.compiled import compile_expression
+
+
+class FakeStreamlit(types.ModuleType):
+    """Streamlit double whose session state and clicks are per thread.
+
+    Real Streamlit runs each session's script in its own thread and resolves
+    st.session_state to that session, which this emulates with threading.local.
+    """
+
+    def __init__(self):
+        super().__init__("streamlit")
+        self._local = threading.local()
+
+    def start_session(self, click_labels):
+        self._local.session_state = {}
+        self._local.click_labels = set(click_labels)
+        self._local.clicked_labels = set()
+
+    @property
+    def session_state(self):
+        return self._local.session_state
+
+    def set_page_config(self, **kwargs):
+        pass
+
+    def write(self, *args, **kwargs):
+        pass
+
+    def markdown(self, *args, **kwargs):
+        pass
+
+    def button(self, label):
+        # Simulate click only if label is configured for this thread's session
+        if label in self._local.click_labels and label not in self._local.clicked_labels:
+            self._local.clicked_labels.add(label)
+            return True
+        return False
+
+
+def _fresh_import_app(fake):
+    # Ensure fresh import for app with provided fake streamlit
+    if 'app' in sys.modules:
+        del sys.modules['app']
+    sys.modules['streamlit'] = fake
+    return importlib.import_module('app')
+
+
+def _session_script(index):
+    """Return (clicks, expected display, expected expression) for session index.
+
+    Keypad rows are rendered top to bottom, so 'a × b' (a in 7-9, b in 4-6)
+    and 'a - b' (a in 4-6, b in 1-3) are processed in click order.
+    """
+    a = '789'[index % 3]
+    b = '456'[(index // 3) % 3]
+    if index % 2:
+        return {a, '×', b, '='}, str(int(a) * int(b)), f"{a} × {b}"
+    b = '123'[(index // 3) % 3]
+    a = '456'[index % 3]
+    return {a, '-', b, '='}, str(int(a) - int(b)), f"{a} - {b}"
+
+
+def test_concurrent_sessions_are_isolated():
+    fake = FakeStreamlit()
+    app = _fresh_import_app(fake)
+    sessions = 300
+    barrier = threading.Barrier(50)
+
+    def run(index):
+        clicks, expected, expression = _session_script(index)
+        fake.start_session(clicks)
+        if index < 50:
+            # line the first wave up so sessions genuinely overlap
+            barrier.wait()
+        app.render_calculator()
+        ss = fake.session_state['calculator'].as_dict()
+        return index, ss, expected, expression
+
+    with ThreadPoolExecutor(max_workers=50) as pool:
+        outcomes = list(pool.map(run, range(sessions)))
+
+    for index, ss, expected, expression in outcomes:
+        assert ss.get('display_value') == expected, index
+        assert ss.get('calculation_history') == [{'expression': expression, 'result': expected}], index
+        assert ss.get('error_state') is None, index
+
+
+def test_evaluation_ignores_caller_decimal_context():
+    expected = evaluate_expression("1 / 3 + 2 / 3")
+    results = []
+
+    def run():
+        getcontext().prec = 3
+        results.append(evaluate_expression("1 / 3 + 2 / 3"))
+        results.append(compile_expression("1 / 3 + 2 / 3").evaluate())
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    thread.join()
+    assert results == [expected, expected]
+    assert getcontext().prec == 28
+
+
+def test_shared_node_table_interns_consistently():
+    table = NodeTable()
+    evaluator = SubtreeEvaluator(table)
+    exprs = [f"({i % 7} + 1) * ({i % 5} + 2)" for i in range(200)]
+
+    def run(expr):
+        node = table.from_rpn(to_rpn(tokenize(expr)))
+        return node, evaluator.evaluate(node)
+
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        outcomes = list(pool.map(run, exprs * 4))
+
+    for expr, (node, value) in zip(exprs * 4, outcomes):
+        assert value == evaluate_expression(expr)
+        assert table.from_rpn(to_rpn(tokenize(expr))) is node
+    uids = sorted(node.uid for node in table._nodes.values())
+    assert uids == list(range(len(table)))
+
+
+def test_compiled_expression_is_immutable():
+    compiled = compile_expression("1 + 2")
+    with pytest.raises(AttributeError):
+        compiled.root = 0
+    with pytest.raises(AttributeError):
+        del compiled.rpn
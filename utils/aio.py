@@ -0,0 +1,116 @@
+import asyncio
+from concurrent.futures import Executor
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional
+
+from utils.parser import evaluate_expression
+from utils.expr_ast import evaluate_many
+
+__all__ = ["aevaluate_expression", "aevaluate_many", "set_default_executor", "get_default_executor"]
+
+DEFAULT_CHUNK_SIZE = 256
+DEFAULT_CONCURRENCY = 4
+
+_default_executor: Optional[Executor] = None
+
+
+def set_default_executor(executor: Optional[Executor]) -> None:
+    """Set the executor used when callers do not pass one.
+
+    None selects the running event loop's default executor.
+    """
+    global _default_executor
+    if executor is not None and not isinstance(executor, Executor):
+        raise TypeError("executor must be a concurrent.futures.Executor or None")
+    _default_executor = executor
+
+
+def get_default_executor() -> Optional[Executor]:
+    return _default_executor
+
+
+def _positive_int(name: str, value: int) -> int:
+    if not isinstance(value, int) or isinstance(value, bool) or value < 1:
+        raise ValueError(f"{name} must be a positive integer")
+    return value
+
+
+async def aevaluate_expression(expression: str, *, executor: Optional[Executor] = None) -> Decimal:
+    """Evaluate expression in an executor so the event loop is not blocked.
+
+    Raises ValueError for malformed expressions or arithmetic errors.
+    """
+    loop = asyncio.get_running_loop()
+    if executor is None:
+        executor = _default_executor
+    return await loop.run_in_executor(executor, evaluate_expression, expression)
+
+
+async def aevaluate_many(
+    expressions: Iterable[str],
+    *,
+    executor: Optional[Executor] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    max_pending: Optional[int] = None,
+) -> List[Decimal]:
+    """Evaluate a batch of expressions off the event loop, preserving order.
+
+    The input is consumed lazily in chunks of chunk_size, each evaluated with
+    evaluate_many in the executor. At most concurrency chunks run at once and
+    at most max_pending (default 2 * concurrency) chunks are queued, so a huge
+    input iterable is never read far ahead of the workers. The producer yields
+    to the event loop after every chunk.
+    Raises ValueError for the first malformed expression or arithmetic error.
+    """
+    _positive_int("chunk_size", chunk_size)
+    _positive_int("concurrency", concurrency)
+    if max_pending is None:
+        max_pending = 2 * concurrency
+    _positive_int("max_pending", max_pending)
+
+    loop = asyncio.get_running_loop()
+    if executor is None:
+        executor = _default_executor
+
+    queue: "asyncio.Queue" = asyncio.Queue(maxsize=max_pending)
+    results: Dict[int, List[Decimal]] = {}
+
+    async def produce() -> None:
+        index = 0
+        chunk: List[str] = []
+        for expression in expressions:
+            chunk.append(expression)
+            if len(chunk) >= chunk_size:
+                await queue.put((index, chunk))
+                index += 1
+                chunk = []
+                # put() does not yield when the queue has room
+                await asyncio.sleep(0)
+        if chunk:
+            await queue.put((index, chunk))
+        for _ in range(concurrency):
+            await queue.put(None)
+
+    async def work() -> None:
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            index, chunk = item
+            results[index] = await loop.run_in_executor(executor, evaluate_many, chunk)
+
+    tasks = [asyncio.ensure_future(produce())]
+    tasks.extend(asyncio.ensure_future(work()) for _ in range(concurrency))
+    try:
+        await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+
+    ordered: List[Decimal] = []
+    for index in range(len(results)):
+        ordered.extend(results[index])
+    return ordered
@@ -0,0 +1,61 @@
+"""Evaluate large files of expressions, one per line, straight from an mmap.
+
+Lines are located and tokenized in place (see parser.tokenize_bytes), so a
+file is never decoded into per-line strings and memory use stays flat
+regardless of file size.
+"""
+import mmap
+from decimal import Decimal
+from typing import Iterator, NamedTuple, Optional, Tuple
+
+from utils.parser import EMPTY_EXPRESSION, BytesLike, try_evaluate_bytes
+
+__all__ = ["LineResult", "iter_line_spans", "evaluate_buffer", "evaluate_file"]
+
+
+class LineResult(NamedTuple):
+    line: int  # 1-based line number
+    value: Optional[Decimal]
+    error: Optional[str]
+    code: Optional[str] = None  # parser error code (see utils.parser)
+    column: Optional[int] = None  # 0-based offset of the error in the line
+
+
+def iter_line_spans(data: BytesLike, start: int = 0, end: Optional[int] = None) -> Iterator[Tuple[int, int]]:
+    """Yield (start, end) offsets of each line in data[start:end], without line terminators."""
+    if end is None:
+        end = len(data)
+    find = data.find
+    pos = start
+    while pos < end:
+        newline = find(b"\n", pos, end)
+        stop = end if newline == -1 else newline
+        line_end = stop - 1 if stop > pos and data[stop - 1] == 13 else stop  # drop '\r'
+        yield pos, line_end
+        pos = stop + 1
+
+
+def evaluate_buffer(data: BytesLike) -> Iterator[LineResult]:
+    """Evaluate each non-blank line of data, yielding its value or error.
+
+    data must support find() (bytes, bytearray or mmap). Invalid lines are
+    reported without raising any exception (see parser.try_evaluate_bytes).
+    """
+    for number, (start, end) in enumerate(iter_line_spans(data), 1):
+        result = try_evaluate_bytes(data, start, end)
+        if result.code is None:
+            yield LineResult(number, result.value, None)
+        elif result.code != EMPTY_EXPRESSION:
+            yield LineResult(number, None, result.message, result.code, result.position)
+
+
+def evaluate_file(path: str) -> Iterator[LineResult]:
+    """Memory-map the file at path and evaluate it line by line (see evaluate_buffer)."""
+    with open(path, "rb") as f:
+        try:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # empty files cannot be mapped
+            return
+        with data:
+            yield from evaluate_buffer(data)
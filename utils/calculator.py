@@ -1,7 +1,49 @@
-from decimal import Decimal, ROUND_HALF_UP
+from decimal import (
+    Context,
+    Decimal,
+    DivisionByZero,
+    InvalidOperation,
+    Overflow,
+    ROUND_HALF_EVEN,
+    ROUND_HALF_UP,
+    localcontext,
+)
 from typing import Final
 
-__all__ = ["add", "subtract", "multiply", "divide", "format_result", "toggle_sign", "calculate_percentage"]
+__all__ = [
+    "add",
+    "subtract",
+    "multiply",
+    "divide",
+    "format_result",
+    "toggle_sign",
+    "calculate_percentage",
+    "DECIMAL_CONTEXT",
+    "decimal_context",
+]
+
+# Arithmetic settings for expression evaluation (the decimal module defaults).
+# Treat as read-only: evaluation only ever runs under copies of it.
+DECIMAL_CONTEXT: Final[Context] = Context(
+    prec=28,
+    rounding=ROUND_HALF_EVEN,
+    Emin=-999999,
+    Emax=999999,
+    capitals=1,
+    clamp=0,
+    flags=[],
+    traps=[InvalidOperation, DivisionByZero, Overflow],
+)
+
+
+def decimal_context():
+    """Return a context manager that runs its block under a private copy of DECIMAL_CONTEXT.
+
+    Decimal contexts are per-thread, so each evaluation gets its own context
+    and is unaffected by changes a caller or another session thread makes to
+    its current context.
+    """
+    return localcontext(DECIMAL_CONTEXT)
 
 
 def add(a: Decimal, b: Decimal) -> Decimal:
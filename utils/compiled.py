@@ -0,0 +1,308 @@
+from decimal import Decimal
+from functools import lru_cache
+from typing import Callable, List, Optional, Tuple, Union
+
+from utils.calculator import decimal_context, divide, toggle_sign
+from utils.parser import _OPERATORS, _UNARY_OPERATORS, evaluate_rpn, tokenize, to_rpn
+
+__all__ = [
+    "CompiledExpression",
+    "IncrementalEvaluation",
+    "compile_expression",
+    "codegen",
+    "compiled_function",
+]
+
+# expressions whose generated functions compiled_function keeps
+FUNCTION_CACHE_SIZE = 4096
+
+# RPN operator -> calculator function, binary and prefix alike
+_FUNCS = {op: spec["func"] for op, spec in (*_OPERATORS.items(), *_UNARY_OPERATORS.items())}
+
+
+class CompiledExpression:
+    """A parsed expression laid out as flat, positional evaluation slots.
+
+    Each RPN token becomes a slot. Operator slots record their left and right
+    child slots (a prefix sign has only a left child; its right is -1), and
+    every slot records its parent (-1 for the root), so a
+    change to one literal only needs to walk up to the root. Literal
+    positions are numbered 0..n-1 in source order.
+
+    Instances are immutable once built, so one compiled expression can be
+    cached and shared by any number of threads; per-caller state lives in
+    IncrementalEvaluation.
+    """
+
+    __slots__ = ("expression", "rpn", "ops", "lefts", "rights", "parents", "literal_slots", "literals", "root", "_function")
+
+    def __init__(self, rpn: List[str], expression: Optional[str] = None) -> None:
+        if not isinstance(rpn, list):
+            raise ValueError("rpn must be a list of tokens")
+
+        count = len(rpn)
+        ops: List[Optional[str]] = [None] * count
+        lefts: List[int] = [-1] * count
+        rights: List[int] = [-1] * count
+        parents: List[int] = [-1] * count
+        literal_slots: List[int] = []
+        literals: List[Decimal] = []
+
+        stack: List[int] = []
+        for slot, tok in enumerate(rpn):
+            if tok in _OPERATORS:
+                if len(stack) < 2:
+                    raise ValueError("insufficient operands for operator")
+                right = stack.pop()
+                left = stack.pop()
+                ops[slot] = tok
+                lefts[slot] = left
+                rights[slot] = right
+                parents[left] = slot
+                parents[right] = slot
+            elif tok in _UNARY_OPERATORS:
+                if not stack:
+                    raise ValueError("insufficient operands for operator")
+                operand = stack.pop()
+                ops[slot] = tok
+                lefts[slot] = operand
+                parents[operand] = slot
+            else:
+                try:
+                    literals.append(Decimal(tok))
+                except Exception:
+                    raise ValueError(f"invalid numeric token in RPN '{tok}'")
+                literal_slots.append(slot)
+            stack.append(slot)
+
+        if len(stack) != 1:
+            raise ValueError("malformed RPN expression")
+
+        _set = object.__setattr__
+        _set(self, "expression", expression)
+        _set(self, "rpn", tuple(rpn))
+        _set(self, "ops", tuple(ops))
+        _set(self, "lefts", tuple(lefts))
+        _set(self, "rights", tuple(rights))
+        _set(self, "parents", tuple(parents))
+        _set(self, "literal_slots", tuple(literal_slots))
+        _set(self, "literals", tuple(literals))
+        _set(self, "root", stack[0])
+        _set(self, "_function", None)
+
+    def __setattr__(self, name, value) -> None:
+        raise AttributeError("CompiledExpression is immutable")
+
+    def __delattr__(self, name) -> None:
+        raise AttributeError("CompiledExpression is immutable")
+
+    def __repr__(self) -> str:
+        return f"CompiledExpression({self.expression if self.expression is not None else self.rpn!r})"
+
+    def _compute(self, slot: int, values: List[Decimal]) -> Decimal:
+        op = self.ops[slot]
+        right = self.rights[slot]
+        try:
+            if right == -1:
+                return _FUNCS[op](values[self.lefts[slot]])
+            return _FUNCS[op](values[self.lefts[slot]], values[right])
+        except ValueError:
+            # propagate ValueError from calculator (e.g., division by zero)
+            raise
+        except Exception as e:
+            raise ValueError(f"error evaluating operator '{op}': {e}")
+
+    def evaluate_slots(self, literals: Optional[Tuple[Decimal, ...]] = None) -> List[Decimal]:
+        """Evaluate every slot and return the per-slot values (root at self.root).
+
+        literals optionally overrides the compiled literal values by position.
+        """
+        if literals is None:
+            literals = self.literals
+        elif len(literals) != len(self.literals):
+            raise ValueError("literal count does not match compiled expression")
+
+        values: List[Decimal] = [Decimal(0)] * len(self.rpn)
+        for position, slot in enumerate(self.literal_slots):
+            values[slot] = literals[position]
+        # RPN order is a topological order: children always precede parents
+        with decimal_context():
+            for slot, op in enumerate(self.ops):
+                if op is not None:
+                    values[slot] = self._compute(slot, values)
+        return values
+
+    def evaluate(self) -> Decimal:
+        """Evaluate the whole expression. Raises ValueError on arithmetic errors."""
+        return self.evaluate_slots()[self.root]
+
+    @property
+    def function(self) -> Callable[[], Decimal]:
+        """The expression compiled to a Python function (see codegen), built on first use.
+
+        Worth it for expressions evaluated many times; a single evaluation
+        is cheaper through evaluate().
+        """
+        function = self._function
+        if function is None:
+            function = _generate(self)
+            # a concurrent first use may build it twice; both results are equivalent
+            object.__setattr__(self, "_function", function)
+        return function
+
+    def incremental(self) -> "IncrementalEvaluation":
+        """Return an incremental evaluation seeded with the compiled literals."""
+        return IncrementalEvaluation(self)
+
+
+class IncrementalEvaluation:
+    """Mutable evaluation state over a CompiledExpression.
+
+    set_literal recomputes only the slots on the path from the changed
+    literal to the root, so an update costs O(depth) rather than O(n).
+    """
+
+    def __init__(self, compiled: CompiledExpression) -> None:
+        self.compiled = compiled
+        self._values = compiled.evaluate_slots()
+        self.recomputed = 0
+
+    @property
+    def value(self) -> Decimal:
+        return self._values[self.compiled.root]
+
+    def literal(self, position: int) -> Decimal:
+        """Return the current value of the literal at position (source order)."""
+        return self._values[self._literal_slot(position)]
+
+    def literals(self) -> Tuple[Decimal, ...]:
+        return tuple(self._values[slot] for slot in self.compiled.literal_slots)
+
+    def _literal_slot(self, position: int) -> int:
+        slots = self.compiled.literal_slots
+        if not isinstance(position, int) or not 0 <= position < len(slots):
+            raise ValueError(f"literal position out of range: {position}")
+        return slots[position]
+
+    def set_literal(self, position: int, value: Union[Decimal, str]) -> Decimal:
+        """Replace the literal at position and return the new expression value.
+
+        Raises ValueError on an invalid value or arithmetic error; the
+        evaluation state is left unchanged in that case.
+        """
+        slot = self._literal_slot(position)
+        if not isinstance(value, Decimal):
+            try:
+                value = Decimal(value)
+            except Exception:
+                raise ValueError(f"invalid numeric literal '{value}'")
+
+        compiled = self.compiled
+        values = self._values
+        # compute the new path values first so a failure leaves state intact
+        updates = {slot: value}
+        parent = compiled.parents[slot]
+        child = slot
+        with decimal_context():
+            while parent != -1:
+                left = compiled.lefts[parent]
+                right = compiled.rights[parent]
+                a = updates[left] if left == child else values[left]
+                op = compiled.ops[parent]
+                try:
+                    if right == -1:
+                        updates[parent] = _FUNCS[op](a)
+                    else:
+                        b = updates[right] if right == child else values[right]
+                        updates[parent] = _FUNCS[op](a, b)
+                except ValueError:
+                    raise
+                except Exception as e:
+                    raise ValueError(f"error evaluating operator '{op}': {e}")
+                child = parent
+                parent = compiled.parents[parent]
+
+        for changed, new_value in updates.items():
+            values[changed] = new_value
+        self.recomputed += len(updates) - 1
+        return values[compiled.root]
+
+
+def compile_expression(expression: str) -> CompiledExpression:
+    """Tokenize and convert expression to RPN, returning its compiled form.
+
+    Raises ValueError for malformed expressions.
+    """
+    try:
+        return CompiledExpression(to_rpn(tokenize(expression)), expression)
+    except ValueError:
+        raise
+    except Exception as e:
+        raise ValueError(f"failed to compile expression: {e}")
+
+
+# RPN operator -> Python expression template over two temporaries. All
+# operands are Decimals by construction, so the calculator's type checks are
+# redundant for +, - and *; divide is still called for its zero check.
+_CODE = {
+    "+": "{a} + {b}",
+    "-": "{a} - {b}",
+    "*": "{a} * {b}",
+    "/": "_divide({a}, {b})",
+    "u-": "_negate({a})",
+    "u+": "{a}",
+}
+
+
+def codegen(rpn: List[str]) -> Callable[[], Decimal]:
+    """Compile an RPN token list into a function of no arguments returning its value.
+
+    The function is straight-line code with one assignment per operator over
+    pre-bound Decimal literals, run under the shared decimal context, so
+    there is no token dispatch or operand stack at call time. Results and
+    errors match evaluate_rpn: any arithmetic error other than division by
+    zero is re-raised by re-running the interpreter, which names the
+    failing operator. Raises ValueError for malformed RPN.
+    """
+    # validates and resolves literals exactly as the interpreter does
+    return _generate(CompiledExpression(rpn))
+
+
+def _generate(compiled: CompiledExpression) -> Callable[[], Decimal]:
+    names: List[str] = []
+    lines: List[str] = []
+    for slot, op in enumerate(compiled.ops):
+        if op is None:
+            names.append(f"_c{slot}")
+        else:
+            names.append(f"_t{slot}")
+            right = compiled.rights[slot]
+            expr = _CODE[op].format(a=names[compiled.lefts[slot]], b=names[right] if right != -1 else None)
+            lines.append(f"                _t{slot} = {expr}")
+    constants = [f"_c{slot}" for slot in compiled.literal_slots]
+
+    source = "\n".join([
+        f"def _factory(_context, _divide, _negate, _interpret, _rpn, {', '.join(constants)}):",
+        "    def evaluate():",
+        "        with _context():",
+        "            try:",
+        *lines,
+        f"                return {names[compiled.root]}",
+        "            except ValueError:",
+        "                raise",
+        "            except Exception:",
+        "                return _interpret(_rpn)",
+        "    return evaluate",
+    ])
+    namespace: dict = {}
+    exec(compile(source, "<calculator codegen>", "exec"), namespace)
+    return namespace["_factory"](decimal_context, divide, toggle_sign, evaluate_rpn, list(compiled.rpn), *compiled.literals)
+
+
+@lru_cache(maxsize=FUNCTION_CACHE_SIZE)
+def compiled_function(expression: str) -> Callable[[], Decimal]:
+    """Return the generated function for expression, cached per expression string.
+
+    Raises ValueError for malformed expressions (failures are not cached).
+    """
+    return compile_expression(expression).function
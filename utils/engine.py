@@ -0,0 +1,261 @@
+"""Keypad state machine over CalculatorState, independent of Streamlit.
+
+Each transition takes the state it acts on and updates it in place; nothing
+here touches session state, logging or metrics. Transitions that can fail
+record the failure in state.error_state (and the display) exactly as the
+app always has and return the exception so callers can report it.
+"""
+import re
+from decimal import Decimal
+from typing import Callable, Dict, Iterable, Optional
+
+from utils import calculator as _calculator
+from utils import parser as _parser
+from utils.state import CalculatorState, DISPLAY_CURRENT, DISPLAY_ERROR, DISPLAY_PREVIOUS
+
+__all__ = [
+    "DIGITS",
+    "OPERATORS",
+    "EVENTS",
+    "digit",
+    "operator",
+    "equals",
+    "clear_all",
+    "clear_entry",
+    "toggle_sign",
+    "percentage",
+    "backspace",
+    "apply",
+    "run",
+    "validate",
+]
+
+DIGITS = frozenset("0123456789.")
+OPERATORS = frozenset(("+", "-", "×", "÷"))
+
+# what the keypad can leave in current_input or previous_value
+_NUMBER = re.compile(r"-?(?:[0-9]+\.?[0-9]*|\.[0-9]+)")
+
+# keypad operator -> (parser operator, calculator function)
+_BINARY = {
+    "+": ("+", _calculator.add),
+    "-": ("-", _calculator.subtract),
+    "×": ("*", _calculator.multiply),
+    "÷": ("/", _calculator.divide),
+}
+
+
+def _is_plain_number(text: str) -> bool:
+    """True for unsigned decimal literals such as '12', '0.' or '3.25'."""
+    return text.isascii() and text.replace(".", "", 1).isdigit()
+
+
+def _evaluate(prev: str, op: str, curr: str) -> Decimal:
+    """Evaluate 'prev op curr' with the same result and errors as utils.parser.
+
+    Two plain literals are combined directly; anything else (e.g. a negative
+    operand) goes through the expression parser.
+    """
+    eval_op, func = _BINARY[op]
+    if _is_plain_number(prev) and _is_plain_number(curr):
+        with _calculator.decimal_context():
+            try:
+                return func(Decimal(prev), Decimal(curr))
+            except ValueError:
+                raise
+            except Exception as e:
+                raise ValueError(f"error evaluating operator '{eval_op}': {e}")
+    return _parser.evaluate_expression(f"{prev} {eval_op} {curr}")
+
+
+def digit(state: CalculatorState, key: str) -> None:
+    """Enter a digit or decimal point; anything else is ignored.
+
+    Starts a new operand when waiting for one, ignores a second decimal
+    point and replaces a lone leading '0'.
+    """
+    if key not in DIGITS:
+        return
+    if state.waiting_for_operand:
+        state.current_input = "0." if key == "." else key
+        state.waiting_for_operand = False
+    else:
+        current = state.current_input
+        if key == ".":
+            if "." in current:
+                return
+            state.current_input = current + "."
+        elif current == "0":
+            state.current_input = key
+        else:
+            state.current_input = current + key
+    state.display_source = DISPLAY_CURRENT
+
+
+def equals(state: CalculatorState) -> Optional[ValueError]:
+    """Complete the pending operation, appending it to the history.
+
+    Without a pending operation the current input simply becomes the result.
+    On failure, including a result too large to format, the display shows
+    'Error', error_state holds the message and the exception is returned.
+    Either way state.current_input holds the value to chain from. Any other
+    exception propagates with state unchanged.
+    """
+    prev = state.previous_value
+    op = state.operator
+    failure = None
+    if op and prev:
+        curr = state.current_input
+        try:
+            formatted = _calculator.format_result(_evaluate(prev, op, curr))
+        except ValueError as e:
+            failure = e
+        except ArithmeticError:
+            # too many digits to quantize to two places
+            failure = ValueError("result is too large to format")
+        else:
+            state.history.append((f"{prev} {op} {curr}", formatted))
+            state.current_input = formatted
+
+    state.previous_value = ""
+    state.operator = None
+    state.waiting_for_operand = True
+    if failure is None:
+        state.display_source = DISPLAY_CURRENT
+        state.error_state = None
+    else:
+        state.display_source = DISPLAY_ERROR
+        state.error_state = str(failure)
+        state.current_input = "0"
+    return failure
+
+
+def operator(state: CalculatorState, op: str) -> Optional[ValueError]:
+    """Select an operator, first completing any pending operation (chaining).
+
+    Returns the exception if the chained calculation failed.
+    """
+    if op not in OPERATORS:
+        return None
+    failure = None
+    if not state.previous_value:
+        state.previous_value = state.current_input
+    elif state.operator:
+        failure = equals(state)
+        state.previous_value = state.current_input
+    state.operator = op
+    state.waiting_for_operand = True
+    state.display_source = DISPLAY_PREVIOUS
+    return failure
+
+
+def clear_all(state: CalculatorState) -> None:
+    """AC: reset everything, history included."""
+    state.reset()
+
+
+def clear_entry(state: CalculatorState) -> None:
+    """C: clear the current entry only."""
+    state.current_input = "0"
+    state.display_source = DISPLAY_CURRENT
+
+
+def _unary(state: CalculatorState, func: Callable[[Decimal], Decimal], code: str) -> Optional[Exception]:
+    try:
+        state.current_input = _calculator.format_result(func(Decimal(state.current_input)))
+    except Exception as e:
+        # leave the input untouched
+        state.error_state = code
+        return e
+    state.display_source = DISPLAY_CURRENT
+    state.error_state = None
+    return None
+
+
+def toggle_sign(state: CalculatorState) -> Optional[Exception]:
+    """±: negate the current input; on failure error_state is 'toggle_sign_invalid_input'."""
+    return _unary(state, _calculator.toggle_sign, "toggle_sign_invalid_input")
+
+
+def percentage(state: CalculatorState) -> Optional[Exception]:
+    """%: divide the current input by 100; on failure error_state is 'percentage_invalid_input'."""
+    return _unary(state, _calculator.calculate_percentage, "percentage_invalid_input")
+
+
+def backspace(state: CalculatorState) -> None:
+    """⌫: drop the last character, or reset the input when waiting for an operand."""
+    state.display_source = DISPLAY_CURRENT
+    if state.waiting_for_operand:
+        state.current_input = "0"
+        return
+    new = (state.current_input or "0")[:-1]
+    # an empty input or a lone sign becomes '0'
+    state.current_input = new if new and new != "-" else "0"
+
+
+def _digit_event(key: str) -> Callable[[CalculatorState], None]:
+    return lambda state: digit(state, key)
+
+
+def _operator_event(op: str) -> Callable[[CalculatorState], Optional[ValueError]]:
+    return lambda state: operator(state, op)
+
+
+# keypad label -> transition
+EVENTS: Dict[str, Callable[[CalculatorState], object]] = {
+    **{key: _digit_event(key) for key in sorted(DIGITS)},
+    **{op: _operator_event(op) for op in sorted(OPERATORS)},
+    "=": equals,
+    "AC": clear_all,
+    "C": clear_entry,
+    "±": toggle_sign,
+    "%": percentage,
+    "⌫": backspace,
+}
+
+
+def apply(state: CalculatorState, event: str) -> CalculatorState:
+    """Apply one keypad event (a button label) to state and return it.
+
+    Raises ValueError for labels that are not on the keypad.
+    """
+    try:
+        transition = EVENTS[event]
+    except (KeyError, TypeError):
+        raise ValueError(f"unknown keypad event: {event!r}")
+    transition(state)
+    return state
+
+
+def validate(state: CalculatorState) -> None:
+    """Raise ValueError if state holds values no keypad sequence produces.
+
+    For states from outside the app (e.g. posted to the service), so that a
+    bad value is rejected up front instead of failing inside a transition.
+    """
+    if not _NUMBER.fullmatch(state.current_input):
+        raise ValueError("'current_input' must be a number")
+    if state.previous_value and not _NUMBER.fullmatch(state.previous_value):
+        raise ValueError("'previous_value' must be a number or empty")
+    if state.operator is not None and state.operator not in OPERATORS:
+        raise ValueError("'operator' must be one of + - × ÷")
+
+
+def run(events: Iterable[str], state: Optional[CalculatorState] = None) -> CalculatorState:
+    """Apply events in order to state (a fresh one by default) and return it.
+
+    A given state is checked with validate first. Raises ValueError for an
+    invalid state or on the first unknown event.
+    """
+    if state is None:
+        state = CalculatorState()
+    else:
+        validate(state)
+    transitions = EVENTS
+    for event in events:
+        try:
+            transition = transitions[event]
+        except (KeyError, TypeError):
+            raise ValueError(f"unknown keypad event: {event!r}")
+        transition(state)
+    return state
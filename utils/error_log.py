@@ -0,0 +1,214 @@
+import atexit
+import json
+import logging
+import queue
+import sys
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, List, Optional, TextIO
+
+__all__ = [
+    "JsonFormatter",
+    "RateLimitFilter",
+    "DuplicateSampler",
+    "DroppingQueueHandler",
+    "configure",
+    "shutdown",
+    "report",
+    "LOGGER_NAME",
+]
+
+LOGGER_NAME = "calculator"
+
+DEFAULT_QUEUE_SIZE = 10000
+DEFAULT_RATE = 50.0  # records per second
+DEFAULT_BURST = 100
+DEFAULT_SAMPLE_EVERY = 100
+DEFAULT_WINDOW = 10.0  # seconds
+
+
+class JsonFormatter(logging.Formatter):
+    """Format records as one JSON object per line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": round(record.created, 6),
+            "level": record.levelname,
+            "logger": record.name,
+            "code": getattr(record, "code", None),
+            "message": record.getMessage(),
+        }
+        fields = getattr(record, "fields", None)
+        if fields:
+            payload.update(fields)
+        suppressed = getattr(record, "suppressed", 0)
+        if suppressed:
+            payload["suppressed"] = suppressed
+        return json.dumps(payload, default=str)
+
+
+class RateLimitFilter(logging.Filter):
+    """Token bucket: allow rate records per second with bursts of up to burst."""
+
+    def __init__(self, rate: float = DEFAULT_RATE, burst: int = DEFAULT_BURST) -> None:
+        super().__init__()
+        self.rate = rate
+        self.burst = burst
+        self.dropped = 0
+        self._tokens = float(burst)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            self.dropped += 1
+            return False
+
+
+class DuplicateSampler(logging.Filter):
+    """Suppress repeats of the same (code, message) within a time window.
+
+    The first occurrence in a window is always emitted, then one in every
+    sample_every repeats; an emitted record carries the number of repeats
+    suppressed since the previous one in its ``suppressed`` attribute.
+    """
+
+    _MAX_KEYS = 1024
+
+    def __init__(self, sample_every: int = DEFAULT_SAMPLE_EVERY, window: float = DEFAULT_WINDOW) -> None:
+        super().__init__()
+        self.sample_every = sample_every
+        self.window = window
+        # key -> [window start, occurrences in window, suppressed since last emit]
+        self._seen: Dict[tuple, List] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        key = (getattr(record, "code", None), record.getMessage())
+        now = time.monotonic()
+        with self._lock:
+            entry = self._seen.get(key)
+            if entry is None or now - entry[0] > self.window:
+                if entry is None and len(self._seen) >= self._MAX_KEYS:
+                    self._seen = {k: v for k, v in self._seen.items() if now - v[0] <= self.window}
+                self._seen[key] = [now, 1, 0]
+                return True
+            entry[1] += 1
+            if entry[1] % self.sample_every == 0:
+                record.suppressed = entry[2]
+                entry[2] = 0
+                return True
+            entry[2] += 1
+            return False
+
+
+class DroppingQueueHandler(QueueHandler):
+    """QueueHandler that never blocks or formats in the caller's thread.
+
+    Records are dropped (and counted) when the bounded queue is full.
+    """
+
+    def __init__(self, log_queue: "queue.Queue") -> None:
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # formatting happens on the listener thread
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class _Listener(QueueListener):
+    def enqueue_sentinel(self) -> None:
+        # the queue may be full; block until the listener thread makes room
+        self.queue.put(self._sentinel)
+
+
+_listener: Optional[QueueListener] = None
+_handler: Optional[DroppingQueueHandler] = None
+_config_lock = threading.RLock()
+
+
+def configure(
+    stream: Optional[TextIO] = None,
+    queue_size: int = DEFAULT_QUEUE_SIZE,
+    rate: float = DEFAULT_RATE,
+    burst: int = DEFAULT_BURST,
+    sample_every: int = DEFAULT_SAMPLE_EVERY,
+    window: float = DEFAULT_WINDOW,
+) -> logging.Logger:
+    """(Re)configure the error logger: filters and a bounded queue in the caller,
+    JSON formatting and output on a background listener thread.
+    """
+    global _listener, _handler
+    with _config_lock:
+        _stop_locked()
+        log_queue: "queue.Queue" = queue.Queue(maxsize=queue_size)
+        handler = DroppingQueueHandler(log_queue)
+        # cheap duplicate check first so repeats do not consume rate tokens
+        handler.addFilter(DuplicateSampler(sample_every, window))
+        handler.addFilter(RateLimitFilter(rate, burst))
+
+        output = logging.StreamHandler(stream if stream is not None else sys.stderr)
+        output.setFormatter(JsonFormatter())
+        listener = _Listener(log_queue, output, respect_handler_level=False)
+        listener.start()
+
+        logger = logging.getLogger(LOGGER_NAME)
+        logger.handlers = [handler]
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        _listener = listener
+        _handler = handler
+        return logger
+
+
+def _stop_locked() -> None:
+    global _listener, _handler
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+    if _handler is not None:
+        logging.getLogger(LOGGER_NAME).removeHandler(_handler)
+        _handler = None
+
+
+def shutdown() -> None:
+    """Flush queued records and stop the listener thread."""
+    with _config_lock:
+        _stop_locked()
+
+
+atexit.register(shutdown)
+
+
+def report(code: str, exc: Optional[BaseException] = None, level: int = logging.ERROR, **fields) -> None:
+    """Log a structured error record; never raises and never blocks.
+
+    code should match the error_state value the caller sets, if any.
+    """
+    try:
+        if _handler is None:
+            with _config_lock:
+                if _handler is None:
+                    configure()
+        if exc is not None:
+            fields.setdefault("error_type", type(exc).__name__)
+            message = str(exc)
+        else:
+            message = code
+        logging.getLogger(LOGGER_NAME).log(level, message, extra={"code": code, "fields": fields})
+    except Exception:
+        pass
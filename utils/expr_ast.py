@@ -0,0 +1,219 @@
+import threading
+from decimal import Decimal
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
+
+from utils.calculator import decimal_context
+from utils.parser import _OPERATORS, _UNARY_OPERATORS, tokenize, to_rpn
+
+__all__ = ["Num", "BinOp", "UnaryOp", "NodeTable", "SubtreeEvaluator", "build_tree", "evaluate_many"]
+
+
+class Num(NamedTuple):
+    """Leaf node holding a numeric literal exactly as it appeared in the RPN."""
+
+    uid: int
+    token: str
+
+
+class BinOp(NamedTuple):
+    """Binary operator node over two (already interned) child nodes."""
+
+    uid: int
+    op: str
+    left: "Node"
+    right: "Node"
+
+
+class UnaryOp(NamedTuple):
+    """Prefix sign node ('u-' or 'u+') over one (already interned) child node."""
+
+    uid: int
+    op: str
+    operand: "Node"
+
+
+Node = Union[Num, BinOp, UnaryOp]
+
+
+class NodeTable:
+    """Intern table producing hash-consed (structurally shared) tree nodes.
+
+    Structurally identical subtrees are represented by the same node object,
+    so a node's ``uid`` identifies its structure. Children are interned before
+    their parents, which keeps the lookup key O(1) regardless of subtree size.
+    Nodes are immutable and the table may be shared between threads: lookups
+    are lock-free and only the creation of a new node takes the lock.
+    """
+
+    def __init__(self) -> None:
+        self._nodes: Dict[Tuple, Node] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    def num(self, token: str) -> Num:
+        key = ("num", token)
+        node = self._nodes.get(key)
+        if node is None:
+            with self._lock:
+                node = self._nodes.get(key)
+                if node is None:
+                    node = Num(len(self._nodes), token)
+                    self._nodes[key] = node
+        return node
+
+    def binop(self, op: str, left: Node, right: Node) -> BinOp:
+        if op not in _OPERATORS:
+            raise ValueError(f"unknown operator '{op}'")
+        key = (op, left.uid, right.uid)
+        node = self._nodes.get(key)
+        if node is None:
+            with self._lock:
+                node = self._nodes.get(key)
+                if node is None:
+                    node = BinOp(len(self._nodes), op, left, right)
+                    self._nodes[key] = node
+        return node
+
+    def unaryop(self, op: str, operand: Node) -> UnaryOp:
+        if op not in _UNARY_OPERATORS:
+            raise ValueError(f"unknown operator '{op}'")
+        key = (op, operand.uid)
+        node = self._nodes.get(key)
+        if node is None:
+            with self._lock:
+                node = self._nodes.get(key)
+                if node is None:
+                    node = UnaryOp(len(self._nodes), op, operand)
+                    self._nodes[key] = node
+        return node
+
+    def from_rpn(self, rpn: List[str]) -> Node:
+        """Build an interned tree from validated RPN (as produced by to_rpn).
+
+        Raises ValueError on malformed RPN.
+        """
+        if not isinstance(rpn, list):
+            raise ValueError("rpn must be a list of tokens")
+
+        stack: List[Node] = []
+        for tok in rpn:
+            if tok in _OPERATORS:
+                if len(stack) < 2:
+                    raise ValueError("insufficient operands for operator")
+                right = stack.pop()
+                left = stack.pop()
+                stack.append(self.binop(tok, left, right))
+            elif tok in _UNARY_OPERATORS:
+                if not stack:
+                    raise ValueError("insufficient operands for operator")
+                stack.append(self.unaryop(tok, stack.pop()))
+            else:
+                stack.append(self.num(tok))
+
+        if len(stack) != 1:
+            raise ValueError("malformed RPN expression")
+        return stack[0]
+
+
+class SubtreeEvaluator:
+    """Evaluate interned trees, memoizing the value of every distinct subtree.
+
+    The memo table is keyed by node uid, so it must only be used with nodes
+    from the table it was created for. ``evaluations`` counts how many nodes
+    were actually computed (as opposed to served from the memo table).
+    An evaluator may be shared between threads: memo entries are written
+    once per uid with a deterministic value, so a race at worst computes a
+    subtree twice.
+    """
+
+    def __init__(self, table: NodeTable) -> None:
+        self.table = table
+        self.memo: Dict[int, Decimal] = {}
+        self.evaluations = 0
+
+    def evaluate(self, node: Node) -> Decimal:
+        """Return the value of node, computing only subtrees not seen before.
+
+        Raises ValueError on invalid literals or arithmetic errors.
+        """
+        memo = self.memo
+        cached = memo.get(node.uid)
+        if cached is not None:
+            return cached
+
+        with decimal_context():
+            # iterative post-order walk so deep trees do not hit the recursion limit
+            stack: List[Tuple[Node, bool]] = [(node, False)]
+            while stack:
+                current, children_done = stack.pop()
+                if current.uid in memo:
+                    continue
+                if isinstance(current, Num):
+                    try:
+                        memo[current.uid] = Decimal(current.token)
+                    except Exception:
+                        raise ValueError(f"invalid numeric token in RPN '{current.token}'")
+                    self.evaluations += 1
+                    continue
+                if isinstance(current, UnaryOp):
+                    operand = memo.get(current.operand.uid)
+                    if operand is None:
+                        stack.append((current, True))
+                        stack.append((current.operand, False))
+                        continue
+                    try:
+                        memo[current.uid] = _UNARY_OPERATORS[current.op]["func"](operand)
+                    except Exception as e:
+                        raise ValueError(f"error evaluating operator '{current.op}': {e}")
+                    self.evaluations += 1
+                    continue
+                if not children_done:
+                    stack.append((current, True))
+                    if current.right.uid not in memo:
+                        stack.append((current.right, False))
+                    if current.left.uid not in memo:
+                        stack.append((current.left, False))
+                    continue
+                a = memo[current.left.uid]
+                b = memo[current.right.uid]
+                try:
+                    result = _OPERATORS[current.op]["func"](a, b)
+                except ValueError:
+                    # propagate ValueError from calculator (e.g., division by zero)
+                    raise
+                except Exception as e:
+                    raise ValueError(f"error evaluating operator '{current.op}': {e}")
+                memo[current.uid] = result
+                self.evaluations += 1
+
+        return memo[node.uid]
+
+
+def build_tree(rpn: List[str], table: Optional[NodeTable] = None) -> Node:
+    """Build a hash-consed tree from to_rpn output, using a fresh table if none is given."""
+    if table is None:
+        table = NodeTable()
+    return table.from_rpn(rpn)
+
+
+def evaluate_many(expressions: Iterable[str]) -> List[Decimal]:
+    """Evaluate a batch of expressions, computing each distinct subtree once.
+
+    All expressions share one node table and memo table, so common
+    sub-expressions across the batch are evaluated a single time.
+    Raises ValueError for the first malformed expression or arithmetic error.
+    """
+    table = NodeTable()
+    evaluator = SubtreeEvaluator(table)
+    results: List[Decimal] = []
+    for expression in expressions:
+        try:
+            root = table.from_rpn(to_rpn(tokenize(expression)))
+            results.append(evaluator.evaluate(root))
+        except ValueError:
+            raise
+        except Exception as e:
+            raise ValueError(f"failed to evaluate expression: {e}")
+    return results
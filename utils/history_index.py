@@ -0,0 +1,178 @@
+"""Incrementally maintained search index over a calculation history.
+
+Expressions are indexed by all their substrings of up to NGRAM
+characters (posting lists of entry positions). A query of up to NGRAM
+characters is a single posting list, and a longer one only verifies the
+few entries that contain all of its NGRAM-character substrings. Numeric results
+are kept in a sorted index for range queries. The index follows the
+history it was synced with: appended entries are indexed on the next
+sync, and a replaced or shortened history is re-indexed from scratch.
+"""
+import re
+from bisect import bisect_left, bisect_right
+from decimal import Decimal, InvalidOperation
+from typing import Dict, List, Optional, Sequence, Tuple
+
+__all__ = ["NGRAM", "HistoryIndex", "parse_range"]
+
+# longest indexed substring; the alphabet of expressions is tiny, so indexing
+# every shorter one too costs little and serves one- and two-character queries
+NGRAM = 3
+
+# appending more entries than this in one sync re-sorts the value index
+# instead of inserting into it one entry at a time
+BULK_SYNC = 256
+
+# 'low..high' with either bound optional, e.g. '10..20', '..0', '1e3..'
+_RANGE = re.compile(r"^\s*(-?[0-9.]+(?:[eE][+-]?[0-9]+)?)?\s*\.\.\s*(-?[0-9.]+(?:[eE][+-]?[0-9]+)?)?\s*$")
+
+Entry = Tuple[str, str]
+
+
+def parse_range(query: str) -> Optional[Tuple[Optional[Decimal], Optional[Decimal]]]:
+    """(low, high) for a range query such as '10..20' or '..0', None for anything else."""
+    match = _RANGE.match(query)
+    if match is None or match.group(1) is None and match.group(2) is None:
+        return None
+    try:
+        return tuple(None if bound is None else Decimal(bound) for bound in match.groups())
+    except InvalidOperation:
+        return None
+
+
+class HistoryIndex:
+    """Substring index on expressions and sorted index on results of a history list.
+
+    Positions returned by queries index into the synced history list.
+    Not thread-safe; each session keeps its own index.
+    """
+
+    __slots__ = ('_history', '_count', '_postings', '_values', '_value_positions')
+
+    def __init__(self) -> None:
+        self._history: Optional[Sequence[Entry]] = None
+        self._count = 0
+        # substring of up to NGRAM characters -> ascending positions of the expressions containing it
+        self._postings: Dict[str, List[int]] = {}
+        # numeric results in ascending order, and the position of each
+        self._values: List[Decimal] = []
+        self._value_positions: List[int] = []
+
+    def __len__(self) -> int:
+        return self._count
+
+    def sync(self, history: Sequence[Entry]) -> None:
+        """Index the entries appended to history since the last sync.
+
+        A different list, or one shorter than what was indexed (e.g. after
+        AC), is re-indexed from the start.
+        """
+        if history is not self._history or len(history) < self._count:
+            self._history = history
+            self._count = 0
+            self._postings = {}
+            self._values = []
+            self._value_positions = []
+        postings = self._postings
+        added: List[Tuple[Decimal, int]] = []
+        for position in range(self._count, len(history)):
+            expression, result = history[position]
+            expression = expression.lower()
+            grams = {expression[i:i + n] for n in range(1, NGRAM + 1) for i in range(len(expression) - n + 1)}
+            for gram in grams:
+                posting = postings.get(gram)
+                if posting is None:
+                    postings[gram] = [position]
+                else:
+                    posting.append(position)
+            try:
+                value = Decimal(result)
+            except (InvalidOperation, TypeError):
+                # e.g. 'Error'; not part of range queries
+                value = None
+            if value is not None and value.is_finite():
+                added.append((value, position))
+        self._count = len(history)
+
+        if len(added) > BULK_SYNC:
+            # equal values stay in history order: positions only grow
+            pairs = sorted([*zip(self._values, self._value_positions), *added])
+            self._values = [value for value, _ in pairs]
+            self._value_positions = [position for _, position in pairs]
+            return
+        for value, position in added:
+            index = bisect_right(self._values, value)
+            self._values.insert(index, value)
+            self._value_positions.insert(index, position)
+
+    def _candidates(self, text: str) -> List[int]:
+        """Ascending positions of the entries holding every NGRAM-gram of text (len(text) > NGRAM)."""
+        postings = [self._postings.get(text[i:i + NGRAM]) for i in range(len(text) - NGRAM + 1)]
+        if not all(postings):
+            return []
+        # start from the rarest
+        postings.sort(key=len)
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            candidates.intersection_update(posting)
+            if not candidates:
+                return []
+        return sorted(candidates)
+
+    def find(self, text: str, limit: Optional[int] = None) -> List[int]:
+        """Positions of the entries whose expression contains text (case-insensitive), oldest first.
+
+        With limit, only the first limit positions are collected.
+        """
+        text = text.strip().lower()
+        if not text:
+            return list(range(self._count if limit is None else min(limit, self._count)))
+        if len(text) <= NGRAM:
+            return self._postings.get(text, [])[:limit]
+        history = self._history
+        matches = []
+        for position in self._candidates(text):
+            if text in history[position][0].lower():
+                matches.append(position)
+                if len(matches) == limit:
+                    break
+        return matches
+
+    def prefix(self, text: str) -> List[int]:
+        """Positions of the entries whose expression starts with text (case-insensitive)."""
+        text = text.lower()
+        history = self._history
+        return [position for position in self.find(text) if history[position][0].lower().startswith(text)]
+
+    def _range(self, low: Optional[Decimal], high: Optional[Decimal]) -> Tuple[int, int]:
+        start = 0 if low is None else bisect_left(self._values, low)
+        stop = len(self._values) if high is None else bisect_right(self._values, high)
+        return start, max(start, stop)
+
+    def in_range(self, low: Optional[Decimal] = None, high: Optional[Decimal] = None, limit: Optional[int] = None) -> List[int]:
+        """Positions of the entries whose result is within [low, high], in ascending order of result."""
+        start, stop = self._range(low, high)
+        if limit is not None:
+            stop = min(stop, start + limit)
+        return self._value_positions[start:stop]
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[int]:
+        """in_range for a 'low..high' query (see parse_range), otherwise find."""
+        bounds = parse_range(query)
+        if bounds is not None:
+            return self.in_range(*bounds, limit=limit)
+        return self.find(query, limit)
+
+    def count(self, query: str) -> int:
+        """Number of entries search(query) matches, without collecting their positions."""
+        bounds = parse_range(query)
+        if bounds is not None:
+            start, stop = self._range(*bounds)
+            return stop - start
+        text = query.strip().lower()
+        if not text:
+            return self._count
+        if len(text) <= NGRAM:
+            return len(self._postings.get(text, ()))
+        history = self._history
+        return sum(1 for position in self._candidates(text) if text in history[position][0].lower())
@@ -0,0 +1,203 @@
+"""Streaming export and import of calculation history as CSV or JSON Lines.
+
+Exports are produced a chunk of rows at a time from a generator, and
+imports read, validate and re-evaluate rows in batches, so neither builds
+the whole file or its parsed rows at once. Rows use the legacy history
+layout: an "expression" and its "result".
+"""
+import csv
+import io
+import json
+from typing import BinaryIO, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from utils.calculator import format_result
+from utils.parser import try_evaluate
+
+__all__ = [
+    "FORMATS",
+    "MIME_TYPES",
+    "EXPORT_CHUNK_ROWS",
+    "IMPORT_BATCH_ROWS",
+    "format_for",
+    "iter_export",
+    "ExportStream",
+    "ImportBatch",
+    "iter_import",
+    "import_into",
+]
+
+FORMATS = ("csv", "jsonl")
+MIME_TYPES = {"csv": "text/csv", "jsonl": "application/x-ndjson"}
+FIELDS = ("expression", "result")
+
+# rows encoded per exported chunk
+EXPORT_CHUNK_ROWS = 1000
+# rows validated and re-evaluated per imported batch
+IMPORT_BATCH_ROWS = 1000
+# rejected rows reported per batch (the rest are only counted)
+MAX_REPORTED_REJECTS = 100
+
+# keypad operator symbols in history expressions -> parser operators
+_TO_PARSER = str.maketrans({"×": "*", "÷": "/"})
+
+Entry = Tuple[str, str]
+
+
+def format_for(file_name: str) -> str:
+    """The format for a file name by its extension ('.jsonl' or '.ndjson', else csv)."""
+    return "jsonl" if file_name.lower().endswith((".jsonl", ".ndjson")) else "csv"
+
+
+def _check_format(fmt: str) -> None:
+    if fmt not in FORMATS:
+        raise ValueError(f"unknown history format: {fmt!r}")
+
+
+def iter_export(history: Iterable[Entry], fmt: str = "csv", chunk_rows: int = EXPORT_CHUNK_ROWS) -> Iterator[bytes]:
+    """Yield the history encoded as UTF-8 CSV (with a header) or JSON Lines, chunk_rows rows at a time."""
+    _check_format(fmt)
+    buffer = io.StringIO()
+    if fmt == "csv":
+        writer = csv.writer(buffer, lineterminator="\n")
+        writer.writerow(FIELDS)
+        write = writer.writerow
+    else:
+        dumps = json.dumps
+
+        def write(entry: Entry) -> None:
+            buffer.write(dumps({"expression": entry[0], "result": entry[1]}, ensure_ascii=False))
+            buffer.write("\n")
+
+    rows = 0
+    for entry in history:
+        write(entry)
+        rows += 1
+        if rows == chunk_rows:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+            rows = 0
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+class ExportStream(io.RawIOBase):
+    """Read-only binary file over iter_export, for APIs that take a file object.
+
+    Chunks are encoded only as the reader asks for them.
+    """
+
+    def __init__(self, history: Iterable[Entry], fmt: str = "csv", chunk_rows: int = EXPORT_CHUNK_ROWS) -> None:
+        super().__init__()
+        self._chunks = iter_export(history, fmt, chunk_rows)
+        self._pending = b""
+        self._started = False
+
+    def readable(self) -> bool:
+        return True
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        # callers often rewind before reading; that is a no-op before the first read
+        if offset == 0 and whence == io.SEEK_SET and not self._started:
+            return 0
+        raise io.UnsupportedOperation("seek")
+
+    def readinto(self, buffer) -> int:
+        self._started = True
+        while not self._pending:
+            self._pending = next(self._chunks, b"")
+            if not self._pending:
+                return 0
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        return size
+
+
+class ImportBatch(NamedTuple):
+    entries: List[Entry]  # accepted rows, with their re-evaluated results
+    rejected: int  # rows that failed validation or evaluation
+    errors: List[Tuple[int, str]]  # (1-based row number, reason) for the first rejected rows
+    changed: int  # accepted rows whose recorded result differed from the re-evaluated one
+
+
+def _iter_rows(stream: BinaryIO, fmt: str) -> Iterator[Tuple[int, object, object]]:
+    """Yield (row number, expression, result) as read, without validating them."""
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    try:
+        if fmt == "csv":
+            for number, row in enumerate(csv.DictReader(text), 1):
+                yield number, row.get("expression"), row.get("result")
+        else:
+            loads = json.loads
+            for number, line in enumerate(text, 1):
+                if not line.strip():
+                    continue
+                try:
+                    row = loads(line)
+                except ValueError:
+                    yield number, None, None
+                    continue
+                if isinstance(row, dict):
+                    yield number, row.get("expression"), row.get("result")
+                else:
+                    yield number, None, None
+    finally:
+        # leave the caller's stream open
+        text.detach()
+
+
+def iter_import(stream: BinaryIO, fmt: str = "csv", batch_rows: int = IMPORT_BATCH_ROWS) -> Iterator[ImportBatch]:
+    """Read exported history from a binary stream and yield it in validated batches.
+
+    Each row's expression is re-evaluated through the parser (keypad '×' and
+    '÷' are accepted) and stored with the freshly formatted result; rows
+    without an expression, that fail to evaluate or whose result cannot be
+    formatted are rejected.
+    """
+    _check_format(fmt)
+    entries: List[Entry] = []
+    errors: List[Tuple[int, str]] = []
+    rejected = changed = 0
+    for number, expression, recorded in _iter_rows(stream, fmt):
+        formatted = None
+        if not isinstance(expression, str) or not expression.strip():
+            reason: Optional[str] = "missing expression"
+        else:
+            result = try_evaluate(expression.translate(_TO_PARSER))
+            reason = result.message
+            if reason is None:
+                try:
+                    formatted = format_result(result.value)
+                except ArithmeticError:
+                    # e.g. 1e30 * 1: too many digits to quantize to two places
+                    reason = "result is too large to format"
+        if reason is not None:
+            rejected += 1
+            if len(errors) < MAX_REPORTED_REJECTS:
+                errors.append((number, reason))
+        else:
+            if recorded != formatted:
+                changed += 1
+            entries.append((expression.strip(), formatted))
+        if len(entries) + rejected >= batch_rows:
+            yield ImportBatch(entries, rejected, errors, changed)
+            entries, errors = [], []
+            rejected = changed = 0
+    if entries or rejected:
+        yield ImportBatch(entries, rejected, errors, changed)
+
+
+def import_into(history: List[Entry], stream: BinaryIO, fmt: str = "csv", batch_rows: int = IMPORT_BATCH_ROWS) -> Tuple[int, int]:
+    """Append the accepted rows to history; return (imported, rejected) counts.
+
+    Nothing is appended until the whole stream has been read, so an error
+    part-way (e.g. invalid UTF-8) propagates with history unchanged.
+    """
+    entries: List[Entry] = []
+    rejected = 0
+    for batch in iter_import(stream, fmt, batch_rows):
+        entries.extend(batch.entries)
+        rejected += batch.rejected
+    history.extend(entries)
+    return len(entries), rejected
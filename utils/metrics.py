@@ -0,0 +1,229 @@
+import functools
+import os
+import threading
+from time import perf_counter
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from http.server import ThreadingHTTPServer
+
+__all__ = [
+    "Timer",
+    "Registry",
+    "REGISTRY",
+    "enable",
+    "disable",
+    "is_enabled",
+    "timed",
+    "render_prometheus",
+    "serve",
+]
+
+# Upper bounds (seconds) of the latency histogram buckets; +Inf is implicit.
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.000005, 0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0,
+)
+
+METRIC_NAME = "calc_call_duration_seconds"
+ERROR_METRIC_NAME = "calc_call_errors_total"
+
+
+def _env_flag(name: str) -> bool:
+    return os.environ.get(name, "").strip().lower() in {"1", "true", "yes", "on"}
+
+
+# Checked on every instrumented call; a plain module global keeps the
+# disabled path to a single lookup.
+_enabled = _env_flag("CALC_METRICS")
+
+
+class Timer:
+    """Call count, total/max duration, error count and latency histogram for one name."""
+
+    __slots__ = ("name", "buckets", "counts", "count", "total", "max", "errors", "_lock")
+
+    def __init__(self, name: str, buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.name = name
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        self.counts: List[int] = [0] * len(self.buckets)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.errors = 0
+
+    def observe(self, seconds: float, error: bool = False) -> None:
+        with self._lock:
+            self.count += 1
+            self.total += seconds
+            if seconds > self.max:
+                self.max = seconds
+            if error:
+                self.errors += 1
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    self.counts[i] += 1
+                    break
+
+    def snapshot(self) -> Dict:
+        """Return a consistent copy of the timer; bucket counts are cumulative."""
+        with self._lock:
+            cumulative = []
+            running = 0
+            for n in self.counts:
+                running += n
+                cumulative.append(running)
+            return {
+                "count": self.count,
+                "total": self.total,
+                "max": self.max,
+                "errors": self.errors,
+                "buckets": list(zip(self.buckets, cumulative)),
+            }
+
+
+class Registry:
+    """Thread-safe collection of named timers."""
+
+    def __init__(self) -> None:
+        self._timers: Dict[str, Timer] = {}
+        self._lock = threading.Lock()
+
+    def timer(self, name: str) -> Timer:
+        timer = self._timers.get(name)
+        if timer is None:
+            with self._lock:
+                timer = self._timers.setdefault(name, Timer(name))
+        return timer
+
+    def snapshot(self) -> Dict[str, Dict]:
+        with self._lock:
+            timers = list(self._timers.values())
+        return {timer.name: timer.snapshot() for timer in timers}
+
+    def reset(self) -> None:
+        """Zero every timer; timers stay registered so decorated functions keep reporting."""
+        with self._lock:
+            timers = list(self._timers.values())
+        for timer in timers:
+            with timer._lock:
+                timer.reset()
+
+    def render_prometheus(self) -> str:
+        """Render all timers in the Prometheus text exposition format."""
+        lines = [
+            f"# HELP {METRIC_NAME} Wall-clock duration of instrumented calculator calls.",
+            f"# TYPE {METRIC_NAME} histogram",
+        ]
+        errors = [
+            f"# HELP {ERROR_METRIC_NAME} Instrumented calls that raised an exception.",
+            f"# TYPE {ERROR_METRIC_NAME} counter",
+        ]
+        for name, snap in sorted(self.snapshot().items()):
+            label = name.replace("\\", "\\\\").replace('"', '\\"')
+            for bound, cumulative in snap["buckets"]:
+                lines.append(f'{METRIC_NAME}_bucket{{name="{label}",le="{bound!r}"}} {cumulative}')
+            lines.append(f'{METRIC_NAME}_bucket{{name="{label}",le="+Inf"}} {snap["count"]}')
+            lines.append(f'{METRIC_NAME}_sum{{name="{label}"}} {snap["total"]!r}')
+            lines.append(f'{METRIC_NAME}_count{{name="{label}"}} {snap["count"]}')
+            errors.append(f'{ERROR_METRIC_NAME}{{name="{label}"}} {snap["errors"]}')
+        return "\n".join(lines + errors) + "\n"
+
+
+REGISTRY = Registry()
+
+
+def enable() -> None:
+    global _enabled
+    _enabled = True
+
+
+def disable() -> None:
+    global _enabled
+    _enabled = False
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def timed(name: str) -> Callable:
+    """Decorator recording the duration of each call under name while metrics are enabled.
+
+    When disabled the wrapper only checks a module flag before calling through.
+    """
+
+    def decorator(func: Callable) -> Callable:
+        timer = REGISTRY.timer(name)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            start = perf_counter()
+            try:
+                result = func(*args, **kwargs)
+            except BaseException:
+                timer.observe(perf_counter() - start, error=True)
+                raise
+            timer.observe(perf_counter() - start)
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+def render_prometheus() -> str:
+    return REGISTRY.render_prometheus()
+
+
+def _metrics_handler():
+    """Build the /metrics request handler class.
+
+    http.server is only imported here, so that importing this module (which
+    every parser and app import does) stays cheap when no endpoint is served.
+    """
+    from http.server import BaseHTTPRequestHandler
+
+    class _MetricsHandler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args) -> None:
+            pass
+
+        def do_GET(self) -> None:
+            if self.path != "/metrics":
+                self.send_error(404)
+                return
+            data = render_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+    return _MetricsHandler
+
+
+_server: Optional["ThreadingHTTPServer"] = None
+_server_lock = threading.Lock()
+
+
+def serve(port: int, host: str = "127.0.0.1") -> "ThreadingHTTPServer":
+    """Serve GET /metrics from a daemon thread; later calls return the running server.
+
+    Streamlit re-executes app.py on every rerun, so this must be idempotent.
+    """
+    global _server
+    with _server_lock:
+        if _server is None:
+            from http.server import ThreadingHTTPServer
+
+            server = ThreadingHTTPServer((host, port), _metrics_handler())
+            server.daemon_threads = True
+            threading.Thread(target=server.serve_forever, name="calc-metrics", daemon=True).start()
+            _server = server
+        return _server
@@ -1,9 +1,33 @@
+import re
 from decimal import Decimal
-from typing import List
+from typing import Callable, List, NamedTuple, Optional, Tuple, Union
 
-from utils.calculator import add, subtract, multiply, divide
+from utils.calculator import DECIMAL_CONTEXT, add, subtract, multiply, divide, toggle_sign, decimal_context
+from utils.metrics import timed
 
-__all__ = ["tokenize", "to_rpn", "evaluate_rpn", "evaluate_expression"]
+__all__ = [
+    "tokenize",
+    "tokenize_bytes",
+    "to_rpn",
+    "evaluate_rpn",
+    "evaluate_expression",
+    "EvalResult",
+    "try_evaluate",
+    "try_evaluate_bytes",
+    "validate_expression",
+    "INVALID_INPUT",
+    "INVALID_CHARACTER",
+    "INVALID_NUMBER",
+    "MISSING_OPERATOR",
+    "MISPLACED_OPERATOR",
+    "MISPLACED_PARENTHESIS",
+    "MISMATCHED_PARENTHESES",
+    "INCOMPLETE_EXPRESSION",
+    "EMPTY_EXPRESSION",
+    "MALFORMED_EXPRESSION",
+    "DIVISION_BY_ZERO",
+    "ARITHMETIC_ERROR",
+]
 
 _OPERATORS = {
     "+": {
@@ -25,15 +49,119 @@ _OPERATORS = {
 }
 
 
+def _identity(a: Decimal) -> Decimal:
+    return a
+
+
+# Prefix operators. tokenize yields a plain '+' or '-' for them; to_rpn
+# emits these RPN tokens when the sign starts an operand (e.g. '3 * -2').
+_UNARY_OPERATORS = {
+    "u-": {
+        "prec": 3,
+        "func": toggle_sign,
+    },
+    "u+": {
+        "prec": 3,
+        "func": _identity,
+    },
+}
+
+_PRECEDENCE = {op: spec["prec"] for op, spec in (*_OPERATORS.items(), *_UNARY_OPERATORS.items())}
+
+# Error codes reported in EvalResult.code
+INVALID_INPUT = "invalid_input"  # not a string
+INVALID_CHARACTER = "invalid_character"
+INVALID_NUMBER = "invalid_number"  # e.g. '1..2', a lone '.', '1e'
+MISSING_OPERATOR = "missing_operator"
+MISPLACED_OPERATOR = "misplaced_operator"
+MISPLACED_PARENTHESIS = "misplaced_parenthesis"
+MISMATCHED_PARENTHESES = "mismatched_parentheses"
+INCOMPLETE_EXPRESSION = "incomplete_expression"  # ends with an operator or '('
+EMPTY_EXPRESSION = "empty_expression"
+MALFORMED_EXPRESSION = "malformed_expression"
+DIVISION_BY_ZERO = "division_by_zero"
+ARITHMETIC_ERROR = "arithmetic_error"
+
+
+class EvalResult(NamedTuple):
+    """Outcome of a non-raising evaluation: a value, or an error.
+
+    On failure code is one of the error codes above, message is the text of
+    the ValueError the raising API raises for the same input and position
+    is the character offset of the offending token (the length of the
+    expression for errors at its end).
+    """
+
+    value: Optional[Decimal]
+    code: Optional[str] = None
+    message: Optional[str] = None
+    position: Optional[int] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.code is None
+
+
+# tokens, the offset each token starts at, and the failure that stopped the scan
+_Scan = Tuple[List[str], List[int], Optional[EvalResult]]
+
+
+# One token per match: a run of digits and dots with an optional exponent,
+# an operator or parenthesis, or any other single character (which sends
+# the expression to the reference tokenizer for its exact error). Only
+# ASCII digits are matched, as str.isdigit() also accepts e.g. '²'.
+_TOKEN = re.compile(r"\s*(?:([0-9.]+)([eE][+-]?[0-9]+)?|([-+*/()])|(.))", re.DOTALL)
+
+
+@timed("parser.tokenize")
 def tokenize(expression: str) -> List[str]:
     """Tokenize the input expression into numbers, operators, and parentheses.
 
+    Numbers may carry an exponent ('1e6', '2.5E-3'). Signs are always
+    separate tokens; to_rpn decides whether they are unary.
     Raises ValueError on invalid characters or malformed numbers.
     """
     if not isinstance(expression, str):
         raise ValueError("expression must be a string")
 
+    tokens = _match_tokens(expression)
+    if tokens is None:
+        return _tokenize_chars(expression)
+    return tokens
+
+
+def _match_tokens(expression: str) -> Optional[List[str]]:
+    """The tokens of expression from the regex alone, or None if the reference tokenizer must decide."""
+    tokens: List[str] = []
+    append = tokens.append
+    for number, exponent, symbol, other in _TOKEN.findall(expression):
+        if number:
+            if "." in number and (number == "." or number.count(".") > 1):
+                return None
+            append(number + exponent if exponent else number)
+        elif symbol:
+            append(symbol)
+        else:
+            return None
+    return tokens
+
+
+def _tokenize_chars(expression: str) -> List[str]:
+    """Reference tokenizer: one character at a time.
+
+    Defines the tokens and errors of tokenize, which falls back to it for
+    any input its regex fast path does not fully cover.
+    """
+    tokens, _, failure = _scan_chars(expression)
+    if failure is not None:
+        raise ValueError(failure.message)
+    return tokens
+
+
+def _scan_chars(expression: str) -> _Scan:
+    """Non-raising _tokenize_chars that also records where each token starts."""
     tokens: List[str] = []
+    positions: List[int] = []
     i = 0
     n = len(expression)
     while i < n:
@@ -43,68 +171,152 @@ def tokenize(expression: str) -> List[str]:
             continue
         if ch in _OPERATORS or ch in "()":
             tokens.append(ch)
+            positions.append(i)
             i += 1
             continue
         # number parsing: digits with optional single dot
         if ch.isdigit() or ch == ".":
+            num_start = i
             num_chars = []
             dot_count = 0
             while i < n and (expression[i].isdigit() or expression[i] == "."):
                 if expression[i] == ".":
                     dot_count += 1
                     if dot_count > 1:
-                        raise ValueError(f"invalid numeric literal with multiple dots near: {expression[max(0,i-5):i+5]}")
+                        message = f"invalid numeric literal with multiple dots near: {expression[max(0,i-5):i+5]}"
+                        return tokens, positions, EvalResult(None, INVALID_NUMBER, message, i)
                 num_chars.append(expression[i])
                 i += 1
             # ensure that number isn't just '.'
             num_str = "".join(num_chars)
             if num_str == ".":
-                raise ValueError("invalid numeric literal '.'")
+                return tokens, positions, EvalResult(None, INVALID_NUMBER, "invalid numeric literal '.'", num_start)
+            # optional exponent: e or E, an optional sign, then digits
+            if i < n and expression[i] in "eE":
+                start = i
+                i += 1
+                if i < n and expression[i] in "+-":
+                    i += 1
+                digits_start = i
+                while i < n and expression[i].isdigit():
+                    i += 1
+                if i == digits_start:
+                    message = f"invalid exponent in numeric literal near: {expression[max(0,start-5):start+5]}"
+                    return tokens, positions, EvalResult(None, INVALID_NUMBER, message, start)
+                num_str += expression[start:i]
             tokens.append(num_str)
+            positions.append(num_start)
             continue
-        raise ValueError(f"invalid character in expression: '{ch}'")
+        return tokens, positions, EvalResult(None, INVALID_CHARACTER, f"invalid character in expression: '{ch}'", i)
+    return tokens, positions, None
+
+
+# One token per match over ASCII input: a run of digits and dots with an
+# optional exponent, an operator or parenthesis, or any other single byte
+# (which sends the line to the reference tokenizer for its exact error).
+_BYTES_TOKEN = re.compile(rb"[ \t\n\r\f\v]*(?:([0-9.]+)([eE][+-]?[0-9]+)?|([-+*/()])|(.))", re.DOTALL)
+_BYTES_SYMBOLS = {ord(ch): ch for ch in "+-*/()"}
+
+BytesLike = Union[bytes, bytearray, memoryview]
+
+
+@timed("parser.tokenize_bytes")
+def tokenize_bytes(data: BytesLike, start: int = 0, end: Optional[int] = None) -> List[str]:
+    """Tokenize the expression in data[start:end] without decoding it to a str.
+
+    data may be any buffer, including an mmap, and is scanned in place:
+    only the tokens themselves are materialized. The tokens and the
+    ValueError raised for malformed input are exactly those of tokenize on
+    the decoded (UTF-8) text; anything outside the plain ASCII grammar is
+    handed to the reference tokenizer to decide.
+    """
+    if end is None:
+        end = len(data)
+    tokens = _match_bytes(data, start, end)
+    if tokens is None:
+        # let the reference tokenizer produce the exact error (or accept e.g. Unicode whitespace)
+        return _tokenize_chars(_decode(data, start, end))
+    return tokens
+
+
+def _match_bytes(data: BytesLike, start: int, end: int) -> Optional[List[str]]:
+    """The tokens of data[start:end] from the regex alone, or None if the reference tokenizer must decide."""
+    tokens: List[str] = []
+    append = tokens.append
+    symbols = _BYTES_SYMBOLS
+    for match in _BYTES_TOKEN.finditer(data, start, end):
+        number, exponent = match.group(1, 2)
+        if number is not None:
+            if number == b"." or number.count(b".") > 1:
+                return None
+            append((number + exponent if exponent else number).decode("ascii"))
+        elif match.start(4) == -1:
+            append(symbols[data[match.start(3)]])
+        else:
+            return None
     return tokens
 
 
+def _decode(data: BytesLike, start: int, end: int) -> str:
+    return bytes(data[start:end]).decode("utf-8", errors="replace")
+
+
+@timed("parser.to_rpn")
 def to_rpn(tokens: List[str]) -> List[str]:
     """Convert infix tokens to RPN (postfix) using shunting-yard.
 
+    A '+' or '-' at the start of an operand is a prefix sign and becomes
+    'u+' or 'u-' in the output; it binds tighter than any binary operator.
     Validates token sequences and parentheses. Raises ValueError on malformed input.
     """
     if not isinstance(tokens, list):
         raise ValueError("tokens must be a list of strings")
 
+    output, failure = _shunt(tokens)
+    if failure is not None:
+        raise ValueError(failure.message)
+    return output
+
+
+def _shunt(tokens: List[str]) -> Tuple[List[str], Optional[EvalResult]]:
+    """Non-raising to_rpn; a failure's position is an index into tokens."""
     output: List[str] = []
     op_stack: List[str] = []
 
     prev_type = "start"  # one of: start, number, operator, lparen, rparen
 
-    for tok in tokens:
+    for i, tok in enumerate(tokens):
         if tok == "(" :
             # lparen cannot directly follow a number or rparen without operator
             if prev_type in ("number", "rparen"):
-                raise ValueError("missing operator before '('")
+                return output, EvalResult(None, MISSING_OPERATOR, "missing operator before '('", i)
             op_stack.append(tok)
             prev_type = "lparen"
             continue
         if tok == ")":
             if prev_type == "operator" or prev_type == "start" or prev_type == "lparen":
                 # empty parentheses or operator before ')'
-                raise ValueError("misplaced ')'")
+                return output, EvalResult(None, MISPLACED_PARENTHESIS, "misplaced ')'", i)
             # pop until '('
             while op_stack and op_stack[-1] != "(":
                 output.append(op_stack.pop())
             if not op_stack or op_stack[-1] != "(":
-                raise ValueError("mismatched parentheses")
+                return output, EvalResult(None, MISMATCHED_PARENTHESES, "mismatched parentheses", i)
             op_stack.pop()  # remove '('
             prev_type = "rparen"
             continue
         if tok in _OPERATORS:
             # operator validation
             if prev_type in ("operator", "start", "lparen"):
-                raise ValueError(f"misplaced operator '{tok}'")
+                if tok == "-" or tok == "+":
+                    # prefix sign: its operand has not been read yet, so pop nothing
+                    op_stack.append("u" + tok)
+                    prev_type = "operator"
+                    continue
+                return output, EvalResult(None, MISPLACED_OPERATOR, f"misplaced operator '{tok}'", i)
             # pop operators with >= precedence
-            while op_stack and op_stack[-1] in _OPERATORS and _OPERATORS[op_stack[-1]]["prec"] >= _OPERATORS[tok]["prec"]:
+            prec = _PRECEDENCE[tok]
+            while op_stack and op_stack[-1] in _PRECEDENCE and _PRECEDENCE[op_stack[-1]] >= prec:
                 output.append(op_stack.pop())
             op_stack.append(tok)
             prev_type = "operator"
@@ -115,25 +327,37 @@ def to_rpn(tokens: List[str]) -> List[str]:
             # Using Decimal to validate numeric format
             Decimal(tok)
         except Exception:
-            raise ValueError(f"invalid numeric token '{tok}'")
+            return output, EvalResult(None, INVALID_NUMBER, f"invalid numeric token '{tok}'", i)
         if prev_type in ("number", "rparen"):
-            raise ValueError("missing operator between operands")
+            return output, EvalResult(None, MISSING_OPERATOR, "missing operator between operands", i)
         output.append(tok)
         prev_type = "number"
 
     # end for tokens
     if prev_type == "operator" or prev_type == "lparen":
-        raise ValueError("expression ends with incomplete token")
+        return output, EvalResult(None, INCOMPLETE_EXPRESSION, "expression ends with incomplete token", len(tokens))
 
     while op_stack:
         op = op_stack.pop()
         if op == "(" or op == ")":
-            raise ValueError("mismatched parentheses")
+            return output, EvalResult(None, MISMATCHED_PARENTHESES, "mismatched parentheses", _unclosed(tokens))
         output.append(op)
 
-    return output
+    return output, None
 
 
+def _unclosed(tokens: List[str]) -> int:
+    """Index of the innermost '(' left open at the end of tokens."""
+    opened: List[int] = []
+    for i, tok in enumerate(tokens):
+        if tok == "(":
+            opened.append(i)
+        elif tok == ")":
+            opened.pop()
+    return opened[-1]
+
+
+@timed("parser.evaluate_rpn")
 def evaluate_rpn(rpn: List[str]) -> Decimal:
     """Evaluate an RPN expression list using decimal arithmetic functions.
 
@@ -142,33 +366,118 @@ def evaluate_rpn(rpn: List[str]) -> Decimal:
     if not isinstance(rpn, list):
         raise ValueError("rpn must be a list of tokens")
 
+    value, failure = _run(rpn)
+    if failure is not None:
+        raise ValueError(failure.message)
+    return value
+
+
+def _run(rpn: List[str]) -> Tuple[Optional[Decimal], Optional[EvalResult]]:
+    """Non-raising evaluate_rpn; a failure's position is an index into rpn.
+
+    Division by zero is caught before dividing rather than by the exception
+    divide() raises.
+    """
     stack: List[Decimal] = []
 
-    for tok in rpn:
-        if tok in _OPERATORS:
-            # need two operands
-            if len(stack) < 2:
-                raise ValueError("insufficient operands for operator")
-            b = stack.pop()
-            a = stack.pop()
-            try:
-                result = _OPERATORS[tok]["func"](a, b)
-            except ValueError as e:
-                # propagate ValueError from calculator (e.g., division by zero)
-                raise
-            except Exception as e:
-                raise ValueError(f"error evaluating operator '{tok}': {e}")
-            stack.append(result)
-        else:
-            try:
-                val = Decimal(tok)
-            except Exception:
-                raise ValueError(f"invalid numeric token in RPN '{tok}'")
-            stack.append(val)
+    with decimal_context():
+        for i, tok in enumerate(rpn):
+            if tok in _OPERATORS:
+                # need two operands
+                if len(stack) < 2:
+                    return None, EvalResult(None, MALFORMED_EXPRESSION, "insufficient operands for operator", i)
+                b = stack.pop()
+                a = stack.pop()
+                if tok == "/" and b.is_zero():
+                    return None, EvalResult(None, DIVISION_BY_ZERO, "division by zero", i)
+                try:
+                    result = _OPERATORS[tok]["func"](a, b)
+                except ValueError as e:
+                    # report the calculator's own message
+                    return None, EvalResult(None, ARITHMETIC_ERROR, str(e), i)
+                except Exception as e:
+                    return None, EvalResult(None, ARITHMETIC_ERROR, f"error evaluating operator '{tok}': {e}", i)
+                stack.append(result)
+            elif tok in _UNARY_OPERATORS:
+                if not stack:
+                    return None, EvalResult(None, MALFORMED_EXPRESSION, "insufficient operands for operator", i)
+                try:
+                    stack.append(_UNARY_OPERATORS[tok]["func"](stack.pop()))
+                except Exception as e:
+                    return None, EvalResult(None, ARITHMETIC_ERROR, f"error evaluating operator '{tok}': {e}", i)
+            else:
+                try:
+                    val = Decimal(tok)
+                except Exception:
+                    return None, EvalResult(None, INVALID_NUMBER, f"invalid numeric token in RPN '{tok}'", i)
+                stack.append(val)
 
     if len(stack) != 1:
-        raise ValueError("malformed RPN expression")
-    return stack[0]
+        return None, EvalResult(None, MALFORMED_EXPRESSION, "malformed RPN expression")
+    return stack[0], None
+
+
+# Fixed-point fast path for the commonest row, one operator between two
+# plain literals (e.g. '19.99 * 3'). The literals are read as Python ints n
+# with a decimal scale (the value is n / 10**scale). Only results Decimal
+# gives exactly under DECIMAL_CONTEXT are computed: sums, differences and
+# products of at most prec digits and quotients that divide exactly at the
+# ideal scale, which then carry the same coefficient and exponent.
+# Anything else (longer expressions, signs, exponent literals, results
+# Decimal would round, zero results, whose sign follows Decimal's
+# signed-zero rules, and every error) returns None and is left to the
+# Decimal path, which then shunts the same tokens.
+_FIXED_DIGITS = DECIMAL_CONTEXT.prec
+_FIXED_LIMIT = 10 ** _FIXED_DIGITS
+_FIXED_ENABLED = True
+
+
+def _fixed_literal(tok: str) -> Optional[Tuple[int, int]]:
+    """(n, scale) for an unsigned ASCII literal of at most prec characters, else None."""
+    # isdigit() alone also accepts e.g. '²', which int() rejects
+    if len(tok) > _FIXED_DIGITS or not tok.isascii():
+        return None
+    if tok.isdigit():
+        return int(tok), 0
+    whole, _, frac = tok.partition(".")
+    digits = whole + frac
+    if not digits.isdigit():
+        return None
+    return int(digits), len(frac)
+
+
+def _evaluate_fixed(tokens: List[str]) -> Optional[Decimal]:
+    """The value of a 'literal op literal' token list by the fixed-point fast path, or None."""
+    if not _FIXED_ENABLED or len(tokens) != 3:
+        return None
+    left, op, right = tokens
+    if op not in _OPERATORS:
+        return None
+    a = _fixed_literal(left)
+    b = _fixed_literal(right)
+    if a is None or b is None:
+        return None
+    (a, sa), (b, sb) = a, b
+    if op == "*":
+        n = a * b
+        scale = sa + sb
+    elif op == "/":
+        if not b:
+            return None
+        n, r = divmod(a, b)
+        if r:
+            return None
+        scale = sa - sb
+    else:
+        if sa < sb:
+            a *= 10 ** (sb - sa)
+        elif sb < sa:
+            b *= 10 ** (sa - sb)
+        n = a + b if op == "+" else a - b
+        scale = max(sa, sb)
+    if not n or not -_FIXED_LIMIT < n < _FIXED_LIMIT:
+        return None
+    return Decimal(f"{n}E{-scale}") if scale else Decimal(n)
 
 
 def evaluate_expression(expression: str) -> Decimal:
@@ -186,3 +495,139 @@ def evaluate_expression(expression: str) -> Decimal:
     except Exception as e:
         # Wrap other exceptions as ValueError to provide consistent API
         raise ValueError(f"failed to evaluate expression: {e}")
+
+
+def _rpn_sources(tokens: List[str]) -> List[int]:
+    """For tokens that to_rpn accepts, the index of the token behind each RPN entry."""
+    sources: List[int] = []
+    stack: List[Tuple[int, int]] = []  # (token index, precedence), 0 for '('
+    operand_next = True
+    for i, tok in enumerate(tokens):
+        if tok == "(":
+            stack.append((i, 0))
+        elif tok == ")":
+            while stack[-1][1]:
+                sources.append(stack.pop()[0])
+            stack.pop()
+        elif tok in _OPERATORS:
+            prec = _PRECEDENCE["u" + tok] if operand_next else _PRECEDENCE[tok]
+            if not operand_next:
+                while stack and stack[-1][1] >= prec:
+                    sources.append(stack.pop()[0])
+            stack.append((i, prec))
+            operand_next = True
+            continue
+        else:
+            sources.append(i)
+        operand_next = False
+    sources.extend(i for i, _ in reversed(stack))
+    return sources
+
+
+def _locate(failure: EvalResult, text: str, tokens: Optional[List[str]] = None) -> EvalResult:
+    """Replace the token index in failure.position (an RPN index if the RPN
+    of tokens failed) with that token's character offset in text.
+
+    Offsets are only worked out here, when a failure needs them.
+    """
+    index = failure.position
+    if index is not None and tokens is not None:
+        sources = _rpn_sources(tokens)
+        index = sources[index] if index < len(sources) else None
+    position = len(text) if index is None else _offset(text, index)
+    return EvalResult(None, failure.code, failure.message, position)
+
+
+def _offset(text: str, index: int) -> int:
+    """Character offset of token number index of text (which must tokenize), or len(text)."""
+    for n, match in enumerate(_TOKEN.finditer(text)):
+        if match.start(4) != -1:
+            # tokenized by the reference tokenizer
+            positions = _scan_chars(text)[1]
+            return positions[index] if index < len(positions) else len(text)
+        if n == index:
+            return match.start(1) if match.start(3) == -1 else match.start(3)
+    return len(text)
+
+
+def _scan(expression: str) -> Tuple[List[str], Optional[EvalResult]]:
+    """Non-raising tokenize."""
+    if not isinstance(expression, str):
+        return [], EvalResult(None, INVALID_INPUT, "expression must be a string")
+    tokens = _match_tokens(expression)
+    if tokens is None:
+        tokens, _, failure = _scan_chars(expression)
+        return tokens, failure
+    return tokens, None
+
+
+def _text(text: Union[str, Callable[[], str]]) -> str:
+    return text if isinstance(text, str) else text()
+
+
+def _evaluate_tokens(tokens: List[str], text: Union[str, Callable[[], str]]) -> EvalResult:
+    """Non-raising to_rpn and evaluate_rpn of tokens, locating any failure
+    in text (or in the text that text() returns)."""
+    if not tokens:
+        return EvalResult(None, EMPTY_EXPRESSION, "malformed RPN expression", len(_text(text)))
+    value = _evaluate_fixed(tokens)
+    if value is not None:
+        return EvalResult(value)
+    rpn, failure = _shunt(tokens)
+    if failure is not None:
+        return _locate(failure, _text(text))
+    value, failure = _run(rpn)
+    if failure is not None:
+        return _locate(failure, _text(text), tokens)
+    return EvalResult(value)
+
+
+@timed("parser.try_evaluate")
+def try_evaluate(expression: str) -> EvalResult:
+    """Evaluate expression without raising, for batches where many rows are invalid.
+
+    The value is that of evaluate_expression; where it would raise
+    ValueError the result instead carries an error code, the same message
+    and the position of the offending token. Syntax errors and division by
+    zero are detected without raising any exception internally.
+    """
+    if not isinstance(expression, str):
+        return EvalResult(None, INVALID_INPUT, "expression must be a string")
+    tokens = _match_tokens(expression)
+    if tokens is None:
+        tokens, _, failure = _scan_chars(expression)
+        if failure is not None:
+            return failure
+    return _evaluate_tokens(tokens, expression)
+
+
+@timed("parser.try_evaluate_bytes")
+def try_evaluate_bytes(data: BytesLike, start: int = 0, end: Optional[int] = None) -> EvalResult:
+    """try_evaluate for the expression in data[start:end], scanned in place as by tokenize_bytes.
+
+    Positions are offsets from start (character offsets in the decoded text
+    if the expression is not plain ASCII).
+    """
+    if end is None:
+        end = len(data)
+    tokens = _match_bytes(data, start, end)
+    if tokens is None:
+        tokens, _, failure = _scan_chars(_decode(data, start, end))
+        if failure is not None:
+            return failure
+    return _evaluate_tokens(tokens, lambda: _decode(data, start, end))
+
+
+def validate_expression(expression: str) -> Optional[EvalResult]:
+    """Check the syntax of expression without evaluating it or raising.
+
+    Returns None if it parses, otherwise the failure try_evaluate reports.
+    Arithmetic errors such as division by zero are not detected.
+    """
+    tokens, failure = _scan(expression)
+    if failure is not None:
+        return failure
+    if not tokens:
+        return EvalResult(None, EMPTY_EXPRESSION, "malformed RPN expression", len(expression))
+    failure = _shunt(tokens)[1]
+    return None if failure is None else _locate(failure, expression)
@@ -0,0 +1,102 @@
+import cProfile
+import io
+import marshal
+import pstats
+import threading
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+__all__ = ["RerunProfiler", "PROFILER"]
+
+# frames kept per allocation site; 1 groups allocations by source line
+TRACEMALLOC_FRAMES = 1
+
+
+class RerunProfiler:
+    """Profile calls with cProfile and tracemalloc and aggregate across calls.
+
+    Each call gets its own cProfile profile which is then merged into the
+    aggregate. Profiled calls are serialized: tracemalloc is process-wide and
+    newer Pythons allow only one active profiler, so concurrent sessions take
+    turns while profiling mode is on. Allocations made by threads that are not
+    being profiled are still attributed to the running call.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._run_lock = threading.Lock()
+        self._clear()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._clear()
+
+    def _clear(self) -> None:
+        self._stats: Optional[pstats.Stats] = None
+        # "file:line" -> [net bytes allocated, net block count]
+        self._allocations: Dict[str, List[int]] = {}
+        self.runs = 0
+
+    def run(self, func: Callable, *args, **kwargs) -> Any:
+        """Call func under the profilers and merge the results into the aggregate."""
+        with self._run_lock:
+            started_tracing = not tracemalloc.is_tracing()
+            if started_tracing:
+                tracemalloc.start(TRACEMALLOC_FRAMES)
+            try:
+                before = tracemalloc.take_snapshot()
+                profile = cProfile.Profile()
+                try:
+                    return profile.runcall(func, *args, **kwargs)
+                finally:
+                    after = tracemalloc.take_snapshot()
+                    self._merge(profile, after.compare_to(before, "lineno"))
+            finally:
+                if started_tracing:
+                    tracemalloc.stop()
+
+    def _merge(self, profile: cProfile.Profile, diffs) -> None:
+        with self._lock:
+            if self._stats is None:
+                self._stats = pstats.Stats(profile)
+            else:
+                self._stats.add(profile)
+            for diff in diffs:
+                frame = diff.traceback[0]
+                key = f"{frame.filename}:{frame.lineno}"
+                entry = self._allocations.setdefault(key, [0, 0])
+                entry[0] += diff.size_diff
+                entry[1] += diff.count_diff
+            self.runs += 1
+
+    def stats_text(self, sort: str = "cumulative", limit: int = 30) -> str:
+        """Return the aggregated profile as pstats text, sorted by sort."""
+        with self._lock:
+            if self._stats is None:
+                return "no profiled reruns yet\n"
+            out = io.StringIO()
+            self._stats.stream = out
+            self._stats.sort_stats(sort).print_stats(limit)
+            return out.getvalue()
+
+    def profile_bytes(self) -> bytes:
+        """Return the aggregate in the .prof format read by pstats.Stats and snakeviz."""
+        with self._lock:
+            if self._stats is None:
+                return marshal.dumps({})
+            return marshal.dumps(self._stats.stats)
+
+    def top_allocations(self, limit: int = 10) -> List[Tuple[str, int, int]]:
+        """Return (site, net bytes, net blocks) for the limit largest allocation sites."""
+        with self._lock:
+            ranked = sorted(self._allocations.items(), key=lambda item: item[1][0], reverse=True)
+            return [(site, size, count) for site, (size, count) in ranked[:limit]]
+
+    def allocation_report(self, limit: int = 10) -> str:
+        lines = [f"Top {limit} allocation sites over {self.runs} rerun(s) (net bytes, blocks):"]
+        for site, size, count in self.top_allocations(limit):
+            lines.append(f"{size:>12,} B {count:>8,}  {site}")
+        return "\n".join(lines) + "\n"
+
+
+PROFILER = RerunProfiler()
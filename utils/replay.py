@@ -0,0 +1,105 @@
+"""Replay recorded keypresses through the keypad engine.
+
+Keys are KeyboardEvent.key values as seen by the app's injected keyboard
+handler: digits, '.', '+', '-', '*', '/', '%', Enter, Escape and Backspace.
+They map onto the same buttons the handler clicks; any other key is
+ignored, as it is in the browser.
+"""
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from utils import engine as _engine
+from utils.state import CalculatorState
+
+__all__ = ["KEY_EVENTS", "ReplayResult", "replay", "replay_many", "read_key_log"]
+
+# KeyboardEvent.key -> keypad button label (mirrors _inject_keyboard_handlers)
+KEY_EVENTS: Dict[str, str] = {
+    **{key: key for key in "0123456789."},
+    "+": "+",
+    "-": "-",
+    "*": "×",
+    "/": "÷",
+    "%": "%",
+    "Enter": "=",
+    "Escape": "C",
+    "Backspace": "⌫",
+}
+
+# error_state the app's handler sets when a transition raises unexpectedly
+_HANDLER_ERRORS: Dict[str, Optional[str]] = {
+    **{key: "digit_handler_error" for key in "0123456789."},
+    "+": "operator_handler_error",
+    "-": "operator_handler_error",
+    "*": "operator_handler_error",
+    "/": "operator_handler_error",
+    "%": "percentage_handler_error",
+    # _perform_calculation reports but leaves error_state alone
+    "Enter": None,
+    "Escape": "clear_entry_error",
+    "Backspace": "backspace_handler_error",
+}
+
+_TRANSITIONS = {key: _engine.EVENTS[label] for key, label in KEY_EVENTS.items()}
+
+
+class ReplayResult(NamedTuple):
+    state: CalculatorState
+    applied: int  # keys that pressed a button
+    ignored: int  # keys with no button
+    failures: int  # handled errors such as division by zero
+    errors: int  # unexpected exceptions the app would have logged
+
+    @property
+    def display_value(self) -> str:
+        return self.state.display_value
+
+    @property
+    def history(self) -> List[Tuple[str, str]]:
+        return self.state.history
+
+
+def replay(keys: Iterable[str], state: Optional[CalculatorState] = None) -> ReplayResult:
+    """Press keys in order on state (a fresh calculator by default).
+
+    The result matches pressing the same keys in the app: failures set the
+    display and error_state exactly as the handlers do, and an unexpected
+    exception in a transition is recorded the way the app's handler would
+    record it before the replay moves on to the next key.
+    """
+    if state is None:
+        state = CalculatorState()
+    transitions = _TRANSITIONS
+    applied = ignored = failures = errors = 0
+    remaining = iter(keys)
+    key = None
+    while True:
+        try:
+            for key in remaining:
+                transition = transitions.get(key)
+                if transition is None:
+                    ignored += 1
+                    continue
+                applied += 1
+                if transition(state) is not None:
+                    failures += 1
+            break
+        except Exception:
+            errors += 1
+            code = _HANDLER_ERRORS.get(key)
+            if code is not None:
+                state.error_state = code
+    return ReplayResult(state, applied, ignored, failures, errors)
+
+
+def replay_many(logs: Iterable[Iterable[str]]) -> List[ReplayResult]:
+    """Replay each key log on its own fresh calculator."""
+    return [replay(keys) for keys in logs]
+
+
+def read_key_log(path: str) -> List[str]:
+    """Read a key log with one KeyboardEvent.key value per line.
+
+    Blank lines are skipped; surrounding whitespace is not significant.
+    """
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
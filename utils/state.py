@@ -0,0 +1,145 @@
+from typing import Dict, List, Mapping, Optional, Tuple
+
+__all__ = [
+    "CalculatorState",
+    "DISPLAY_CURRENT",
+    "DISPLAY_PREVIOUS",
+    "DISPLAY_ERROR",
+    "LEGACY_KEYS",
+]
+
+# What the display shows; the displayed string itself is derived on demand.
+DISPLAY_CURRENT = 0  # current_input
+DISPLAY_PREVIOUS = 1  # previous_value (or current_input when there is none)
+DISPLAY_ERROR = 2  # the literal 'Error'
+
+# Per-key session state layout used before CalculatorState.
+LEGACY_KEYS = (
+    'current_input',
+    'previous_value',
+    'operator',
+    'waiting_for_operand',
+    'display_value',
+    'calculation_history',
+    'error_state',
+)
+
+# accepted types of each legacy field in from_mapping
+_FIELD_TYPES = {
+    'current_input': str,
+    'previous_value': str,
+    'operator': (str, type(None)),
+    'waiting_for_operand': bool,
+    'display_value': str,
+    'calculation_history': (list, type(None)),
+    'error_state': (str, type(None)),
+}
+
+
+class CalculatorState:
+    """All calculator state for one session in a single compact object.
+
+    History entries are stored as (expression, result) tuples, and the display
+    is a small source flag instead of a copy of current_input.
+    """
+
+    __slots__ = ('current_input', 'previous_value', 'operator', 'waiting_for_operand', 'display_source', 'history', 'error_state')
+
+    def __init__(
+        self,
+        current_input: str = "0",
+        previous_value: str = "",
+        operator: Optional[str] = None,
+        waiting_for_operand: bool = True,
+        display_source: int = DISPLAY_CURRENT,
+        history: Optional[List[Tuple[str, str]]] = None,
+        error_state: Optional[str] = None,
+    ) -> None:
+        self.current_input = current_input
+        self.previous_value = previous_value
+        self.operator = operator
+        self.waiting_for_operand = waiting_for_operand
+        self.display_source = display_source
+        self.history: List[Tuple[str, str]] = [] if history is None else history
+        self.error_state = error_state
+
+    def __repr__(self) -> str:
+        return (
+            f"CalculatorState(current_input={self.current_input!r}, previous_value={self.previous_value!r}, "
+            f"operator={self.operator!r}, waiting_for_operand={self.waiting_for_operand!r}, "
+            f"display_value={self.display_value!r}, history={len(self.history)} entries, "
+            f"error_state={self.error_state!r})"
+        )
+
+    @property
+    def display_value(self) -> str:
+        source = self.display_source
+        if source == DISPLAY_CURRENT:
+            return self.current_input
+        if source == DISPLAY_ERROR:
+            return 'Error'
+        return self.previous_value or self.current_input
+
+    @property
+    def calculation_history(self) -> List[Dict[str, str]]:
+        """History in the legacy list-of-dicts form."""
+        return [{'expression': expression, 'result': result} for expression, result in self.history]
+
+    def reset(self) -> None:
+        """Restore every field, including history, to its initial value."""
+        self.current_input = "0"
+        self.previous_value = ""
+        self.operator = None
+        self.waiting_for_operand = True
+        self.display_source = DISPLAY_CURRENT
+        self.history = []
+        self.error_state = None
+
+    def as_dict(self) -> Dict:
+        """Return the state in the legacy per-key session state layout."""
+        return {
+            'current_input': self.current_input,
+            'previous_value': self.previous_value,
+            'operator': self.operator,
+            'waiting_for_operand': self.waiting_for_operand,
+            'display_value': self.display_value,
+            'calculation_history': self.calculation_history,
+            'error_state': self.error_state,
+        }
+
+    @classmethod
+    def from_mapping(cls, data: Mapping) -> "CalculatorState":
+        """Build a state from the legacy per-key layout; missing keys take defaults.
+
+        The display source is inferred from display_value; a display that
+        matches neither current_input, previous_value nor 'Error' falls back
+        to showing current_input. Raises ValueError if a field has the wrong
+        type (e.g. a state posted by a client).
+        """
+        for key, types in _FIELD_TYPES.items():
+            if key in data and not isinstance(data[key], types):
+                raise ValueError(f"'{key}' has an invalid type")
+        state = cls()
+        state.current_input = data.get('current_input', state.current_input)
+        state.previous_value = data.get('previous_value', state.previous_value)
+        state.operator = data.get('operator', state.operator)
+        state.waiting_for_operand = data.get('waiting_for_operand', state.waiting_for_operand)
+        state.error_state = data.get('error_state', state.error_state)
+
+        display = data.get('display_value', state.current_input)
+        if display == state.current_input:
+            state.display_source = DISPLAY_CURRENT
+        elif display == 'Error':
+            state.display_source = DISPLAY_ERROR
+        elif display == state.previous_value:
+            state.display_source = DISPLAY_PREVIOUS
+
+        history = []
+        for item in data.get('calculation_history') or []:
+            try:
+                history.append((item.get('expression'), item.get('result')))
+            except AttributeError:
+                # skip malformed entries rather than failing the session
+                continue
+        state.history = history
+        return state